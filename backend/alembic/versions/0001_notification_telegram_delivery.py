@@ -0,0 +1,35 @@
+"""notification telegram delivery queue
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: fresh databases already get these columns from create_all
+    op.execute("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS send_to_telegram BOOLEAN DEFAULT false")
+    op.execute("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS telegram_attempts INTEGER DEFAULT 0")
+    op.execute("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS telegram_next_attempt_at TIMESTAMPTZ")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_notifications_telegram_pending "
+        "ON notifications (created_at) "
+        "WHERE send_to_telegram AND NOT is_sent_to_telegram"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_notifications_telegram_pending")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS telegram_next_attempt_at")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS telegram_attempts")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS send_to_telegram")
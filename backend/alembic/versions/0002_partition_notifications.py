@@ -0,0 +1,110 @@
+"""partition notifications by month and add archive table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def _exists(name):
+    return op.get_bind().execute(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def _is_partitioned(table):
+    return op.get_bind().execute(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ).scalar()
+
+
+def upgrade():
+    # Fresh databases already get the partitioned table and the archive from create_all
+    if not _is_partitioned("notifications"):
+        _partition_notifications()
+    if not _exists("notifications_archive"):
+        _create_archive()
+
+
+def _partition_notifications():
+    # Rebuild notifications as a table range-partitioned on created_at
+    op.execute("ALTER TABLE notifications RENAME TO notifications_legacy")
+    op.execute("UPDATE notifications_legacy SET created_at = now() WHERE created_at IS NULL")
+    op.execute(
+        "CREATE TABLE notifications (LIKE notifications_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER TABLE notifications ALTER COLUMN created_at SET NOT NULL")
+    op.execute("CREATE TABLE notifications_default PARTITION OF notifications DEFAULT")
+
+    # One partition per month from the oldest notification up to three months ahead
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', coalesce((SELECT min(created_at) FROM notifications_legacy), now()));
+            last_month date := date_trunc('month', now() + interval '3 months');
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF notifications FOR VALUES FROM (%L) TO (%L)',
+                    'notifications_' || to_char(month_start, 'YYYY_MM'),
+                    month_start::timestamptz,
+                    (month_start + interval '1 month')::timestamptz
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$;
+    """)
+
+    op.execute("INSERT INTO notifications SELECT * FROM notifications_legacy")
+    op.execute("DROP TABLE notifications_legacy")
+
+    # The primary key must include the partition key, so it becomes (id, created_at)
+    op.execute("ALTER TABLE notifications ADD PRIMARY KEY (id, created_at)")
+    op.execute(
+        "ALTER TABLE notifications ADD CONSTRAINT notifications_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id)"
+    )
+
+    # Indexes are created on every partition, present and future
+    op.execute("CREATE INDEX ix_notifications_user_created ON notifications (user_id, created_at DESC)")
+    op.execute("CREATE INDEX ix_notifications_user_unread ON notifications (user_id) WHERE NOT is_read")
+    op.execute(
+        "CREATE INDEX ix_notifications_telegram_pending ON notifications (created_at) "
+        "WHERE send_to_telegram AND NOT is_sent_to_telegram"
+    )
+
+
+def _create_archive():
+    # Read notifications past the retention age are moved here by the retention job
+    op.execute("CREATE TABLE notifications_archive (LIKE notifications INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE notifications_archive ADD PRIMARY KEY (id, created_at)")
+    op.execute("CREATE INDEX ix_notifications_archive_user_created ON notifications_archive (user_id, created_at DESC)")
+
+
+def downgrade():
+    op.execute("ALTER TABLE notifications RENAME TO notifications_partitioned")
+    op.execute("CREATE TABLE notifications (LIKE notifications_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO notifications SELECT * FROM notifications_archive")
+    op.execute("INSERT INTO notifications SELECT * FROM notifications_partitioned")
+    op.execute("DROP TABLE notifications_partitioned CASCADE")
+    op.execute("DROP TABLE notifications_archive")
+    op.execute("ALTER TABLE notifications ADD PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE notifications ADD CONSTRAINT notifications_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id)"
+    )
+    op.execute("CREATE INDEX ix_notifications_id ON notifications (id)")
+    op.execute(
+        "CREATE INDEX ix_notifications_telegram_pending ON notifications (created_at) "
+        "WHERE send_to_telegram AND NOT is_sent_to_telegram"
+    )
@@ -0,0 +1,72 @@
+"""sms campaigns with per-recipient delivery state
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: fresh databases already get these from create_all
+    op.execute("""
+        DO $$
+        BEGIN
+            IF to_regtype('smscampaignstatus') IS NULL THEN
+                CREATE TYPE smscampaignstatus AS ENUM ('SENDING', 'COMPLETED', 'CANCELLED');
+            END IF;
+            IF to_regtype('smsrecipientstatus') IS NULL THEN
+                CREATE TYPE smsrecipientstatus AS ENUM ('PENDING', 'SENDING', 'SENT', 'FAILED', 'UNKNOWN');
+            END IF;
+        END $$
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS sms_campaigns (
+            id VARCHAR PRIMARY KEY,
+            title VARCHAR,
+            message TEXT,
+            status smscampaignstatus,
+            agent_group_id VARCHAR REFERENCES agent_groups (id),
+            role userrole,
+            total_recipients INTEGER,
+            created_by VARCHAR REFERENCES users (id),
+            completed_at TIMESTAMPTZ,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now()
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_sms_campaigns_id ON sms_campaigns (id)")
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS sms_campaign_recipients (
+            campaign_id VARCHAR REFERENCES sms_campaigns (id) ON DELETE CASCADE,
+            user_id VARCHAR REFERENCES users (id),
+            mobile VARCHAR,
+            status smsrecipientstatus,
+            provider VARCHAR,
+            error VARCHAR,
+            sent_at TIMESTAMPTZ,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now(),
+            PRIMARY KEY (campaign_id, user_id)
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_sms_campaign_recipients_status "
+        "ON sms_campaign_recipients (campaign_id, status)"
+    )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS sms_campaign_recipients")
+    op.execute("DROP TABLE IF EXISTS sms_campaigns")
+    op.execute("DROP TYPE IF EXISTS smsrecipientstatus")
+    op.execute("DROP TYPE IF EXISTS smscampaignstatus")
@@ -0,0 +1,25 @@
+"""token version per user for revoking issued tokens
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: fresh databases already get the column from create_all
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0")
+
+
+def downgrade():
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS token_version")
@@ -0,0 +1,88 @@
+"""partition activity_logs by month and index audit queries
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def _is_partitioned(table):
+    return op.get_bind().execute(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ).scalar()
+
+
+def upgrade():
+    # Fresh databases already get the partitioned table from create_all
+    if _is_partitioned("activity_logs"):
+        return
+
+    # Rebuild activity_logs as a table range-partitioned on created_at
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_legacy")
+    op.execute("UPDATE activity_logs_legacy SET created_at = now() WHERE created_at IS NULL")
+    op.execute(
+        "CREATE TABLE activity_logs (LIKE activity_logs_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER TABLE activity_logs ALTER COLUMN created_at SET NOT NULL")
+    op.execute("CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT")
+
+    # One partition per month from the oldest entry up to three months ahead
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', coalesce((SELECT min(created_at) FROM activity_logs_legacy), now()));
+            last_month date := date_trunc('month', now() + interval '3 months');
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+                    'activity_logs_' || to_char(month_start, 'YYYY_MM'),
+                    month_start::timestamptz,
+                    (month_start + interval '1 month')::timestamptz
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$;
+    """)
+
+    op.execute("INSERT INTO activity_logs SELECT * FROM activity_logs_legacy")
+    op.execute("DROP TABLE activity_logs_legacy")
+
+    # The primary key must include the partition key, so it becomes (id, created_at)
+    op.execute("ALTER TABLE activity_logs ADD PRIMARY KEY (id, created_at)")
+    op.execute(
+        "ALTER TABLE activity_logs ADD CONSTRAINT activity_logs_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id)"
+    )
+
+    # Both match the keyset order of the query API: created_at DESC, id DESC
+    op.execute("CREATE INDEX ix_activity_logs_user_created ON activity_logs (user_id, created_at DESC, id DESC)")
+    op.execute(
+        "CREATE INDEX ix_activity_logs_entity ON activity_logs "
+        "(entity_type, entity_id, created_at DESC, id DESC)"
+    )
+
+
+def downgrade():
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_partitioned")
+    op.execute("CREATE TABLE activity_logs (LIKE activity_logs_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO activity_logs SELECT * FROM activity_logs_partitioned")
+    op.execute("DROP TABLE activity_logs_partitioned CASCADE")
+    op.execute("ALTER TABLE activity_logs ADD PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE activity_logs ADD CONSTRAINT activity_logs_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id)"
+    )
+    op.execute("CREATE INDEX ix_activity_logs_id ON activity_logs (id)")
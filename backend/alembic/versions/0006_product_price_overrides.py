@@ -0,0 +1,41 @@
+"""per agent group and per agent product price overrides
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: fresh databases already get this from create_all
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS product_price_overrides (
+            id VARCHAR PRIMARY KEY,
+            product_id VARCHAR NOT NULL REFERENCES products (id) ON DELETE CASCADE,
+            agent_group_id VARCHAR REFERENCES agent_groups (id) ON DELETE CASCADE,
+            agent_id VARCHAR REFERENCES agents (id) ON DELETE CASCADE,
+            price DOUBLE PRECISION,
+            commission_rate DOUBLE PRECISION,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now(),
+            CONSTRAINT ck_product_price_overrides_target CHECK ((agent_group_id IS NULL) <> (agent_id IS NULL)),
+            CONSTRAINT ck_product_price_overrides_value CHECK (price IS NOT NULL OR commission_rate IS NOT NULL),
+            CONSTRAINT uq_product_price_overrides_group UNIQUE (product_id, agent_group_id),
+            CONSTRAINT uq_product_price_overrides_agent UNIQUE (product_id, agent_id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_product_price_overrides_id ON product_price_overrides (id)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS product_price_overrides")
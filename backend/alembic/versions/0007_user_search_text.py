@@ -0,0 +1,46 @@
+"""normalized users.search_text with a trigram index for agent search
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.core.utils.search_text_sql(first_name, last_name, mobile, email, business_name)
+SEARCH_TEXT_SQL = (
+    "btrim(regexp_replace(translate(lower("
+    "coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(mobile, '') || ' ' || "
+    "coalesce(email, '') || ' ' || coalesce(business_name, '')), "
+    # Arabic ye/kaf/heh, ZWNJ, Persian and Arabic-Indic digits; then diacritics and tatweel (dropped)
+    "'\u064a\u0649\u0643\u06c0\u0629\u200c\u06f0\u06f1\u06f2\u06f3\u06f4\u06f5\u06f6\u06f7\u06f8\u06f9"
+    "\u0660\u0661\u0662\u0663\u0664\u0665\u0666\u0667\u0668\u0669"
+    "\u064b\u064c\u064d\u064e\u064f\u0650\u0651\u0652\u0640', "
+    "'\u06cc\u06cc\u06a9\u0647\u0647 01234567890123456789'), '\\s+', ' ', 'g'))"
+)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # IF NOT EXISTS: fresh databases already get these from create_all
+    op.execute(
+        f"ALTER TABLE users ADD COLUMN IF NOT EXISTS search_text TEXT "
+        f"GENERATED ALWAYS AS ({SEARCH_TEXT_SQL}) STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_search_text_trgm "
+        "ON users USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_users_search_text_trgm")
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS search_text")
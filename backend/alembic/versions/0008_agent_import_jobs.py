@@ -0,0 +1,51 @@
+"""agent bulk onboarding jobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: fresh databases already get these from create_all
+    op.execute("""
+        DO $$
+        BEGIN
+            IF to_regtype('agentimportstatus') IS NULL THEN
+                CREATE TYPE agentimportstatus AS ENUM ('PENDING', 'RUNNING', 'COMPLETED', 'FAILED');
+            END IF;
+        END $$
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS agent_import_jobs (
+            id VARCHAR PRIMARY KEY,
+            filename VARCHAR,
+            status agentimportstatus,
+            total_rows INTEGER,
+            processed_rows INTEGER,
+            created_count INTEGER,
+            skipped_count INTEGER,
+            report JSON,
+            error TEXT,
+            created_by VARCHAR REFERENCES users (id),
+            completed_at TIMESTAMPTZ,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now()
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_agent_import_jobs_id ON agent_import_jobs (id)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS agent_import_jobs")
+    op.execute("DROP TYPE IF EXISTS agentimportstatus")
@@ -11,7 +11,10 @@ from app.api.endpoints import (
     payments,
     reports,
     notifications,
-    settings
+    settings,
+    sms,
+    activity_logs,
+    pricing
 )
 
 api_router = APIRouter()
@@ -26,4 +29,7 @@ api_router.include_router(credits.router, prefix="/credits", tags=["credits"])
 api_router.include_router(payments.router, prefix="/payments", tags=["payments"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
-api_router.include_router(settings.router, prefix="/settings", tags=["settings"])
\ No newline at end of file
+api_router.include_router(settings.router, prefix="/settings", tags=["settings"])
+api_router.include_router(sms.router, prefix="/sms", tags=["sms"])
+api_router.include_router(activity_logs.router, prefix="/activity-logs", tags=["activity-logs"])
+api_router.include_router(pricing.router, prefix="/pricing", tags=["pricing"])
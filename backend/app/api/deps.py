@@ -9,16 +9,28 @@ from pydantic import ValidationError
 from app.db.session import get_db
 from app.core.config import settings
 from app.core.security import verify_password
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.schemas.token import TokenPayload
+from app.services.principal_cache import Principal, principal_cache
+from app.services.token_versions import token_versions
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
     """
     Validate token and return current user
     """
+    return get_user_from_token(db, token)
+
+
+def get_user_from_token(db: Session, token: str) -> Principal:
+    """
+    Resolve an access token to an active user, raising 401/403 otherwise.
+    Role and agent come from the token claims, checked against the cached
+    token version; the database is only hit on a cache miss.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -28,13 +40,26 @@ def get_current_user(
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        token_data = TokenPayload(**payload)
     except (JWTError, ValidationError):
         raise credentials_exception
+    if token_data.sub is None or token_data.type == "refresh":
+        raise credentials_exception
+    
+    if token_data.role is not None and token_data.ver is not None:
+        # The token carries its own claims; only its version is checked (from cache).
+        # Deactivation and role changes bump the version, revoking the token.
+        if token_versions.get(db, token_data.sub) != token_data.ver:
+            raise credentials_exception
+        return Principal(
+            id=token_data.sub,
+            role=token_data.role,
+            is_active=True,
+            agent_id=token_data.agent_id
+        )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # Tokens issued before claims were added
+    user = principal_cache.get(db, token_data.sub)
     if user is None:
         raise credentials_exception
     if not user.is_active:
@@ -45,7 +70,7 @@ def get_current_user(
     return user
 
 
-def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+def get_current_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Validate user is an admin or super admin
     """
@@ -57,7 +82,7 @@ def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def get_current_super_admin(current_user: User = Depends(get_current_user)) -> User:
+def get_current_super_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Validate user is a super admin
     """
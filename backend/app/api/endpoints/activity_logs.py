@@ -0,0 +1,48 @@
+from typing import Any, Optional
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_admin
+from app.schemas.activity_log import ActivityLogPage
+from app.services.activity_log_service import ActivityLogService
+from app.services.principal_cache import Principal
+
+router = APIRouter()
+
+@router.get("/", response_model=ActivityLogPage)
+def get_activity_logs(
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Retrieve activity logs, newest first. Without `since` only the last
+    ACTIVITY_LOG_QUERY_DAYS days are searched; page with `next_cursor`.
+    """
+    activity_log_service = ActivityLogService(db)
+    try:
+        logs, next_cursor = activity_log_service.search_logs(
+            user_id=user_id,
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return {"items": logs, "next_cursor": next_cursor}
@@ -4,9 +4,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_admin
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.schemas.agent_group import AgentGroupCreate, AgentGroupResponse, AgentGroupUpdate
 from app.services.agent_service import AgentService
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -15,7 +16,7 @@ def get_agent_groups(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Retrieve agent groups.
@@ -28,7 +29,7 @@ def get_agent_groups(
 def create_agent_group(
     group_in: AgentGroupCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Create new agent group.
@@ -41,7 +42,7 @@ def create_agent_group(
 def get_agent_group(
     group_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Get agent group by ID.
@@ -60,7 +61,7 @@ def update_agent_group(
     group_id: str,
     group_in: AgentGroupUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Update an agent group.
@@ -81,7 +82,7 @@ def add_agent_to_group(
     group_id: str,
     agent_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Add an agent to a group.
@@ -115,7 +116,7 @@ def remove_agent_from_group(
     group_id: str,
     agent_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Remove an agent from a group.
@@ -1,13 +1,18 @@
 pythonfrom typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_db, get_current_user, get_current_admin
 from app.core.security import generate_id
-from app.models.user import User, UserRole
+from app.models.agent_import import AgentImportJob
+from app.models.user import UserRole
 from app.schemas.agent import AgentCreate, AgentResponse, AgentUpdate
+from app.schemas.agent_import import AgentImportJobReport, AgentImportJobResponse
+from app.services.agent_importer import agent_importer, parse_agent_csv
 from app.services.agent_service import AgentService
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -17,7 +22,7 @@ def get_agents(
     limit: int = 100,
     search: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Retrieve agents.
@@ -30,7 +35,7 @@ def get_agents(
 def create_agent(
     agent_in: AgentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Create new agent.
@@ -39,11 +44,49 @@ def create_agent(
     agent = agent_service.create_agent(agent_in)
     return agent
 
+@router.post("/import", response_model=AgentImportJobResponse)
+async def import_agents(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Onboard agents from a CSV file (mobile, first_name, last_name, email,
+    business_name, province, city, password, groups). Runs in the background;
+    poll GET /agents/import/{job_id} for progress and the per-row report.
+    """
+    content = await file.read()
+    try:
+        records = parse_agent_csv(content)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return await run_in_threadpool(agent_importer.submit, db, records, current_user.id, file.filename)
+
+@router.get("/import/{job_id}", response_model=AgentImportJobReport)
+def get_agent_import(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Get the progress of an agent import; the report is included once it completes.
+    """
+    job = db.query(AgentImportJob).filter(AgentImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found",
+        )
+    return job
+
 @router.get("/{agent_id}", response_model=AgentResponse)
 def get_agent(
     agent_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get agent by ID.
@@ -70,7 +113,7 @@ def update_agent(
     agent_id: str,
     agent_in: AgentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Update an agent.
@@ -90,7 +133,7 @@ def update_agent(
 def activate_agent(
     agent_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Activate an agent.
@@ -110,7 +153,7 @@ def activate_agent(
 def deactivate_agent(
     agent_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Deactivate an agent.
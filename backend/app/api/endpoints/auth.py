@@ -1,22 +1,23 @@
-pythonfrom datetime import timedelta
-from typing import Any
+pythonfrom typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_current_admin
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, generate_otp
-from app.schemas.token import Token, TokenPayload
+from app.core.hashing import password_hasher
+from app.core.security import verify_password
+from app.schemas.token import Token, TokenPayload, TokenRefresh
 from app.schemas.user import UserCreate, UserResponse
 from app.services.auth_service import AuthService
-from app.services.sms_service import SMSService
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login_access_token(
+async def login_access_token(
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
@@ -24,7 +25,7 @@ def login_access_token(
     OAuth2 compatible token login, get an access token for future requests
     """
     auth_service = AuthService(db)
-    user = auth_service.authenticate(username=form_data.username, password=form_data.password)
+    user = await auth_service.authenticate(username=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,39 +38,23 @@ def login_access_token(
             detail="Inactive user",
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return {
-        "access_token": create_access_token(
-            user.id, expires_delta=access_token_expires
-        ),
-        "token_type": "bearer",
-    }
+    return await run_in_threadpool(auth_service.issue_tokens, user)
 
 @router.post("/request-otp")
-async def request_otp(
+def request_otp(
     mobile: str,
+    request: Request,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Request an OTP to login
     """
     auth_service = AuthService(db)
-    sms_service = SMSService()
     
-    # Generate OTP
-    otp = generate_otp()
-    
-    # Save OTP to database (this is just an example, you'd use a more secure method)
-    success = auth_service.save_otp(mobile, otp)
-    if not success:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid mobile number",
-        )
-    
-    # Send OTP via SMS
-    if settings.SMS_API_KEY:  # Only send SMS if API key is configured
-        await sms_service.send_otp(mobile, otp)
+    # Throttled per mobile and per client IP; raises 429 when exceeded.
+    # The SMS is queued and sent in the background.
+    client_ip = request.client.host if request.client else None
+    auth_service.request_otp(mobile, client_ip)
     
     return {"message": "OTP sent successfully"}
 
@@ -90,13 +75,18 @@ def verify_otp(
             detail="Invalid OTP",
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return {
-        "access_token": create_access_token(
-            user.id, expires_delta=access_token_expires
-        ),
-        "token_type": "bearer",
-    }
+    return auth_service.issue_tokens(user)
+
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(
+    token_in: TokenRefresh,
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Exchange a refresh token for a new access token and refresh token
+    """
+    auth_service = AuthService(db)
+    return auth_service.refresh_tokens(token_in.refresh_token)
 
 @router.post("/register", response_model=UserResponse)
 def register_user(
@@ -115,4 +105,13 @@ def register_user(
         )
     
     user = auth_service.create_user(user_in)
-    return user
\ No newline at end of file
+    return user
+
+@router.get("/password-hashing/metrics")
+def get_password_hashing_metrics(
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Retrieve password-hashing executor counters, queue wait and hash time.
+    """
+    return password_hasher.metrics()
\ No newline at end of file
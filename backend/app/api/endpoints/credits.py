@@ -4,16 +4,17 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user, get_current_admin
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.schemas.credit import CreditResponse, CreditTransaction
 from app.services.credit_service import CreditService
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[CreditResponse])
 def get_credits(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Retrieve credits for the current user or all users (admin only).
@@ -23,12 +24,12 @@ def get_credits(
     if current_user.role in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
         credits = credit_service.get_all_credits()
     else:
-        if not current_user.agent:
+        if not current_user.agent_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Agent not found for current user",
             )
-        credits = [credit_service.get_agent_credit(current_user.agent.id)]
+        credits = [credit_service.get_agent_credit(current_user.agent_id)]
         
     return credits
 
@@ -36,14 +37,14 @@ def get_credits(
 def get_agent_credit(
     agent_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get credit for a specific agent.
     """
     # Check permissions: Only admins or the agent itself can see the credit
     if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
-        if not current_user.agent or current_user.agent.id != agent_id:
+        if not current_user.agent_id or current_user.agent_id != agent_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions",
@@ -64,7 +65,7 @@ def add_credit_transaction(
     agent_id: str,
     transaction: CreditTransaction,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Add a credit transaction (deposit/withdrawal) for an agent.
@@ -93,14 +94,14 @@ def get_credit_transactions(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get credit transactions for a specific agent.
     """
     # Check permissions: Only admins or the agent itself can see the transactions
     if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
-        if not current_user.agent or current_user.agent.id != agent_id:
+        if not current_user.agent_id or current_user.agent_id != agent_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions",
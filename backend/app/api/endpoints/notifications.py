@@ -1,12 +1,27 @@
-pythonfrom typing import Any, List, Optional
+pythonfrom typing import Any, List, Optional, Tuple
+import asyncio
+import json
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.api.deps import get_db, get_current_user, get_current_admin
+from app.api.deps import get_db, get_current_user, get_current_admin, get_user_from_token
+from app.core.config import settings
+from app.core.pubsub import notification_broker
+from app.db.session import SessionLocal
 from app.models.user import User, UserRole
-from app.schemas.notification import NotificationCreate, NotificationResponse
+from app.models.notification import NotificationType
+from app.schemas.notification import (
+    NotificationCreate,
+    NotificationResponse,
+    NotificationBroadcast,
+    NotificationBroadcastResponse
+)
+from app.services.agent_service import AgentService
 from app.services.notification_service import NotificationService
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -16,7 +31,7 @@ def get_notifications(
     limit: int = 100,
     unread_only: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Retrieve notifications for the current user.
@@ -30,29 +45,110 @@ def get_notifications(
     )
     return notifications
 
+@router.get("/unread-count")
+def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Get the number of unread notifications for the current user.
+    """
+    notification_service = NotificationService(db)
+    return {"unread": notification_service.get_unread_count(current_user.id)}
+
+def _open_stream(token: str) -> Tuple[str, int]:
+    # A short-lived session: open streams must not pin pooled DB connections
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(db, token)
+        return user.id, NotificationService(db).get_unread_count(user.id)
+    finally:
+        db.close()
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+) -> Any:
+    """
+    Stream notification events for the current user as Server-Sent Events.
+    EventSource cannot send headers, so the access token may also be given as ?token=.
+    """
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user_id, unread = await run_in_threadpool(_open_stream, token)
+    queue = notification_broker.subscribe(user_id)
+    
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield f"event: unread\ndata: {json.dumps({'unread': unread})}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing the idle connection
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+        finally:
+            notification_broker.unsubscribe(user_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/", response_model=NotificationResponse)
 def create_notification(
     notification_in: NotificationCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Create a new notification for a user.
     """
     notification_service = NotificationService(db)
-    notification = notification_service.create_notification(notification_in)
-    
-    # Attempt to send to Telegram if configured
-    if notification_in.send_to_telegram:
-        notification_service.send_notification_to_telegram(notification.id)
-    
+    notification = notification_service.create_notification(notification_in.dict())
     return notification
 
+@router.post("/broadcast", response_model=NotificationBroadcastResponse)
+def broadcast_notification(
+    broadcast_in: NotificationBroadcast,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Send a notification to all users of an agent group, a role, or everyone.
+    """
+    if broadcast_in.agent_group_id:
+        agent_service = AgentService(db)
+        if not agent_service.get_agent_group(broadcast_in.agent_group_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Agent group not found",
+            )
+    
+    notification_service = NotificationService(db)
+    recipients = notification_service.broadcast_notification(broadcast_in.dict())
+    return {"recipients": recipients}
+
 @router.post("/{notification_id}/read", response_model=NotificationResponse)
 def mark_notification_as_read(
     notification_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Mark a notification as read.
@@ -79,7 +175,7 @@ def mark_notification_as_read(
 @router.post("/read-all")
 def mark_all_notifications_as_read(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Mark all notifications as read for the current user.
@@ -91,7 +187,7 @@ def mark_all_notifications_as_read(
 @router.post("/send-test")
 async def send_test_notification(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Send a test notification to the current user.
@@ -103,16 +199,13 @@ async def send_test_notification(
         user_id=current_user.id,
         title="Test Notification",
         message="This is a test notification",
-        type="SYSTEM",
+        type=NotificationType.SYSTEM,
         send_to_telegram=True
     )
     
-    notification = notification_service.create_notification(notification_in)
-    
-    # Send to Telegram
-    success = await notification_service.send_notification_to_telegram(notification.id)
+    notification_service.create_notification(notification_in.dict())
     
-    if success:
-        return {"message": "Test notification sent successfully"}
-    else:
-        return {"message": "Notification created, but could not send to Telegram"}
\ No newline at end of file
+    telegram_id = db.query(User.telegram_id).filter(User.id == current_user.id).scalar()
+    if not telegram_id:
+        return {"message": "Notification created, but no Telegram account is linked"}
+    return {"message": "Test notification queued for Telegram delivery"}
\ No newline at end of file
@@ -7,14 +7,17 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user, get_current_admin
 from app.core.config import settings
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.schemas.payment import (
     PaymentCreate, 
     PaymentResponse, 
     PaymentUpdate,
-    PaymentApproveReject
+    PaymentApproveReject,
+    PaymentBatchApproveReject,
+    PaymentBatchResult
 )
 from app.services.payment_service import PaymentService
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -24,7 +27,7 @@ def get_payments(
     limit: int = 100,
     status: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Retrieve payments.
@@ -33,13 +36,13 @@ def get_payments(
     
     # If user is an agent, only get their payments
     if current_user.role == UserRole.AGENT:
-        if not current_user.agent:
+        if not current_user.agent_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Agent not found for current user",
             )
         payments = payment_service.get_agent_payments(
-            agent_id=current_user.agent.id,
+            agent_id=current_user.agent_id,
             skip=skip,
             limit=limit,
             status=status
@@ -60,12 +63,12 @@ async def create_payment(
     description: Optional[str] = Form(None),
     receipt_image: Optional[UploadFile] = File(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Create a new payment request (card-to-card).
     """
-    if not current_user.agent:
+    if not current_user.agent_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Agent not found for current user",
@@ -106,11 +109,43 @@ async def create_payment(
     
     return payment
 
+@router.post("/batch-approve", response_model=List[PaymentBatchResult])
+def batch_approve_payments(
+    batch: PaymentBatchApproveReject,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Approve several payments at once.
+    """
+    payment_service = PaymentService(db)
+    return payment_service.batch_approve_payments(
+        payment_ids=batch.payment_ids,
+        admin_id=current_user.id,
+        admin_note=batch.admin_note
+    )
+
+@router.post("/batch-reject", response_model=List[PaymentBatchResult])
+def batch_reject_payments(
+    batch: PaymentBatchApproveReject,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Reject several payments at once.
+    """
+    payment_service = PaymentService(db)
+    return payment_service.batch_reject_payments(
+        payment_ids=batch.payment_ids,
+        admin_id=current_user.id,
+        admin_note=batch.admin_note
+    )
+
 @router.get("/{payment_id}", response_model=PaymentResponse)
 def get_payment(
     payment_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get payment by ID.
@@ -138,7 +173,7 @@ def approve_payment(
     payment_id: str,
     approval: PaymentApproveReject,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Approve a payment.
@@ -169,7 +204,7 @@ def reject_payment(
     payment_id: str,
     rejection: PaymentApproveReject,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Reject a payment.
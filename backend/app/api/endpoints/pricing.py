@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_user, get_current_admin
+from app.models.agent import Agent
+from app.schemas.pricing import PriceOverrideCreate, PriceOverrideResponse, PriceOverrideUpdate
+from app.services.pricing_service import PricingService
+from app.services.principal_cache import Principal
+
+router = APIRouter()
+
+@router.get("/overrides", response_model=List[PriceOverrideResponse])
+def get_price_overrides(
+    product_id: Optional[str] = None,
+    agent_group_id: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Retrieve price overrides.
+    """
+    pricing_service = PricingService(db)
+    return pricing_service.get_overrides(
+        product_id=product_id,
+        agent_group_id=agent_group_id,
+        agent_id=agent_id
+    )
+
+@router.post("/overrides", response_model=PriceOverrideResponse)
+def create_price_override(
+    override_in: PriceOverrideCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Set a product price for an agent group or a single agent.
+    """
+    pricing_service = PricingService(db)
+    try:
+        return pricing_service.create_override(override_in)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+@router.put("/overrides/{override_id}", response_model=PriceOverrideResponse)
+def update_price_override(
+    override_id: str,
+    override_in: PriceOverrideUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Update a price override.
+    """
+    pricing_service = PricingService(db)
+    try:
+        override = pricing_service.update_override(override_id, override_in)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    if not override:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Price override not found",
+        )
+    return override
+
+@router.delete("/overrides/{override_id}")
+def delete_price_override(
+    override_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Delete a price override.
+    """
+    pricing_service = PricingService(db)
+    if not pricing_service.delete_override(override_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Price override not found",
+        )
+    return {"message": "Price override deleted"}
+
+@router.get("/agents/{agent_id}", response_model=Dict[str, float])
+def get_agent_prices(
+    agent_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Retrieve the effective price of every product for an agent.
+    """
+    if not db.query(Agent.id).filter(Agent.id == agent_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agent not found",
+        )
+    return PricingService(db).get_agent_prices(agent_id)
+
+@router.get("/me", response_model=Dict[str, float])
+def get_my_prices(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+) -> Any:
+    """
+    Retrieve the current agent's price for every product.
+    """
+    if not current_user.agent_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User is not an agent",
+        )
+    return PricingService(db).get_agent_prices(current_user.agent_id)
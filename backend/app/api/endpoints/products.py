@@ -1,73 +1,131 @@
 pythonfrom typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_db, get_current_user, get_current_admin
-from app.models.user import User
-from app.schemas.product import ProductCreate, ProductResponse, ProductUpdate
+from app.db.session import SessionLocal
+from app.models.user import UserRole
+from app.schemas.product import ProductCreate, ProductImportResult, ProductResponse, ProductUpdate
+from app.services.catalog_cache import catalog_cache, product_data
+from app.services.price_matrix import AgentPrices, price_matrix
+from app.services.principal_cache import Principal
 from app.services.product_service import ProductService
+from app.services.product_transfer import export_products, parse_products
 
 router = APIRouter()
 
+def _agent_prices(current_user: Principal) -> Optional[AgentPrices]:
+    """Agents see their own price on every product"""
+    if current_user.role == UserRole.AGENT:
+        return price_matrix.prices_for(current_user.agent_id)
+    return None
+
 @router.get("/", response_model=List[ProductResponse])
 def get_products(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     group_id: Optional[str] = None,
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
-    Retrieve products.
+    Retrieve products. Served from the catalog cache; supports If-None-Match.
     """
-    product_service = ProductService(db)
-    products = product_service.get_products(
+    products = catalog_cache.products(
         skip=skip, 
         limit=limit, 
         group_id=group_id,
-        is_active=is_active
+        is_active=is_active,
+        prices=_agent_prices(current_user)
     )
-    return products
+    return products.response(request)
 
 @router.post("/", response_model=ProductResponse)
 def create_product(
     product_in: ProductCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Create new product.
     """
     product_service = ProductService(db)
     product = product_service.create_product(product_in)
-    return product
+    return product_data(product)
+
+@router.post("/import", response_model=ProductImportResult)
+async def import_products(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Create or update products from a CSV or JSON file in one transaction.
+    With dry_run, return the changes without applying them.
+    """
+    content = await file.read()
+    try:
+        rows = parse_products(content, file.filename or "")
+        product_service = ProductService(db)
+        return await run_in_threadpool(product_service.import_products, rows, dry_run)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+# Must stay above /{product_id}, which would otherwise match "export"
+@router.get("/export")
+def export_product_file(
+    format: str = Query("csv", pattern="^(csv|json)$"),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Export all products as CSV or JSON; the result is a valid import file.
+    """
+    def stream():
+        # The response outlives the request's session, so the stream has its own
+        db = SessionLocal()
+        try:
+            yield from export_products(db, format)
+        finally:
+            db.close()
+    
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/json"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=products.{format}"}
+    )
 
 @router.get("/{product_id}", response_model=ProductResponse)
 def get_product(
+    request: Request,
     product_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
-    Get product by ID.
+    Get product by ID. Served from the catalog cache; supports If-None-Match.
     """
-    product_service = ProductService(db)
-    product = product_service.get_product(product_id)
+    product = catalog_cache.product(product_id, prices=_agent_prices(current_user))
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found",
         )
-    return product
+    return product.response(request)
 
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: str,
     product_in: ProductUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Update a product.
@@ -81,13 +139,13 @@ def update_product(
         )
     
     product = product_service.update_product(product_id, product_in)
-    return product
+    return product_data(product)
 
 @router.post("/{product_id}/activate", response_model=ProductResponse)
 def activate_product(
     product_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Activate a product.
@@ -101,13 +159,13 @@ def activate_product(
         )
     
     product = product_service.activate_product(product_id)
-    return product
+    return product_data(product)
 
 @router.post("/{product_id}/deactivate", response_model=ProductResponse)
 def deactivate_product(
     product_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Deactivate a product.
@@ -121,4 +179,4 @@ def deactivate_product(
         )
     
     product = product_service.deactivate_product(product_id)
-    return product
\ No newline at end of file
+    return product_data(product)
\ No newline at end of file
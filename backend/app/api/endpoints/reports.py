@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.responses import StreamingResponse
 
 from app.api.deps import get_db, get_current_user, get_current_admin
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.services.principal_cache import Principal
 from app.services.report_service import ReportService
 
 router = APIRouter()
@@ -14,7 +15,7 @@ router = APIRouter()
 @router.get("/dashboard")
 def get_dashboard_data(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get dashboard data for the current user.
@@ -27,13 +28,13 @@ def get_dashboard_data(
         dashboard_data = report_service.get_admin_dashboard_data()
     else:
         # Agent dashboard data
-        if not current_user.agent:
+        if not current_user.agent_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Agent not found for current user",
             )
         
-        dashboard_data = report_service.get_agent_dashboard_data(current_user.agent.id)
+        dashboard_data = report_service.get_agent_dashboard_data(current_user.agent_id)
     
     return dashboard_data
 
@@ -44,7 +45,7 @@ def get_sales_report(
     agent_id: Optional[str] = None,
     product_id: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get sales report.
@@ -59,12 +60,12 @@ def get_sales_report(
     
     # If user is an agent, force agent_id to be the current user's agent id
     if current_user.role == UserRole.AGENT:
-        if not current_user.agent:
+        if not current_user.agent_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Agent not found for current user",
             )
-        agent_id = current_user.agent.id
+        agent_id = current_user.agent_id
     
     report_data = report_service.get_sales_report(
         start_date=start_date,
@@ -81,7 +82,7 @@ def get_financial_report(
     end_date: Optional[datetime] = None,
     agent_id: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get financial report.
@@ -96,12 +97,12 @@ def get_financial_report(
     
     # If user is an agent, force agent_id to be the current user's agent id
     if current_user.role == UserRole.AGENT:
-        if not current_user.agent:
+        if not current_user.agent_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Agent not found for current user",
             )
-        agent_id = current_user.agent.id
+        agent_id = current_user.agent_id
     
     report_data = report_service.get_financial_report(
         start_date=start_date,
@@ -118,7 +119,7 @@ def export_sales_report(
     agent_id: Optional[str] = None,
     product_id: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Export sales report as Excel.
@@ -133,12 +134,12 @@ def export_sales_report(
     
     # If user is an agent, force agent_id to be the current user's agent id
     if current_user.role == UserRole.AGENT:
-        if not current_user.agent:
+        if not current_user.agent_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Agent not found for current user",
             )
-        agent_id = current_user.agent.id
+        agent_id = current_user.agent_id
     
     excel_bytes = report_service.export_sales_report(
         start_date=start_date,
@@ -160,7 +161,7 @@ def export_financial_report(
     end_date: Optional[datetime] = None,
     agent_id: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Export financial report as Excel.
@@ -175,12 +176,12 @@ def export_financial_report(
     
     # If user is an agent, force agent_id to be the current user's agent id
     if current_user.role == UserRole.AGENT:
-        if not current_user.agent:
+        if not current_user.agent_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Agent not found for current user",
             )
-        agent_id = current_user.agent.id
+        agent_id = current_user.agent_id
     
     excel_bytes = report_service.export_financial_report(
         start_date=start_date,
@@ -4,8 +4,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user, get_current_admin, get_current_super_admin
-from app.models.user import User
 from app.schemas.setting import SettingCreate, SettingResponse, SettingUpdate
+from app.services.principal_cache import Principal
 from app.services.setting_service import SettingService
 
 router = APIRouter()
@@ -13,7 +13,7 @@ router = APIRouter()
 @router.get("/", response_model=List[SettingResponse])
 def get_settings(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Retrieve all settings.
@@ -26,7 +26,7 @@ def get_settings(
 def create_setting(
     setting_in: SettingCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ) -> Any:
     """
     Create a new setting.
@@ -39,7 +39,7 @@ def create_setting(
 def get_setting(
     key: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Get a setting by key.
@@ -53,12 +53,31 @@ def get_setting(
         )
     return setting
 
+# Registered before PUT /{key}, which would otherwise capture /bulk-update
+@router.put("/bulk-update")
+def bulk_update_settings(
+    settings: Dict[str, str],
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_super_admin)
+) -> Any:
+    """
+    Update multiple settings at once. If any key does not exist, nothing is updated.
+    """
+    setting_service = SettingService(db)
+    updated, unknown_keys = setting_service.bulk_update_settings(settings)
+    if unknown_keys:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown setting keys: {', '.join(unknown_keys)}",
+        )
+    return {"updated": len(updated), "unknown_keys": []}
+
 @router.put("/{key}", response_model=SettingResponse)
 def update_setting(
     key: str,
     setting_in: SettingUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ) -> Any:
     """
     Update a setting.
@@ -78,7 +97,7 @@ def update_setting(
 def get_settings_by_category(
     category: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ) -> Any:
     """
     Get settings by category.
@@ -86,16 +105,3 @@ def get_settings_by_category(
     setting_service = SettingService(db)
     settings_dict = setting_service.get_settings_by_category(category)
     return settings_dict
-
-@router.put("/bulk-update")
-def bulk_update_settings(
-    settings: Dict[str, str],
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
-) -> Any:
-    """
-    Update multiple settings at once.
-    """
-    setting_service = SettingService(db)
-    updated = setting_service.bulk_update_settings(settings)
-    return {"updated": updated}
\ No newline at end of file
@@ -0,0 +1,124 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_admin
+from app.schemas.sms_campaign import SMSCampaignCreate, SMSCampaignProgress, SMSCampaignResponse
+from app.services.agent_service import AgentService
+from app.services.principal_cache import Principal
+from app.services.sms_campaign_service import SMSCampaignService
+from app.services.sms_service import sms_outbox
+
+router = APIRouter()
+
+@router.get("/metrics")
+def get_sms_metrics(
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Retrieve SMS outbox counters and per-provider latency and error metrics.
+    """
+    return sms_outbox.metrics()
+
+@router.get("/campaigns", response_model=List[SMSCampaignResponse])
+def get_campaigns(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Retrieve SMS campaigns, newest first.
+    """
+    campaign_service = SMSCampaignService(db)
+    return campaign_service.get_campaigns(skip=skip, limit=limit)
+
+@router.post("/campaigns", response_model=SMSCampaignResponse)
+def create_campaign(
+    campaign_in: SMSCampaignCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Send an SMS to all users of an agent group, a role, or everyone.
+    """
+    if not sms_outbox.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="SMS service is not configured",
+        )
+    
+    if campaign_in.agent_group_id:
+        agent_service = AgentService(db)
+        if not agent_service.get_agent_group(campaign_in.agent_group_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Agent group not found",
+            )
+    
+    campaign_service = SMSCampaignService(db)
+    return campaign_service.create_campaign(campaign_in.dict(), created_by=current_user.id)
+
+@router.get("/campaigns/{campaign_id}", response_model=SMSCampaignProgress)
+def get_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Retrieve a campaign with the number of recipients in each delivery state.
+    """
+    campaign_service = SMSCampaignService(db)
+    campaign = campaign_service.get_campaign(campaign_id)
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found",
+        )
+    
+    progress = SMSCampaignResponse.model_validate(campaign).model_dump()
+    progress["recipients"] = campaign_service.get_recipient_counts(campaign_id)
+    return progress
+
+@router.post("/campaigns/{campaign_id}/cancel", response_model=SMSCampaignResponse)
+def cancel_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Stop sending a campaign. Recipients not yet sent stay pending.
+    """
+    campaign_service = SMSCampaignService(db)
+    try:
+        return campaign_service.cancel_campaign(campaign_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+@router.post("/campaigns/{campaign_id}/resume", response_model=SMSCampaignResponse)
+def resume_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """
+    Continue a cancelled campaign with its pending recipients.
+    """
+    if not sms_outbox.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="SMS service is not configured",
+        )
+    
+    campaign_service = SMSCampaignService(db)
+    try:
+        return campaign_service.resume_campaign(campaign_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
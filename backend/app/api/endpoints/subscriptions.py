@@ -5,12 +5,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user, get_current_admin
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.schemas.subscription import (
     SubscriptionCreate, 
     SubscriptionResponse, 
     SubscriptionUpdate
 )
+from app.services.principal_cache import Principal
 from app.services.subscription_service import SubscriptionService
 
 router = APIRouter()
@@ -23,7 +24,7 @@ def get_subscriptions(
     product_id: Optional[str] = None,
     agent_id: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Retrieve subscriptions.
@@ -32,7 +33,7 @@ def get_subscriptions(
     
     # If user is agent, only show their subscriptions
     if current_user.role == UserRole.AGENT:
-        agent_id = current_user.agent.id
+        agent_id = current_user.agent_id
     
     subscriptions = subscription_service.get_subscriptions(
         skip=skip, 
@@ -47,7 +48,7 @@ def get_subscriptions(
 def create_subscription(
     subscription_in: SubscriptionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Create new subscription.
@@ -56,7 +57,7 @@ def create_subscription(
     
     # If user is agent, force agent_id to be current user's agent id
     if current_user.role == UserRole.AGENT:
-        subscription_in.agent_id = current_user.agent.id
+        subscription_in.agent_id = current_user.agent_id
     
     subscription = subscription_service.create_subscription(subscription_in, current_user)
     return subscription
@@ -65,7 +66,7 @@ def create_subscription(
 def get_subscription(
     subscription_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Get subscription by ID.
@@ -80,7 +81,7 @@ def get_subscription(
     
     # Check if user has access to this subscription
     if (current_user.role == UserRole.AGENT and 
-        current_user.agent.id != subscription.agent_id):
+        current_user.agent_id != subscription.agent_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
@@ -93,7 +94,7 @@ def update_subscription(
     subscription_id: str,
     subscription_in: SubscriptionUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Update a subscription.
@@ -108,7 +109,7 @@ def update_subscription(
     
     # Check if user has access to update this subscription
     if (current_user.role == UserRole.AGENT and 
-        current_user.agent.id != subscription.agent_id):
+        current_user.agent_id != subscription.agent_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
@@ -121,7 +122,7 @@ def update_subscription(
 def activate_subscription(
     subscription_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Activate a subscription.
@@ -136,7 +137,7 @@ def activate_subscription(
     
     # Check if user has access to activate this subscription
     if (current_user.role == UserRole.AGENT and 
-        current_user.agent.id != subscription.agent_id):
+        current_user.agent_id != subscription.agent_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
@@ -155,7 +156,7 @@ def activate_subscription(
 def suspend_subscription(
     subscription_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """
     Suspend a subscription.
@@ -0,0 +1,31 @@
+import threading
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+_redis_client: Optional[redis.Redis] = None
+_redis_lock = threading.Lock()
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Process-wide Redis client backed by one connection pool.
+    Returns None when Redis is not configured.
+    """
+    global _redis_client
+    if _redis_client is None and settings.REDIS_HOST:
+        with _redis_lock:
+            if _redis_client is None:
+                pool = redis.ConnectionPool(
+                    host=settings.REDIS_HOST,
+                    port=int(settings.REDIS_PORT),
+                    db=settings.REDIS_DB,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    decode_responses=True,
+                    socket_timeout=1,
+                    socket_connect_timeout=1,
+                )
+                _redis_client = redis.Redis(connection_pool=pool)
+    return _redis_client
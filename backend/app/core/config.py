@@ -8,7 +8,29 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str
     ALGORITHM: str
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    TOKEN_VERSION_CACHE_TTL: int = 300  # ثانیه
+    
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # هش‌های با هزینه متفاوت هنگام ورود دوباره ساخته می‌شوند
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32  # درخواست‌های بیشتر فوراً رد می‌شوند
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 2.0  # ثانیه
+    
+    # Activity log (buffered, bulk-inserted in the background)
+    ACTIVITY_LOG_BATCH_SIZE: int = 500
+    ACTIVITY_LOG_FLUSH_INTERVAL: float = 1.0  # ثانیه
+    ACTIVITY_LOG_QUEUE_SIZE: int = 10000  # در صورت پر شدن، مستقیماً نوشته می‌شود
+    ACTIVITY_LOG_QUERY_DAYS: int = 31  # بازه پیش‌فرض جستجو وقتی since داده نشود
+    
+    # Last login times are buffered and written in one UPDATE per interval
+    LAST_LOGIN_FLUSH_INTERVAL: float = 5.0  # ثانیه
+    
+    # Settings are read from an in-process snapshot refreshed on change (NOTIFY)
+    SETTINGS_CACHE_TTL: int = 300  # ثانیه؛ سقف کهنگی در صورت از دست رفتن اعلان
+    CATALOG_CACHE_TTL: int = 300  # ثانیه؛ کاتالوگ محصولات و گروه‌ها
+    PRICE_MATRIX_CACHE_TTL: int = 300  # ثانیه؛ ماتریس قیمت نماینده/محصول
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = []
@@ -43,12 +65,70 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB') or ''}",
         )
     
+    # Redis (optional, shared cache across workers)
+    REDIS_HOST: Optional[str] = None
+    REDIS_PORT: str = "6379"
+    REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 50
+    
+    # Notification stream: "postgres" (LISTEN/NOTIFY, multi-process) or "memory" (single process)
+    NOTIFICATION_STREAM_BACKEND: str = "postgres"
+    NOTIFICATION_STREAM_HEARTBEAT: int = 15
+    
+    # Notification retention
+    NOTIFICATION_HOT_DAYS: int = 90  # بازه‌ای که در لیست اعلان‌ها نمایش داده می‌شود
+    NOTIFICATION_RETENTION_DAYS: int = 180  # اعلان‌های خوانده‌شده قدیمی‌تر از این بایگانی می‌شوند
+    NOTIFICATION_ARCHIVE_BATCH_SIZE: int = 1000
+    
     # Upload directory
     UPLOAD_DIR: str = "/app/uploads"
     
+    # Product import/export (CSV/JSON)
+    PRODUCT_IMPORT_MAX_ROWS: int = 5000  # حداکثر ردیف در هر فایل ورودی
+    PRODUCT_EXPORT_BATCH_SIZE: int = 1000  # تعداد ردیف خوانده‌شده از پایگاه داده در هر مرحله
+    
+    # Bulk agent onboarding (CSV)
+    AGENT_IMPORT_MAX_ROWS: int = 5000  # حداکثر ردیف در هر فایل
+    AGENT_IMPORT_HASH_WORKERS: Optional[int] = None  # تعداد پردازه‌های هش رمز عبور؛ پیش‌فرض: تعداد هسته‌ها
+    AGENT_IMPORT_HASH_CHUNK: int = 50  # تعداد رمز در هر مرحله؛ پیشرفت پس از هر مرحله ثبت می‌شود
+    
     # SMS API
     SMS_API_URL: str
     SMS_API_KEY: str
+    SMS_SECONDARY_API_URL: Optional[str] = None  # سرویس‌دهنده پشتیبان در صورت خطای سرویس اصلی
+    SMS_SECONDARY_API_KEY: Optional[str] = None
+    SMS_BATCH_API_URL: Optional[str] = None  # ارسال گروهی، در صورت پشتیبانی سرویس‌دهنده
+    SMS_SECONDARY_BATCH_API_URL: Optional[str] = None
+    SMS_TIMEOUT: float = 5.0
+    SMS_SEND_RETRIES: int = 2
+    SMS_OUTBOX_SIZE: int = 10000
+    SMS_OUTBOX_CONCURRENCY: int = 10
+    SMS_CAMPAIGN_BATCH_SIZE: int = 100  # تعداد گیرنده در هر درخواست ارسال گروهی
+    SMS_CAMPAIGN_CONCURRENCY: int = 4  # تعداد دسته‌های در حال ارسال همزمان
+    
+    # Principal cache (کاربر احراز هویت شده)
+    PRINCIPAL_CACHE_TTL: int = 30  # ثانیه
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    
+    # OTP
+    OTP_EXPIRE_SECONDS: int = 300
+    OTP_MEMORY_MAX_ENTRIES: int = 100000
+    OTP_MOBILE_BURST: int = 3  # تعداد درخواست کد مجاز برای هر شماره در هر دوره
+    OTP_MOBILE_PERIOD: int = 600  # ثانیه
+    OTP_IP_BURST: int = 20  # تعداد درخواست کد مجاز برای هر IP در هر دوره
+    OTP_IP_PERIOD: int = 600  # ثانیه
+    OTP_VERIFY_MAX_ATTEMPTS: int = 5  # تلاش مجاز برای وارد کردن کد
+    OTP_THROTTLE_MAX_KEYS: int = 100000
+    
+    # Telegram
+    TELEGRAM_BOT_TOKEN: Optional[str] = None
+    TELEGRAM_API_URL: str = "https://api.telegram.org"
+    TELEGRAM_BATCH_SIZE: int = 100
+    TELEGRAM_POLL_INTERVAL: float = 5.0
+    TELEGRAM_GLOBAL_RATE: float = 30.0  # پیام در ثانیه برای کل ربات
+    TELEGRAM_PER_CHAT_RATE: float = 1.0  # پیام در ثانیه برای هر چت
+    TELEGRAM_SEND_RETRIES: int = 3
+    TELEGRAM_MAX_ATTEMPTS: int = 5
     
     # First SuperAdmin
     FIRST_SUPERADMIN_MOBILE: str
@@ -3,14 +3,16 @@ from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from typing import Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 class VestaException(Exception):
-    def __init__(self, message: str, status_code: int = 400):
+    def __init__(self, message: str, status_code: int = 400, headers: Optional[Dict[str, str]] = None):
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(self.message)
 
 async def vesta_exception_handler(request: Request, exc: VestaException):
@@ -20,7 +22,8 @@ async def vesta_exception_handler(request: Request, exc: VestaException):
             "success": False,
             "message": exc.message,
             "error_code": "VESTA_ERROR"
-        }
+        },
+        headers=exc.headers
     )
 
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
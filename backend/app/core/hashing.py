@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.metrics import LatencyWindow
+from app.core.security import pwd_context
+
+
+class PasswordHashingBusy(Exception):
+    """The hashing queue is full, or a job waited longer than the queue timeout"""
+
+
+class PasswordHasher:
+    """
+    bcrypt on a small dedicated thread pool, so login bursts queue here instead
+    of occupying the request threadpool. Excess work is refused immediately
+    (queue full) or skipped once it has waited past the queue timeout.
+    """
+
+    def __init__(
+        self,
+        context: CryptContext = pwd_context,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        self.context = context
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_pending = max_pending or settings.PASSWORD_HASH_MAX_PENDING
+        self.queue_timeout = queue_timeout or settings.PASSWORD_HASH_QUEUE_TIMEOUT
+
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.queue_wait = LatencyWindow()
+        self.hash_time = LatencyWindow()
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password. On success with outdated hash parameters (scheme or
+        cost, see `CryptContext.needs_update`) also returns a fresh hash to store.
+        """
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    def hash_blocking(self, password: str) -> str:
+        """`hash` for synchronous code already running on a worker thread"""
+        return self._submit(self.context.hash, (password,)).result()
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.wrap_future(self._submit(func, args))
+
+    def _submit(self, func: Callable[..., Any], args: Tuple[Any, ...]) -> Future:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_pending:
+                self.rejected += 1
+                raise PasswordHashingBusy()
+            self._in_flight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        try:
+            future = self._executor.submit(self._job, func, args, time.monotonic())
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Optional[Future] = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _job(self, func: Callable[..., Any], args: Tuple[Any, ...], enqueued_at: float) -> Any:
+        started = time.monotonic()
+        self.queue_wait.record(started - enqueued_at)
+        if started - enqueued_at > self.queue_timeout:
+            # The caller has likely given up; do not burn CPU on it
+            with self._lock:
+                self.timed_out += 1
+            raise PasswordHashingBusy()
+        try:
+            return func(*args)
+        finally:
+            self.hash_time.record(time.monotonic() - started)
+            with self._lock:
+                self.completed += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            **self.queue_wait.summary("queue_wait"),
+            **self.hash_time.summary("hash_time"),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,43 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+LATENCY_WINDOW = 500
+
+
+class LatencyWindow:
+    """The most recent durations (in seconds) with percentiles for metrics endpoints"""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=size)
+        # Copying a deque while another thread appends raises RuntimeError
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """The p-th percentile (0..1) in milliseconds, None before any sample"""
+        return self._percentile(self._snapshot(), p)
+
+    def summary(self, prefix: str) -> Dict[str, Optional[float]]:
+        # One snapshot so the three figures describe the same samples
+        samples = self._snapshot()
+        return {
+            f"{prefix}_p50_ms": self._percentile(samples, 0.5),
+            f"{prefix}_p95_ms": self._percentile(samples, 0.95),
+            f"{prefix}_max_ms": self._percentile(samples, 1.0),
+        }
+
+    def _snapshot(self) -> List[float]:
+        with self._lock:
+            samples = list(self._samples)
+        samples.sort()
+        return samples
+
+    @staticmethod
+    def _percentile(samples: List[float], p: float) -> Optional[float]:
+        if not samples:
+            return None
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Broker:
+    """
+    In-process pub/sub of per-user events for the stream endpoints.
+
+    Every open stream owns a small queue; publishing is a dict lookup plus
+    `put_nowait` per subscriber of the target users, so idle connections cost
+    nothing but their queue. Slow consumers lose events instead of blocking
+    publishers.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Remember the event loop that owns the subscriber queues"""
+        self._loop = loop
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, user_ids: Iterable[str], event: Dict[str, Any]) -> None:
+        """Deliver an event to the local subscribers of the given users. Must run on the bound loop."""
+        for user_id in user_ids:
+            for queue in self._subscribers.get(user_id, ()):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    logger.debug("Dropping event for slow subscriber of %s", user_id)
+
+    def publish_threadsafe(self, user_ids: Iterable[str], event: Dict[str, Any]) -> None:
+        """Like publish, but callable from any thread"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self.publish, list(user_ids), event)
+
+
+notification_broker = Broker()
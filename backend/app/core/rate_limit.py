@@ -0,0 +1,44 @@
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens are added per second up to `capacity`.
+    Not thread-safe; callers sharing a bucket across threads must lock around it.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def consume(self, tokens: float = 1) -> float:
+        """
+        Take `tokens` from the bucket.
+        Returns 0 on success, otherwise the seconds to wait before they are available
+        (nothing is taken in that case).
+        """
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    def refund(self, tokens: float = 1) -> None:
+        """Give back tokens taken by a request that was rejected further along"""
+        self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def is_full(self) -> bool:
+        """True when the bucket has refilled completely and can be discarded"""
+        self._refill()
+        return self.tokens >= self.capacity
@@ -1,30 +1,53 @@
 pythonfrom datetime import datetime, timedelta
 from typing import Any, Dict, Optional, Union
 import random
+import secrets
 import string
+import threading
+import time
 
 from jose import jwt
 from passlib.context import CryptContext
+from sqlalchemy import BigInteger, String, cast, func, literal
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max to the default makes needs_update flag any other cost, up or down
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None
 ) -> str:
+    """
+    `claims` (role, agent_id, ver) let requests be authorized from the token
+    alone; the token version is checked against the revocation store.
+    """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject), "type": "access"}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+def create_refresh_token(subject: Union[str, Any], version: int) -> str:
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {"exp": expire, "sub": str(subject), "ver": version, "type": "refresh"}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -38,7 +61,46 @@ def generate_otp(length: int = 6) -> str:
     return ''.join(random.choices(string.digits, k=length))
 
 
-def generate_id(prefix: str, length: int = 10) -> str:
-    """Generate a unique ID with a prefix."""
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
-    return f"{prefix}-{random_part}"
\ No newline at end of file
+# generate_id state: the last timestamp and random part handed out by this process
+_ID_RANDOM_BITS = 56
+_id_lock = threading.Lock()
+_last_id_ms = 0
+_last_id_random = 0
+
+
+def generate_id(prefix: str) -> str:
+    """
+    Generate a unique, time-ordered ID with a prefix, e.g. SUB-0192A4F3C2B17F3A9C04D2E1B6.
+
+    Like UUIDv7: 12 hex digits of Unix time in milliseconds followed by 14
+    random hex digits from `secrets`. New rows are appended at the right
+    edge of primary key indexes and sorting by ID follows creation order.
+    """
+    global _last_id_ms, _last_id_random
+    with _id_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_id_ms:
+            _last_id_ms = now_ms
+            _last_id_random = secrets.randbits(_ID_RANDOM_BITS)
+        else:
+            # Same millisecond (or the clock stepped back): keep increasing from the last ID
+            _last_id_random += 1 + secrets.randbelow(1 << 16)
+            if _last_id_random >> _ID_RANDOM_BITS:
+                _last_id_ms += 1
+                _last_id_random = secrets.randbits(_ID_RANDOM_BITS)
+        return f"{prefix}-{_last_id_ms:012X}{_last_id_random:014X}"
+
+
+def generate_id_sql(prefix: str) -> Any:
+    """
+    SQL expression producing IDs shaped like generate_id(prefix),
+    for statements that create rows server-side (INSERT ... SELECT).
+    """
+    now_ms = cast(func.floor(func.extract("epoch", func.clock_timestamp()) * 1000), BigInteger)
+    time_part = func.lpad(func.to_hex(now_ms), 12, "0")
+    # The first 12 hex digits of a v4 UUID are all random; take 12 + 2 of two UUIDs
+    random_part = func.concat(
+        func.substr(func.replace(cast(func.gen_random_uuid(), String), "-", ""), 1, 12),
+        func.substr(cast(func.gen_random_uuid(), String), 1, 2)
+    )
+    return literal(f"{prefix}-") + func.upper(func.concat(time_part, random_part), type_=String)
@@ -39,4 +39,32 @@ def format_mobile(mobile: str) -> Optional[str]:
     if re.match(pattern, mobile):
         return mobile
     
-    return None
\ No newline at end of file
+    return None
+
+
+# Search normalization: Arabic ye/kaf/heh to their Persian forms, ZWNJ to a
+# space, Persian and Arabic-Indic digits to ASCII; diacritics and tatweel are
+# dropped. Shared by the users.search_text column and search queries, so both
+# sides of a match are normalized the same way.
+SEARCH_CHARS_FROM = "\u064a\u0649\u0643\u06c0\u0629\u200c\u06f0\u06f1\u06f2\u06f3\u06f4\u06f5\u06f6\u06f7\u06f8\u06f9\u0660\u0661\u0662\u0663\u0664\u0665\u0666\u0667\u0668\u0669"
+SEARCH_CHARS_TO = "\u06cc\u06cc\u06a9\u0647\u0647 01234567890123456789"
+SEARCH_CHARS_DELETE = "\u064b\u064c\u064d\u064e\u064f\u0650\u0651\u0652\u0640"
+_SEARCH_TRANSLATION = str.maketrans(SEARCH_CHARS_FROM, SEARCH_CHARS_TO, SEARCH_CHARS_DELETE)
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Normalize text for search: lowercase, unify Persian/Arabic letters and
+    digits, and collapse whitespace.
+    """
+    return " ".join(text.lower().translate(_SEARCH_TRANSLATION).split())
+
+
+def search_text_sql(*columns: str) -> str:
+    """
+    SQL expression equivalent to normalize_search_text over the given columns
+    joined by spaces (immutable, so usable in a generated column).
+    """
+    joined = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    translated = f"translate(lower({joined}), '{SEARCH_CHARS_FROM}{SEARCH_CHARS_DELETE}', '{SEARCH_CHARS_TO}')"
+    return f"btrim(regexp_replace({translated}, '\\s+', ' ', 'g'))"
\ No newline at end of file
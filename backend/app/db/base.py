@@ -26,4 +26,7 @@ from app.models.transaction import Transaction
 from app.models.payment import Payment
 from app.models.notification import Notification
 from app.models.setting import Setting
-from app.models.activity_log import ActivityLog
\ No newline at end of file
+from app.models.activity_log import ActivityLog
+from app.models.sms_campaign import SMSCampaign, SMSCampaignRecipient
+from app.models.product_price import ProductPriceOverride
+from app.models.agent_import import AgentImportJob
\ No newline at end of file
@@ -0,0 +1,111 @@
+import logging
+import select
+import threading
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.session import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 5
+POLL_TIMEOUT = 5
+
+
+def pg_notify(db: Session, channel: str, payloads: List[str]) -> None:
+    """
+    Queue NOTIFY messages on the current transaction in one round trip.
+    PostgreSQL delivers them on commit and drops them on rollback.
+    """
+    if not payloads:
+        return
+    db.execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+        {"channel": channel, "payloads": payloads},
+    )
+
+
+class PgListener:
+    """
+    One background thread per process holding a dedicated connection that
+    LISTENs on the subscribed channels and hands every payload to its callbacks.
+    Callbacks run on the listener thread and must be quick and thread-safe.
+    """
+
+    def __init__(self, engine: Engine = default_engine):
+        self.engine = engine
+        self._callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        self._listening: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            self._callbacks.setdefault(channel, []).append(callback)
+
+    def start(self) -> None:
+        if self._thread or not self._callbacks:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=POLL_TIMEOUT + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("LISTEN connection lost, reconnecting in %ss", RECONNECT_DELAY)
+                self._stop.wait(RECONNECT_DELAY)
+
+    def _listen(self) -> None:
+        # A connection of its own, detached so it never returns to the pool
+        pooled = self.engine.raw_connection()
+        connection = pooled.driver_connection
+        pooled.detach()
+        connection.autocommit = True
+        self._listening = set()
+        try:
+            while not self._stop.is_set():
+                self._listen_new_channels(connection)
+
+                if select.select([connection], [], [], POLL_TIMEOUT) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    self._dispatch(notify.channel, notify.payload)
+        finally:
+            connection.close()
+
+    def _listen_new_channels(self, connection) -> None:
+        with self._lock:
+            channels = [channel for channel in self._callbacks if channel not in self._listening]
+        if not channels:
+            return
+        with connection.cursor() as cursor:
+            for channel in channels:
+                cursor.execute(f'LISTEN "{channel}"')
+                self._listening.add(channel)
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        with self._lock:
+            callbacks = list(self._callbacks.get(channel, ()))
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("NOTIFY handler for %s failed", channel)
+
+
+pg_listener = PgListener()
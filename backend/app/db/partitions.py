@@ -0,0 +1,111 @@
+import logging
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by month on created_at (see the alembic migrations)
+MONTHLY_PARTITIONED_TABLES = ("notifications", "activity_logs")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    return db.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ).scalar()
+
+
+def require_partitioned(db: Session, table: str) -> None:
+    """Refuse to maintain a table that was built before partitioning was declared"""
+    if not is_partitioned(db, table):
+        raise RuntimeError(
+            f"{table} is not a partitioned table; run 'alembic upgrade head' to convert it "
+            f"before running partition maintenance"
+        )
+
+
+def default_partition(db: Session, table: str) -> Optional[str]:
+    return db.execute(
+        text("SELECT partdefid::regclass::text FROM pg_partitioned_table "
+             "WHERE partrelid = to_regclass(:table) AND partdefid <> 0"),
+        {"table": table}
+    ).scalar()
+
+
+def ensure_monthly_partitions(db: Session, table: str, months_ahead: int = 3) -> List[str]:
+    """Create the partitions of `table` for the current month and the next `months_ahead` months"""
+    require_partitioned(db, table)
+    default = default_partition(db, table)
+    created = []
+    month = month_start(date.today())
+    for _ in range(months_ahead + 1):
+        name = partition_name(table, month)
+        exists = db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if not exists:
+            start, end = month.isoformat(), next_month(month).isoformat()
+            in_default = default and db.execute(text(
+                f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= '{start}' AND created_at < '{end}')"
+            )).scalar()
+            if in_default:
+                moved = _create_partition_from_default(db, table, default, name, start, end)
+                logger.info("Moved %s rows of %s from %s into %s", moved, table, default, name)
+            else:
+                db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"))
+            created.append(name)
+        month = next_month(month)
+
+    db.commit()
+    return created
+
+
+def _create_partition_from_default(db: Session, table: str, default: str, name: str, start: str, end: str) -> int:
+    """
+    CREATE TABLE ... PARTITION OF fails while the default partition holds rows
+    of the new range, so build the partition on its own, move those rows into
+    it and attach it. The default partition stays locked until commit so no
+    new rows of the range can land there in between.
+    """
+    db.execute(text(f"LOCK TABLE {default} IN ACCESS EXCLUSIVE MODE"))
+    db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    moved = db.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {default} WHERE created_at >= '{start}' AND created_at < '{end}'
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """)).rowcount
+    db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    return moved
+
+
+def run_partition_maintenance():
+    """Entry point for cron: python -m app.db.partitions"""
+    db = SessionLocal()
+    try:
+        for table in MONTHLY_PARTITIONED_TABLES:
+            created = ensure_monthly_partitions(db, table)
+            logger.info("Partitions of %s: created %s", table, created)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_partition_maintenance()
@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.db.session import engine as default_engine
+
+
+@dataclass
+class QueryCount:
+    """SQL statements executed inside a count_queries block"""
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(bind: Optional[Engine] = None) -> Iterator[QueryCount]:
+    """
+    Record every statement `bind` (the app engine by default) executes inside
+    the block, e.g. to find N+1 loads behind an endpoint.
+    """
+    bind = bind or default_engine
+    counter = QueryCount()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield counter
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+@contextmanager
+def assert_max_queries(limit: int, bind: Optional[Engine] = None) -> Iterator[QueryCount]:
+    """
+    Fail if the block executes more than `limit` statements. For tests:
+
+        with assert_max_queries(3):
+            client.get("/api/v1/agents/?limit=100")
+    """
+    with count_queries(bind) as counter:
+        yield counter
+    if counter.count > limit:
+        executed = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise AssertionError(f"Expected at most {limit} queries, {counter.count} executed:\n{executed}")
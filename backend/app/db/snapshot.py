@@ -0,0 +1,94 @@
+import abc
+import threading
+import time
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db.listener import pg_notify
+from app.db.session import SessionLocal
+
+T = TypeVar("T")
+
+
+class SnapshotCache(abc.ABC, Generic[T]):
+    """
+    Rarely changing data held as one immutable snapshot per process, so reads
+    never touch the database.
+
+    `invalidate` (on commit locally, via NOTIFY elsewhere; see
+    `invalidate_on_commit`) bumps a version and the next read builds a new
+    snapshot with `_load` and swaps it in whole. A change notified during a
+    load leaves the new snapshot stale, so it is never lost. `ttl` bounds
+    staleness if a notification is missed, e.g. while the listener reconnects.
+    """
+
+    def __init__(self, ttl: int, session_factory: Callable[[], Session] = SessionLocal):
+        self.ttl = ttl
+        self.session_factory = session_factory
+        self._current: Optional[Tuple[int, T]] = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _load(self, db: Session) -> T:
+        """Build a new snapshot"""
+
+    def snapshot(self) -> T:
+        current = self._current
+        if not self._is_fresh(current):
+            return self.reload()
+        return current[1]
+
+    def invalidate(self, payload: Optional[str] = None) -> None:
+        """Make the next read build a new snapshot. Also the NOTIFY callback."""
+        with self._version_lock:
+            self._version += 1
+
+    def reload(self) -> T:
+        with self._reload_lock:
+            # Another thread may have reloaded while this one waited
+            current = self._current
+            if self._is_fresh(current):
+                return current[1]
+
+            version = self._version
+            db = self.session_factory()
+            try:
+                snapshot = self._load(db)
+            finally:
+                db.close()
+            self._current = (version, snapshot)
+            self._loaded_at = time.monotonic()
+            return snapshot
+
+    def _is_fresh(self, current: Optional[Tuple[int, T]]) -> bool:
+        return (
+            current is not None
+            and current[0] == self._version
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+
+def invalidate_on_commit(db: Session, channel: str, cache: SnapshotCache) -> None:
+    """
+    Refresh `cache` in every process once `db` commits: this one right after
+    the commit, the others through NOTIFY on `channel`. Call before committing.
+    A rollback discards both, so the cache keeps its snapshot.
+    """
+    pg_notify(db, channel, ["changed"])
+    rolled_back = False
+
+    def invalidate(session: Session) -> None:
+        if not rolled_back:
+            cache.invalidate()
+
+    def discard(session: Session) -> None:
+        nonlocal rolled_back
+        rolled_back = True
+
+    event.listen(db, "after_commit", invalidate, once=True)
+    event.listen(db, "after_rollback", discard, once=True)
@@ -1,12 +1,29 @@
 pythonfrom fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
 
 from app.core.config import settings
+from app.core.exceptions import VestaException, vesta_exception_handler
+from app.core.hashing import password_hasher
 from app.api.api import api_router
 from app.db.base import Base
+from app.core.pubsub import notification_broker
+from app.db.listener import pg_listener
 from app.db.session import engine
+from app.services.activity_log_writer import activity_log_writer
+from app.services.agent_importer import agent_importer
+from app.services.last_login_buffer import last_login_buffer
+from app.services.catalog_cache import CATALOG_CHANNEL, catalog_cache
+from app.services.notification_stream import USER_EVENTS_CHANNEL, dispatch_user_event
+from app.services.price_matrix import PRICES_CHANNEL, price_matrix
+from app.services.principal_cache import PRINCIPAL_CHANNEL, principal_cache
+from app.services.setting_cache import SETTINGS_CHANNEL, setting_cache
+from app.services.sms_campaign_sender import sms_campaign_sender
+from app.services.sms_service import sms_outbox
+from app.services.telegram_worker import telegram_worker
+from app.services.token_versions import TOKEN_VERSION_CHANNEL, token_versions
 
 app = FastAPI(
     title="VestaResellerPanel API",
@@ -33,9 +50,44 @@ app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
 
+# Service errors carry their own status code (e.g. 429 from OTP throttling)
+app.add_exception_handler(VestaException, vesta_exception_handler)
+
 # API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Background workers
+@app.on_event("startup")
+async def start_background_workers():
+    telegram_worker.start()
+    activity_log_writer.start()
+    last_login_buffer.start()
+    sms_outbox.start()
+    sms_campaign_sender.start()
+    
+    notification_broker.bind(asyncio.get_running_loop())
+    if settings.NOTIFICATION_STREAM_BACKEND == "postgres":
+        pg_listener.subscribe(USER_EVENTS_CHANNEL, dispatch_user_event)
+    pg_listener.subscribe(PRINCIPAL_CHANNEL, principal_cache.forget)
+    pg_listener.subscribe(TOKEN_VERSION_CHANNEL, token_versions.on_notify)
+    pg_listener.subscribe(SETTINGS_CHANNEL, setting_cache.invalidate)
+    pg_listener.subscribe(CATALOG_CHANNEL, catalog_cache.invalidate)
+    pg_listener.subscribe(PRICES_CHANNEL, price_matrix.invalidate)
+    pg_listener.start()
+    await asyncio.to_thread(setting_cache.reload)
+    await asyncio.to_thread(agent_importer.recover_stale_jobs)
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await telegram_worker.stop()
+    await sms_campaign_sender.stop()
+    await sms_outbox.stop()
+    await asyncio.to_thread(pg_listener.stop)
+    await asyncio.to_thread(activity_log_writer.stop)
+    await asyncio.to_thread(last_login_buffer.stop)
+    password_hasher.shutdown()
+    agent_importer.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to VestaResellerPanel API"}
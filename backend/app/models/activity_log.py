@@ -1,4 +1,4 @@
-pythonfrom sqlalchemy import Column, String, JSON, ForeignKey, DateTime
+pythonfrom sqlalchemy import Column, String, JSON, ForeignKey, DateTime, DDL, Index, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,8 +6,16 @@ from app.db.base import Base
 
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        # Both match the keyset order of the query API: created_at DESC, id DESC
+        Index("ix_activity_logs_user_created", "user_id", text("created_at DESC"), text("id DESC")),
+        Index("ix_activity_logs_entity", "entity_type", "entity_id", text("created_at DESC"), text("id DESC")),
+        # Monthly partitions on created_at, the same layout migration 0005 builds
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(String, primary_key=True, index=True)  # مثال: LOG-12345
+    # The primary key of a partitioned table must include the partition key
+    id = Column(String, primary_key=True)  # مثال: LOG-12345
     user_id = Column(String, ForeignKey("users.id"))
     action = Column(String)  # عمل انجام شده (مثلاً login, create_subscription)
     entity_type = Column(String, nullable=True)  # نوع موجودیت (مثلاً user, subscription)
@@ -15,7 +23,15 @@ class ActivityLog(Base):
     details = Column(JSON, nullable=True)  # جزئیات عملیات
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="activity_logs")
\ No newline at end of file
+    user = relationship("User", back_populates="activity_logs")
+
+
+# Rows outside every monthly partition land here until the partition job moves them
+event.listen(
+    ActivityLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS activity_logs_default PARTITION OF activity_logs DEFAULT")
+)
\ No newline at end of file
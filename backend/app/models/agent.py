@@ -24,4 +24,9 @@ class Agent(Base):
     user = relationship("User", back_populates="agent")
     groups = relationship("AgentGroup", secondary=agent_group_association, back_populates="agents")
     credits = relationship("Credit", back_populates="agent")
-    created_subscriptions = relationship("Subscription", back_populates="agent")
\ No newline at end of file
+    created_subscriptions = relationship("Subscription", back_populates="agent")
+
+    @property
+    def group_names(self):
+        """Names of the agent's groups (AgentResponse.group_names)"""
+        return [group.name for group in self.groups]
\ No newline at end of file
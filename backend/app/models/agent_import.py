@@ -0,0 +1,28 @@
+pythonfrom sqlalchemy import Column, String, Integer, Enum, Text, ForeignKey, DateTime, JSON
+from sqlalchemy.sql import func
+import enum
+
+from app.db.base import Base
+
+class AgentImportStatus(str, enum.Enum):
+    PENDING = "pending"  # در صف
+    RUNNING = "running"  # در حال پردازش
+    COMPLETED = "completed"  # انجام شده
+    FAILED = "failed"  # ناموفق؛ هیچ نماینده‌ای ایجاد نشده
+
+class AgentImportJob(Base):
+    __tablename__ = "agent_import_jobs"
+
+    id = Column(String, primary_key=True, index=True)  # مثال: IMP-12345
+    filename = Column(String, nullable=True)
+    status = Column(Enum(AgentImportStatus), default=AgentImportStatus.PENDING)
+    total_rows = Column(Integer, default=0)
+    processed_rows = Column(Integer, default=0)  # ردیف‌های بررسی و آماده‌شده، برای نمایش پیشرفت
+    created_count = Column(Integer, default=0)
+    skipped_count = Column(Integer, default=0)  # تکراری یا نامعتبر
+    report = Column(JSON, nullable=True)  # نتیجه هر ردیف، پس از پایان کار
+    error = Column(Text, nullable=True)
+    created_by = Column(String, ForeignKey("users.id"))
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
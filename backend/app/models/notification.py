@@ -1,4 +1,4 @@
-pythonfrom sqlalchemy import Column, String, Boolean, Enum, Text, ForeignKey, DateTime
+pythonfrom sqlalchemy import Column, String, Boolean, Integer, Enum, Text, ForeignKey, DateTime, DDL, Index, Table, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -11,16 +11,50 @@ class NotificationType(str, enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", text("created_at DESC")),
+        Index("ix_notifications_user_unread", "user_id", postgresql_where=text("NOT is_read")),
+        Index(
+            "ix_notifications_telegram_pending",
+            "created_at",
+            postgresql_where=text("send_to_telegram AND NOT is_sent_to_telegram")
+        ),
+        # Monthly partitions on created_at, the same layout migration 0002 builds
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(String, primary_key=True, index=True)  # مثال: NTF-12345
+    # The primary key of a partitioned table must include the partition key
+    id = Column(String, primary_key=True)  # مثال: NTF-12345
     user_id = Column(String, ForeignKey("users.id"))
     type = Column(Enum(NotificationType))
     title = Column(String)
     message = Column(Text)
     is_read = Column(Boolean, default=False)
+    send_to_telegram = Column(Boolean, default=False)  # آیا باید به تلگرام ارسال شود
     is_sent_to_telegram = Column(Boolean, default=False)
+    telegram_attempts = Column(Integer, default=0)  # تعداد تلاش‌های ارسال به تلگرام
+    telegram_next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # زمان تلاش بعدی
     related_id = Column(String, nullable=True)  # شناسه مرتبط (مثلاً شناسه پرداخت)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="notifications")
\ No newline at end of file
+    user = relationship("User", back_populates="notifications")
+
+
+# Rows outside every monthly partition land here until the partition job moves them
+event.listen(
+    Notification.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS notifications_default PARTITION OF notifications DEFAULT")
+)
+
+# Read notifications past the retention age, moved here by NotificationRetentionService
+notifications_archive = Table(
+    "notifications_archive",
+    Base.metadata,
+    *(
+        Column(column.name, column.type, primary_key=column.primary_key)
+        for column in Notification.__table__.columns
+    ),
+    Index("ix_notifications_archive_user_created", "user_id", text("created_at DESC"))
+)
\ No newline at end of file
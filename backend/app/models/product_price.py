@@ -0,0 +1,33 @@
+pythonfrom sqlalchemy import Column, String, Float, ForeignKey, DateTime, CheckConstraint, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+class ProductPriceOverride(Base):
+    __tablename__ = "product_price_overrides"
+    __table_args__ = (
+        # Exactly one target: an agent group or a single agent
+        CheckConstraint(
+            "(agent_group_id IS NULL) <> (agent_id IS NULL)",
+            name="ck_product_price_overrides_target"
+        ),
+        CheckConstraint(
+            "price IS NOT NULL OR commission_rate IS NOT NULL",
+            name="ck_product_price_overrides_value"
+        ),
+        UniqueConstraint("product_id", "agent_group_id", name="uq_product_price_overrides_group"),
+        UniqueConstraint("product_id", "agent_id", name="uq_product_price_overrides_agent"),
+    )
+
+    id = Column(String, primary_key=True, index=True)  # مثال: PRC-12345
+    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    agent_group_id = Column(String, ForeignKey("agent_groups.id", ondelete="CASCADE"), nullable=True)  # قیمت برای همه اعضای گروه
+    agent_id = Column(String, ForeignKey("agents.id", ondelete="CASCADE"), nullable=True)  # قیمت اختصاصی یک نماینده
+    price = Column(Float, nullable=True)  # قیمت ثابت؛ بر درصد کمیسیون مقدم است
+    commission_rate = Column(Float, nullable=True)  # درصد تخفیف از قیمت پایه محصول
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    product = relationship("Product")
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, String, Integer, Enum, Text, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+
+from app.db.base import Base
+from app.models.user import UserRole
+
+class SMSCampaignStatus(str, enum.Enum):
+    SENDING = "sending"  # در حال ارسال
+    COMPLETED = "completed"  # ارسال شده
+    CANCELLED = "cancelled"  # لغو شده
+
+class SMSRecipientStatus(str, enum.Enum):
+    PENDING = "pending"  # در صف ارسال
+    SENDING = "sending"  # تحویل سرویس‌دهنده شده، نتیجه ثبت نشده
+    SENT = "sent"  # ارسال شده
+    FAILED = "failed"  # ناموفق
+    UNKNOWN = "unknown"  # ارسال در زمان قطعی سرور؛ برای جلوگیری از ارسال تکراری دوباره ارسال نمی‌شود
+
+class SMSCampaign(Base):
+    __tablename__ = "sms_campaigns"
+
+    id = Column(String, primary_key=True, index=True)  # مثال: CMP-12345
+    title = Column(String)
+    message = Column(Text)
+    status = Column(Enum(SMSCampaignStatus), default=SMSCampaignStatus.SENDING)
+    agent_group_id = Column(String, ForeignKey("agent_groups.id"), nullable=True)  # فیلتر گروه نمایندگان
+    role = Column(Enum(UserRole), nullable=True)  # فیلتر نقش کاربر
+    total_recipients = Column(Integer, default=0)
+    created_by = Column(String, ForeignKey("users.id"))
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    recipients = relationship("SMSCampaignRecipient", back_populates="campaign", lazy="dynamic")
+
+class SMSCampaignRecipient(Base):
+    __tablename__ = "sms_campaign_recipients"
+    __table_args__ = (
+        # Claiming the next pending recipients of a campaign
+        Index("ix_sms_campaign_recipients_status", "campaign_id", "status"),
+    )
+
+    campaign_id = Column(String, ForeignKey("sms_campaigns.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    mobile = Column(String)
+    status = Column(Enum(SMSRecipientStatus), default=SMSRecipientStatus.PENDING)
+    provider = Column(String, nullable=True)  # سرویس‌دهنده‌ای که پیام را ارسال کرد
+    error = Column(String, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    campaign = relationship("SMSCampaign", back_populates="recipients")
@@ -1,8 +1,9 @@
-pythonfrom sqlalchemy import Boolean, Column, String, Integer, Enum, Text, ForeignKey, DateTime
+pythonfrom sqlalchemy import Boolean, Column, String, Integer, Enum, Text, ForeignKey, DateTime, Computed, DDL, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
+from app.core.utils import search_text_sql
 from app.db.base import Base
 
 class UserRole(str, enum.Enum):
@@ -12,6 +13,15 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Substring and fuzzy (similarity) search over search_text
+        Index(
+            "ix_users_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"}
+        ),
+    )
 
     id = Column(String, primary_key=True, index=True)  # مثال: USR-12345
     username = Column(String, unique=True, index=True)
@@ -30,6 +40,11 @@ class User(Base):
     telegram_id = Column(String, nullable=True)
     whatsapp = Column(String, nullable=True)
     last_login = Column(DateTime(timezone=True), nullable=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # با هر ابطال توکن‌ها افزایش می‌یابد
+    search_text = Column(
+        Text,
+        Computed(search_text_sql("first_name", "last_name", "mobile", "email", "business_name"), persisted=True)
+    )  # متن نرمال‌شده برای جستجو (ی/ک عربی، نیم‌فاصله، ارقام فارسی)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -38,4 +53,8 @@ class User(Base):
     activity_logs = relationship("ActivityLog", back_populates="user")
     subscriptions = relationship("Subscription", back_populates="customer")
     notifications = relationship("Notification", back_populates="user")
-    payments = relationship("Payment", foreign_keys="[Payment.user_id]", back_populates="user")
\ No newline at end of file
+    payments = relationship("Payment", foreign_keys="[Payment.user_id]", back_populates="user")
+
+
+# The trigram index needs pg_trgm; migration 0007 does the same for existing databases
+event.listen(User.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
\ No newline at end of file
@@ -0,0 +1,24 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class ActivityLogResponse(BaseModel):
+    id: str
+    user_id: Optional[str] = None
+    action: str
+    entity_type: Optional[str] = None
+    entity_id: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ActivityLogPage(BaseModel):
+    items: List[ActivityLogResponse]
+    # Pass back as `cursor` to get the next page; null on the last page
+    next_cursor: Optional[str] = None
@@ -1,4 +1,5 @@
 pythonfrom typing import Optional, List
+from datetime import datetime
 from pydantic import BaseModel
 
 from app.schemas.user import UserResponse
@@ -21,8 +22,8 @@ class AgentResponse(BaseModel):
     id: str
     user: UserResponse
     group_names: List[str] = []
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,40 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, EmailStr
+
+from app.models.agent_import import AgentImportStatus
+
+
+class AgentImportRow(BaseModel):
+    """One CSV row; `groups` lists agent group ids or names separated by ';'"""
+    mobile: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    business_name: Optional[str] = None
+    province: Optional[str] = None
+    city: Optional[str] = None
+    password: Optional[str] = None
+    groups: Optional[str] = None
+
+
+class AgentImportJobResponse(BaseModel):
+    id: str
+    filename: Optional[str] = None
+    status: AgentImportStatus
+    total_rows: int
+    processed_rows: int
+    created_count: int
+    skipped_count: int
+    error: Optional[str] = None
+    created_by: str
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class AgentImportJobReport(AgentImportJobResponse):
+    # Per row: {"row", "mobile", "status": created | exists | duplicate | invalid, "agent_id" or "error"}
+    report: Optional[List[Dict[str, Any]]] = None
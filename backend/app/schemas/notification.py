@@ -3,6 +3,7 @@ from datetime import datetime
 from pydantic import BaseModel
 
 from app.models.notification import NotificationType
+from app.models.user import UserRole
 
 
 class NotificationBase(BaseModel):
@@ -25,4 +26,20 @@ class NotificationResponse(NotificationBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class NotificationBroadcast(BaseModel):
+    title: str
+    message: str
+    type: NotificationType = NotificationType.SYSTEM
+    related_id: Optional[str] = None
+    send_to_telegram: bool = False
+    # Recipients: members of an agent group and/or users with a role; all users if both are empty
+    agent_group_id: Optional[str] = None
+    role: Optional[UserRole] = None
+    active_only: bool = True
+
+
+class NotificationBroadcastResponse(BaseModel):
+    recipients: int
\ No newline at end of file
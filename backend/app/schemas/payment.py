@@ -1,6 +1,6 @@
-pythonfrom typing import Optional
+pythonfrom typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.models.payment import PaymentMethod, PaymentStatus
 
@@ -24,6 +24,18 @@ class PaymentApproveReject(BaseModel):
     admin_note: Optional[str] = None
 
 
+class PaymentBatchApproveReject(BaseModel):
+    payment_ids: List[str] = Field(..., min_length=1, max_length=500)
+    admin_note: Optional[str] = None
+
+
+class PaymentBatchResult(BaseModel):
+    payment_id: str
+    success: bool
+    status: Optional[PaymentStatus] = None
+    message: Optional[str] = None
+
+
 class PaymentResponse(PaymentBase):
     id: str
     user_id: str
@@ -0,0 +1,29 @@
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class PriceOverrideBase(BaseModel):
+    # A fixed price, or a commission/discount percentage applied to the product price
+    price: Optional[float] = Field(None, ge=0)
+    commission_rate: Optional[float] = Field(None, ge=0, le=100)
+
+
+class PriceOverrideCreate(PriceOverrideBase):
+    product_id: str
+    # Exactly one of the two
+    agent_group_id: Optional[str] = None
+    agent_id: Optional[str] = None
+
+
+class PriceOverrideUpdate(PriceOverrideBase):
+    pass
+
+
+class PriceOverrideResponse(PriceOverrideCreate):
+    id: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,4 +1,4 @@
-pythonfrom typing import Optional, List
+pythonfrom typing import Any, Dict, Optional, List
 from pydantic import BaseModel
 
 from app.models.product import ProductType, DurationType
@@ -34,8 +34,30 @@ class ProductUpdate(ProductBase):
 class ProductResponse(ProductBase):
     id: str
     group_name: str
+    # The requesting agent's price (price matrix); absent for admins
+    agent_price: Optional[float] = None
     created_at: str
     updated_at: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ProductImportRow(ProductUpdate):
+    # Rows with the id of an existing product update only the fields they contain;
+    # other rows create products and must carry what ProductCreate requires
+    id: Optional[str] = None
+
+
+class ProductChange(BaseModel):
+    id: str
+    name: str
+    # field -> [old value, new value]
+    changes: Dict[str, List[Any]]
+
+
+class ProductImportResult(BaseModel):
+    dry_run: bool
+    created: List[ProductChange]
+    updated: List[ProductChange]
+    unchanged: int
\ No newline at end of file
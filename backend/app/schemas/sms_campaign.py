@@ -0,0 +1,36 @@
+from typing import Optional, Dict
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+from app.models.sms_campaign import SMSCampaignStatus
+from app.models.user import UserRole
+
+
+class SMSCampaignCreate(BaseModel):
+    title: str
+    message: str = Field(..., min_length=1)
+    # Recipients: members of an agent group and/or users with a role; all users if both are empty
+    agent_group_id: Optional[str] = None
+    role: Optional[UserRole] = None
+    active_only: bool = True
+
+
+class SMSCampaignResponse(BaseModel):
+    id: str
+    title: str
+    message: str
+    status: SMSCampaignStatus
+    agent_group_id: Optional[str] = None
+    role: Optional[UserRole] = None
+    total_recipients: int
+    created_by: str
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SMSCampaignProgress(SMSCampaignResponse):
+    # Recipients per delivery state: pending, sending, sent, failed, unknown
+    recipients: Dict[str, int]
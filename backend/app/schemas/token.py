@@ -1,11 +1,22 @@
 pythonfrom typing import Optional
 from pydantic import BaseModel
 
+from app.models.user import UserRole
+
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 
 class TokenPayload(BaseModel):
-    sub: Optional[str] = None
\ No newline at end of file
+    sub: Optional[str] = None
+    type: Optional[str] = None
+    role: Optional[UserRole] = None
+    agent_id: Optional[str] = None
+    ver: Optional[int] = None
+
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
\ No newline at end of file
@@ -1,4 +1,5 @@
 pythonfrom typing import Optional, List
+from datetime import datetime
 from pydantic import BaseModel, EmailStr
 
 from app.models.user import UserRole
@@ -31,8 +32,8 @@ class UserUpdate(UserBase):
 class UserResponse(UserBase):
     id: str
     username: str
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,80 @@
+import base64
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.activity_log import ActivityLog
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(log: ActivityLog) -> str:
+    """Opaque keyset cursor: the (created_at, id) of the last entry on a page"""
+    raw = f"{log.created_at.isoformat()}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), log_id
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+class ActivityLogService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search_logs(
+        self,
+        user_id: Optional[str] = None,
+        action: Optional[str] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[ActivityLog], Optional[str]]:
+        """
+        Activity logs newest first, one keyset page at a time. Returns the page
+        and the cursor for the next one (None on the last page).
+        """
+        if entity_id and not entity_type:
+            raise ValueError("entity_id requires entity_type")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        # Constant bounds on created_at let PostgreSQL skip the other monthly partitions
+        if since is None:
+            since = datetime.now() - timedelta(days=settings.ACTIVITY_LOG_QUERY_DAYS)
+        query = select(ActivityLog).where(ActivityLog.created_at >= since)
+        if until is not None:
+            query = query.where(ActivityLog.created_at < until)
+        if cursor:
+            created_at, log_id = decode_cursor(cursor)
+            query = query.where(
+                ActivityLog.created_at <= created_at,
+                tuple_(ActivityLog.created_at, ActivityLog.id) < tuple_(created_at, log_id)
+            )
+
+        if user_id:
+            query = query.where(ActivityLog.user_id == user_id)
+        if action:
+            query = query.where(ActivityLog.action == action)
+        if entity_type:
+            query = query.where(ActivityLog.entity_type == entity_type)
+        if entity_id:
+            query = query.where(ActivityLog.entity_id == entity_id)
+
+        # Same order as the (user_id, ...) and (entity_type, entity_id, ...) indexes
+        query = query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit + 1)
+        logs = self.db.execute(query).scalars().all()
+
+        if len(logs) > limit:
+            logs = logs[:limit]
+            return logs, encode_cursor(logs[-1])
+        return logs, None
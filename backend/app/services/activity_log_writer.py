@@ -0,0 +1,212 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import generate_id
+from app.db.session import SessionLocal
+from app.models.activity_log import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+# Backoff while the database is unreachable, doubling up to the maximum
+RETRY_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+# Tries per remaining batch before shutdown gives up on an unreachable database
+SHUTDOWN_ATTEMPTS = 3
+
+
+def activity_row(
+    user_id: str,
+    action: str,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """An activity_logs row, timestamped now rather than when it is written"""
+    return {
+        "id": generate_id("LOG"),
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "details": details,
+        "created_at": datetime.now(),
+    }
+
+
+class ActivityLogWriter:
+    """
+    Shared writer for activity_logs.
+
+    By default entries are queued and a background thread bulk-inserts them
+    once ACTIVITY_LOG_BATCH_SIZE rows are waiting or ACTIVITY_LOG_FLUSH_INTERVAL
+    has passed, so requests never pay for a commit of their own. Passing `db`
+    writes the entries in the caller's transaction instead, for entries that
+    must commit or roll back together with the change they describe.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.ACTIVITY_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.ACTIVITY_LOG_FLUSH_INTERVAL
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=queue_size or settings.ACTIVITY_LOG_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def log(
+        self,
+        user_id: str,
+        action: str,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        db: Optional[Session] = None
+    ) -> None:
+        self.log_many([activity_row(user_id, action, entity_type, entity_id, details)], db=db)
+
+    def log_many(self, rows: List[Dict[str, Any]], db: Optional[Session] = None) -> None:
+        """Write rows built with `activity_row`; transactionally when `db` is given"""
+        if not rows:
+            return
+        if db is not None:
+            db.execute(insert(ActivityLog), rows)
+            return
+        if not self._thread:
+            # Not running (scripts, maintenance jobs): write directly
+            self._write_or_drop(rows)
+            return
+        for row in rows:
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                # Never drop audit entries; pay for a direct write instead
+                logger.warning("Activity log queue full, writing directly")
+                self._write_or_drop([row])
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer after flushing everything queued"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        unwritten: List[Dict[str, Any]] = []
+        delay = RETRY_DELAY
+        while not self._stop.is_set():
+            # A batch the database could not take goes again before anything newer
+            batch = unwritten or self._next_batch()
+            if not batch:
+                continue
+            unwritten = self._write(batch)
+            if unwritten:
+                logger.warning("Retrying %s activity log entries in %ss", len(unwritten), delay)
+                self._stop.wait(delay)
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+            else:
+                delay = RETRY_DELAY
+
+        # Drain whatever arrived before shutdown
+        batch = unwritten or self._drain(self.batch_size)
+        attempts = 0
+        while batch:
+            unwritten = self._write(batch)
+            if not unwritten:
+                batch, attempts = self._drain(self.batch_size), 0
+                continue
+            attempts += 1
+            if attempts >= SHUTDOWN_ATTEMPTS:
+                logger.error(
+                    "Database unreachable at shutdown, dropping %s activity log entries",
+                    len(unwritten) + self._queue.qsize()
+                )
+                return
+            time.sleep(RETRY_DELAY)
+            batch = unwritten
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for a first row, then collect more until the batch is full or the interval ends"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_or_drop(self, rows: List[Dict[str, Any]]) -> None:
+        """Write rows outside the writer thread, where nothing can hold them for a retry"""
+        unwritten = self._write(rows)
+        if unwritten:
+            logger.error("Database unreachable, dropping %s activity log entries", len(unwritten))
+
+    def _write(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows; returns the ones left unwritten because the database could not be reached"""
+        db = self.session_factory()
+        try:
+            db.execute(insert(ActivityLog), rows)
+            db.commit()
+            return []
+        except (OperationalError, InterfaceError) as e:
+            # The rows are fine; write them again once the database is back
+            db.rollback()
+            logger.warning("Writing %s activity log entries failed: %s", len(rows), e)
+            return rows
+        except (IntegrityError, DataError):
+            db.rollback()
+            if len(rows) == 1:
+                logger.exception("Dropping activity log entry %s", rows[0].get("id"))
+                return []
+            # One bad row must not take the whole batch with it
+            logger.warning("Activity log batch of %s failed, writing rows one by one", len(rows))
+            unwritten = []
+            for row in rows:
+                unwritten.extend(self._write([row]))
+            return unwritten
+        except Exception:
+            db.rollback()
+            logger.exception("Dropping %s activity log entries", len(rows))
+            return []
+        finally:
+            db.close()
+
+
+activity_log_writer = ActivityLogWriter()
@@ -0,0 +1,340 @@
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import generate_id, get_password_hash
+from app.core.utils import format_mobile
+from app.db.session import SessionLocal
+from app.models.agent import Agent, agent_group_association
+from app.models.agent_group import AgentGroup
+from app.models.agent_import import AgentImportJob, AgentImportStatus
+from app.models.credit import Credit
+from app.models.user import User, UserRole
+from app.schemas.agent_import import AgentImportRow
+from app.services.activity_log_writer import activity_log_writer, activity_row
+from app.services.price_matrix import invalidate_prices
+
+logger = logging.getLogger(__name__)
+
+# Jobs not updated for this long belong to a process that stopped; a running
+# job commits its progress at least every hash chunk
+JOB_LEASE = timedelta(minutes=10)
+
+
+def parse_agent_csv(content: bytes) -> List[Dict[str, str]]:
+    """
+    Read an onboarding CSV into one dict per row (empty cells omitted).
+    Rows are validated by the job, so only the file itself is checked here.
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("File must be UTF-8 encoded")
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or "mobile" not in [name.strip() for name in reader.fieldnames]:
+        raise ValueError("CSV must have a header row with a mobile column")
+
+    records = [
+        {key.strip(): value.strip() for key, value in record.items() if key and value and value.strip()}
+        for record in reader
+    ]
+    if not records:
+        raise ValueError("File contains no agents")
+    if len(records) > settings.AGENT_IMPORT_MAX_ROWS:
+        raise ValueError(f"At most {settings.AGENT_IMPORT_MAX_ROWS} agents can be imported at once")
+    return records
+
+
+class AgentImporter:
+    """
+    Bulk agent onboarding. `submit` records an AgentImportJob and processes it
+    on a background thread, one job at a time:
+
+    1. validate rows and normalize mobiles with `format_mobile`;
+    2. check mobiles, usernames, emails and group references against the
+       database in one query each;
+    3. hash initial passwords on a process pool, recording progress on the
+       job row so any API process can report it;
+    4. insert users, agents, credits, group memberships and activity logs in
+       one transaction, together with the per-row report.
+
+    A failure in step 4 rolls everything back and marks the job failed.
+    Records live only in the submitting process, so a job left pending or
+    running past JOB_LEASE cannot resume: `recover_stale_jobs` fails it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        hash_workers: Optional[int] = None,
+        hash_chunk: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.hash_workers = hash_workers or settings.AGENT_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+        self.hash_chunk = hash_chunk or settings.AGENT_IMPORT_HASH_CHUNK
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._hash_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        db: Session,
+        records: List[Dict[str, str]],
+        created_by: str,
+        filename: Optional[str] = None
+    ) -> AgentImportJob:
+        """Record a job for `records` (from `parse_agent_csv`) and start it in the background"""
+        job = AgentImportJob(
+            id=generate_id("IMP"),
+            filename=filename,
+            status=AgentImportStatus.PENDING,
+            total_rows=len(records),
+            processed_rows=0,
+            created_count=0,
+            skipped_count=0,
+            created_by=created_by
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-import")
+            self._executor.submit(self.run, job.id, records)
+        return job
+
+    def run(self, job_id: str, records: List[Dict[str, str]]) -> None:
+        db = self.session_factory()
+        try:
+            self._process(db, job_id, records)
+        except Exception as e:
+            logger.exception("Agent import %s failed", job_id)
+            db.rollback()
+            db.execute(
+                update(AgentImportJob)
+                .where(AgentImportJob.id == job_id)
+                .values(status=AgentImportStatus.FAILED, error=str(e), completed_at=func.now())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def recover_stale_jobs(self) -> int:
+        """Fail jobs whose process stopped before finishing them; run at startup"""
+        db = self.session_factory()
+        try:
+            recovered = db.execute(
+                update(AgentImportJob)
+                .where(
+                    AgentImportJob.status.in_([AgentImportStatus.PENDING, AgentImportStatus.RUNNING]),
+                    AgentImportJob.updated_at < func.now() - JOB_LEASE,
+                )
+                .values(
+                    status=AgentImportStatus.FAILED,
+                    error="Import was interrupted; please upload the file again",
+                    completed_at=func.now(),
+                ),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if recovered:
+            logger.warning("Marked %s interrupted agent imports as failed", recovered)
+        return recovered
+
+    def _process(self, db: Session, job_id: str, records: List[Dict[str, str]]) -> None:
+        # Claim the job unless recovery already failed it while it waited in the queue
+        claimed = db.execute(
+            update(AgentImportJob)
+            .where(AgentImportJob.id == job_id, AgentImportJob.status == AgentImportStatus.PENDING)
+            .values(status=AgentImportStatus.RUNNING),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.commit()
+        if not claimed:
+            logger.warning("Agent import %s is no longer pending, skipping", job_id)
+            return
+        job = db.get(AgentImportJob, job_id)
+
+        report: List[Optional[Dict[str, Any]]] = [None] * len(records)
+
+        def skip(index: int, mobile: Optional[str], status: str, error: str) -> None:
+            report[index] = {"row": index + 1, "mobile": mobile, "status": status, "error": error}
+
+        # Rows that pass validation, with their normalized mobile and group tokens
+        candidates = []
+        file_mobiles = set()
+        file_emails = set()
+        for index, record in enumerate(records):
+            try:
+                row = AgentImportRow(**record)
+            except ValidationError as e:
+                errors = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+                skip(index, record.get("mobile"), "invalid", errors)
+                continue
+            mobile = format_mobile(row.mobile)
+            email = row.email.lower() if row.email else None
+            if not mobile:
+                skip(index, row.mobile, "invalid", "Invalid mobile number")
+            elif mobile in file_mobiles or (email and email in file_emails):
+                skip(index, mobile, "duplicate", "Mobile or email repeated in the file")
+            else:
+                file_mobiles.add(mobile)
+                if email:
+                    file_emails.add(email)
+                groups = [token.strip() for token in (row.groups or "").split(";") if token.strip()]
+                candidates.append((index, row, mobile, email, groups))
+
+        # Existing users, one query; the username of an imported user is its mobile
+        taken = set()
+        if candidates:
+            for mobile, username, email in db.execute(
+                select(User.mobile, User.username, User.email).where(or_(
+                    User.mobile.in_(file_mobiles),
+                    User.username.in_(file_mobiles),
+                    func.lower(User.email).in_(file_emails)
+                ))
+            ):
+                taken.update(value.lower() for value in (mobile, username, email) if value)
+
+        # Group references by id or name, one query
+        tokens = {token for candidate in candidates for token in candidate[4]}
+        group_ids: Dict[str, str] = {}
+        if tokens:
+            by_name: Dict[str, List[str]] = {}
+            for group_id, name in db.execute(
+                select(AgentGroup.id, AgentGroup.name).where(or_(AgentGroup.id.in_(tokens), AgentGroup.name.in_(tokens)))
+            ):
+                if group_id in tokens:
+                    group_ids[group_id] = group_id
+                by_name.setdefault(name, []).append(group_id)
+            for name, ids in by_name.items():
+                # A name shared by several groups is ambiguous and must be given by id
+                if name in tokens and name not in group_ids and len(ids) == 1:
+                    group_ids[name] = ids[0]
+
+        ready = []
+        for index, row, mobile, email, groups in candidates:
+            unknown = [token for token in groups if token not in group_ids]
+            if mobile in taken or (email and email in taken):
+                skip(index, mobile, "exists", "A user with this mobile or email already exists")
+            elif unknown:
+                skip(index, mobile, "invalid", f"Unknown or ambiguous agent group: {', '.join(unknown)}")
+            else:
+                ready.append((index, row, mobile, email, sorted({group_ids[token] for token in groups})))
+
+        passwords = [row.password for _, row, _, _, _ in ready if row.password]
+        # Everything but the passwords still to hash is ready
+        job.processed_rows = len(records) - len(passwords)
+        db.commit()
+
+        hashes = iter(self._hash_passwords(db, job, passwords))
+
+        users = []
+        agents = []
+        credits = []
+        memberships = []
+        activity = []
+        for index, row, mobile, email, groups in ready:
+            user_id = generate_id("USR")
+            agent_id = generate_id("AGT")
+            users.append({
+                "id": user_id,
+                "username": mobile,
+                "mobile": mobile,
+                "email": email,
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "business_name": row.business_name,
+                "province": row.province,
+                "city": row.city,
+                "hashed_password": next(hashes) if row.password else None,
+                "role": UserRole.AGENT,
+                "is_active": True,
+            })
+            agents.append({"id": agent_id, "user_id": user_id})
+            credits.append({"id": generate_id("CRD"), "agent_id": agent_id, "balance": 0})
+            memberships.extend({"agent_id": agent_id, "group_id": group_id} for group_id in groups)
+            activity.append(activity_row(job.created_by, "create", "agent", agent_id, {
+                "user_id": user_id,
+                "import_job": job.id
+            }))
+            report[index] = {"row": index + 1, "mobile": mobile, "status": "created", "user_id": user_id, "agent_id": agent_id}
+
+        if users:
+            db.execute(insert(User), users)
+            db.execute(insert(Agent), agents)
+            db.execute(insert(Credit), credits)
+        if memberships:
+            db.execute(insert(agent_group_association), memberships)
+            invalidate_prices(db)
+        activity_log_writer.log_many(activity, db=db)
+
+        job.status = AgentImportStatus.COMPLETED
+        job.processed_rows = len(records)
+        job.created_count = len(users)
+        job.skipped_count = len(records) - len(users)
+        job.report = report
+        job.completed_at = func.now()
+        db.commit()
+
+    def _hash_passwords(self, db: Session, job: AgentImportJob, passwords: List[str]) -> List[str]:
+        """bcrypt on worker processes, in order; progress is committed every hash_chunk passwords"""
+        if not passwords:
+            return []
+
+        hashes = []
+        pool = self._get_hash_pool()
+        chunksize = max(1, self.hash_chunk // self.hash_workers)
+        try:
+            for hashed in pool.map(get_password_hash, passwords, chunksize=chunksize):
+                hashes.append(hashed)
+                if len(hashes) % self.hash_chunk == 0:
+                    job.processed_rows += self.hash_chunk
+                    db.commit()
+        except BrokenProcessPool:
+            # A worker died; the next job starts a fresh pool
+            with self._lock:
+                if self._hash_pool is pool:
+                    self._hash_pool = None
+            raise
+        return hashes
+
+    def _get_hash_pool(self) -> ProcessPoolExecutor:
+        """One pool per process, started on first use and kept for later jobs"""
+        with self._lock:
+            if self._hash_pool is None:
+                # spawn: forking a process with live threads and connections is unsafe
+                self._hash_pool = ProcessPoolExecutor(
+                    max_workers=self.hash_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._hash_pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            if self._hash_pool:
+                self._hash_pool.shutdown(wait=False, cancel_futures=True)
+                self._hash_pool = None
+
+
+agent_importer = AgentImporter()
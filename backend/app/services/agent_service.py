@@ -1,16 +1,26 @@
 pythonfrom typing import List, Optional, Dict, Any
 from datetime import datetime
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
 from fastapi import HTTPException, status
 
 from app.core.security import generate_id
+from app.core.utils import normalize_search_text
 from app.models.user import User, UserRole
 from app.models.agent import Agent
 from app.models.agent_group import AgentGroup
 from app.models.credit import Credit
 from app.schemas.agent import AgentCreate, AgentUpdate
 from app.schemas.agent_group import AgentGroupCreate, AgentGroupUpdate
+from app.services.price_matrix import invalidate_prices
+from app.services.principal_cache import invalidate_principals
+from app.services.token_versions import revoke_tokens
+
+
+# Loader options for AgentResponse (nested user and group_names): the user in
+# the same query, the groups of the whole page in one more
+AGENT_RESPONSE_OPTIONS = (joinedload(Agent.user), selectinload(Agent.groups))
 
 
 class AgentService:
@@ -18,24 +28,35 @@ class AgentService:
         self.db = db
     
     def get_agents(self, skip: int = 0, limit: int = 100, search: Optional[str] = None) -> List[Agent]:
-        """Get all agents with optional search"""
+        """
+        Get all agents with optional search. Search matches name, mobile, email
+        and business name by substring or similarity (typos), best match first,
+        using the trigram index on users.search_text.
+        """
         query = self.db.query(Agent)
         
-        if search:
-            # Search in user fields
-            query = query.join(User).filter(
-                (User.first_name.ilike(f"%{search}%")) |
-                (User.last_name.ilike(f"%{search}%")) |
-                (User.mobile.ilike(f"%{search}%")) |
-                (User.email.ilike(f"%{search}%")) |
-                (User.business_name.ilike(f"%{search}%"))
+        term = normalize_search_text(search) if search else ""
+        if not term:
+            query = query.options(*AGENT_RESPONSE_OPTIONS)
+        else:
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            contains = User.search_text.like(f"%{escaped}%", escape="\\")
+            # word_similarity: how well the term matches some part of the text
+            similar = User.search_text.op("%>")(term)
+            # users is joined for the filter already, so load the user from that join
+            query = query.join(User).options(
+                contains_eager(Agent.user), selectinload(Agent.groups)
+            ).filter(contains | similar).order_by(
+                contains.desc(),
+                func.word_similarity(term, User.search_text).desc(),
+                Agent.id
             )
         
         return query.offset(skip).limit(limit).all()
     
     def get_agent(self, agent_id: str) -> Optional[Agent]:
         """Get agent by ID"""
-        return self.db.query(Agent).filter(Agent.id == agent_id).first()
+        return self.db.query(Agent).options(*AGENT_RESPONSE_OPTIONS).filter(Agent.id == agent_id).first()
     
     def get_agent_by_user_id(self, user_id: str) -> Optional[Agent]:
         """Get agent by user ID"""
@@ -73,7 +94,12 @@ class AgentService:
                 group = self.get_agent_group(group_id)
                 if group:
                     agent.groups.append(group)
+            # Group prices apply to the new agent
+            invalidate_prices(self.db)
         
+        # Role and agent id are part of the cached principal and of issued tokens
+        invalidate_principals(self.db, [user.id])
+        revoke_tokens(self.db, [user.id])
         self.db.commit()
         self.db.refresh(agent)
         
@@ -95,6 +121,7 @@ class AgentService:
                 group = self.get_agent_group(group_id)
                 if group:
                     agent.groups.append(group)
+            invalidate_prices(self.db)
         
         self.db.commit()
         self.db.refresh(agent)
@@ -108,6 +135,7 @@ class AgentService:
             return None
         
         agent.user.is_active = True
+        invalidate_principals(self.db, [agent.user_id])
         self.db.commit()
         self.db.refresh(agent)
         
@@ -120,6 +148,8 @@ class AgentService:
             return None
         
         agent.user.is_active = False
+        invalidate_principals(self.db, [agent.user_id])
+        revoke_tokens(self.db, [agent.user_id])
         self.db.commit()
         self.db.refresh(agent)
         
@@ -175,6 +205,7 @@ class AgentService:
             return False
         
         agent.groups.append(group)
+        invalidate_prices(self.db)
         self.db.commit()
         
         return True
@@ -192,6 +223,7 @@ class AgentService:
             return False
         
         agent.groups.remove(group)
+        invalidate_prices(self.db)
         self.db.commit()
         
         return True
\ No newline at end of file
@@ -1,25 +1,38 @@
 # backend/app/services/auth_service.py (بهبود یافته)
 from typing import Optional, Dict, Any
-from datetime import datetime
+import math
 import re
 
+from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import get_password_hash, verify_password, generate_id
+from app.core.config import settings
+from app.core.hashing import PasswordHashingBusy, password_hasher
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    generate_id
+)
 from app.core.utils import validate_mobile, format_mobile
 from app.core.exceptions import VestaException
 from app.models.user import User, UserRole
 from app.models.agent import Agent
 from app.models.credit import Credit
-from app.models.activity_log import ActivityLog
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.activity_log_writer import activity_log_writer
+from app.services.last_login_buffer import last_login_buffer
 from app.services.otp_service import OTPService
+from app.services.otp_throttle import get_otp_throttle
+from app.services.sms_service import SMSService
 
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
         self.otp_service = OTPService()
+        self.otp_throttle = get_otp_throttle()
+        self.sms_service = SMSService()
     
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         return self.db.query(User).filter(User.id == user_id).first()
@@ -38,7 +51,7 @@ class AuthService:
     def get_user_by_username(self, username: str) -> Optional[User]:
         return self.db.query(User).filter(User.username == username).first()
     
-    def authenticate(self, username: str, password: str) -> Optional[User]:
+    def get_login_user(self, username: str) -> User:
         # Check if username is email, mobile or username
         if '@' in username:
             user = self.get_user_by_email(username)
@@ -53,30 +66,59 @@ class AuthService:
         if not user.hashed_password:
             raise VestaException("رمز عبور تنظیم نشده است", 400)
         
-        if not verify_password(password, user.hashed_password):
+        return user
+    
+    async def authenticate(self, username: str, password: str) -> Optional[User]:
+        """
+        Password login. Database work runs in the request threadpool and bcrypt
+        on the dedicated hashing executor, so the event loop is never blocked.
+        """
+        user = await run_in_threadpool(self.get_login_user, username)
+        
+        try:
+            valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+        except PasswordHashingBusy:
+            raise VestaException("سرور مشغول است، لحظاتی بعد تلاش کنید", 503, headers={"Retry-After": "1"})
+        
+        if not valid:
             raise VestaException("رمز عبور اشتباه است", 401)
         
         if not user.is_active:
             raise VestaException("حساب کاربری غیرفعال است", 403)
         
+        await run_in_threadpool(self._complete_password_login, user, new_hash)
+        return user
+    
+    def _complete_password_login(self, user: User, new_hash: Optional[str]) -> None:
+        # Hashes with outdated parameters are replaced while the password is at hand
+        if new_hash:
+            user.hashed_password = new_hash
+            self.db.commit()
+        
         # Update last login time
-        user.last_login = datetime.now()
-        self.db.commit()
+        last_login_buffer.record(user.id)
         
         # Log activity
-        self._log_activity(user.id, "login", "user", user.id, {
+        activity_log_writer.log(user.id, "login", "user", user.id, {
             "method": "password"
         })
-        
-        return user
     
-    def request_otp(self, mobile: str) -> bool:
+    def request_otp(self, mobile: str, client_ip: Optional[str] = None) -> bool:
         """Request OTP for login"""
         # Format and validate mobile
         mobile = format_mobile(mobile)
         if not mobile:
             raise VestaException("شماره موبایل نامعتبر است", 400)
         
+        # Throttle before anything else so rejected requests never reach the database
+        wait = self.otp_throttle.check_request(mobile, client_ip)
+        if wait:
+            raise VestaException(
+                "تعداد درخواست‌ها بیش از حد مجاز است، بعداً تلاش کنید",
+                429,
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+        
         # Generate OTP
         from app.core.security import generate_otp
         otp = generate_otp()
@@ -86,20 +128,12 @@ class AuthService:
         if not success:
             raise VestaException("خطا در ذخیره کد تأیید", 500)
         
-        # Get or create user
-        user = self.get_user_by_mobile(mobile)
-        if not user:
-            # Create a new user with minimal info
-            try:
-                user_in = UserCreate(
-                    mobile=mobile,
-                    first_name="کاربر",
-                    last_name="جدید",
-                    role=UserRole.AGENT
-                )
-                user = self.create_user(user_in)
-            except Exception as e:
-                raise VestaException(f"خطا در ایجاد کاربر: {str(e)}", 500)
+        # A new code gets a fresh set of verify attempts; the request bucket above limits how often
+        self.otp_throttle.reset_verify(mobile)
+        
+        # Queue the SMS; delivery happens in the background outbox
+        if not self.sms_service.send_otp(mobile, otp):
+            raise VestaException("خطا در ارسال کد تأیید", 503)
         
         return True
     
@@ -111,28 +145,72 @@ class AuthService:
             raise VestaException("شماره موبایل نامعتبر است", 400)
         
         # Verify OTP
+        if not self.otp_throttle.check_verify(mobile):
+            raise VestaException("تعداد تلاش‌ها بیش از حد مجاز است، کد جدید درخواست کنید", 429)
+        
         if not self.otp_service.verify_otp(mobile, otp):
             raise VestaException("کد تأیید اشتباه یا منقضی شده است", 401)
         
-        # Get user
+        self.otp_throttle.reset_verify(mobile)
+        
+        # Get or create user; only mobiles that proved ownership get an account
         user = self.get_user_by_mobile(mobile)
         if not user:
-            raise VestaException("کاربر یافت نشد", 404)
+            try:
+                user_in = UserCreate(
+                    mobile=mobile,
+                    first_name="کاربر",
+                    last_name="جدید",
+                    role=UserRole.AGENT
+                )
+                user = self.create_user(user_in)
+            except Exception as e:
+                raise VestaException(f"خطا در ایجاد کاربر: {str(e)}", 500)
         
         if not user.is_active:
             raise VestaException("حساب کاربری غیرفعال است", 403)
         
         # Update last login time
-        user.last_login = datetime.now()
-        self.db.commit()
+        last_login_buffer.record(user.id)
         
         # Log activity
-        self._log_activity(user.id, "login", "user", user.id, {
+        activity_log_writer.log(user.id, "login", "user", user.id, {
             "method": "otp"
         })
         
         return user
     
+    def issue_tokens(self, user: User) -> Dict[str, str]:
+        """Short-lived access token with role/agent claims plus a refresh token"""
+        claims = {
+            "role": user.role.value,
+            "agent_id": user.agent.id if user.agent else None,
+            "ver": user.token_version
+        }
+        return {
+            "access_token": create_access_token(user.id, claims=claims),
+            "refresh_token": create_refresh_token(user.id, user.token_version),
+            "token_type": "bearer",
+        }
+    
+    def refresh_tokens(self, refresh_token: str) -> Dict[str, str]:
+        """Exchange a refresh token for new tokens with up-to-date claims"""
+        try:
+            payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            raise VestaException("توکن نامعتبر است", 401)
+        if payload.get("type") != "refresh" or not payload.get("sub"):
+            raise VestaException("توکن نامعتبر است", 401)
+        
+        user = self.get_user_by_id(payload["sub"])
+        if not user or payload.get("ver") != user.token_version:
+            raise VestaException("توکن منقضی یا باطل شده است", 401)
+        
+        if not user.is_active:
+            raise VestaException("حساب کاربری غیرفعال است", 403)
+        
+        return self.issue_tokens(user)
+    
     def create_user(self, user_in: UserCreate) -> User:
         # Format and validate mobile
         mobile = format_mobile(user_in.mobile)
@@ -158,7 +236,10 @@ class AuthService:
         
         # Hash password if provided
         if user_in.password:
-            user_data["hashed_password"] = get_password_hash(user_in.password)
+            try:
+                user_data["hashed_password"] = password_hasher.hash_blocking(user_in.password)
+            except PasswordHashingBusy:
+                raise VestaException("سرور مشغول است، لحظاتی بعد تلاش کنید", 503, headers={"Retry-After": "1"})
         
         # Create user
         user = User(**user_data)
@@ -180,22 +261,8 @@ class AuthService:
             self.db.commit()
         
         # Log activity
-        self._log_activity(user.id, "create", "user", user.id, {
+        activity_log_writer.log(user.id, "create", "user", user.id, {
             "role": user.role.value
         })
         
         return user
-    
-    def _log_activity(self, user_id: str, action: str, entity_type: str, entity_id: str, details: Dict[str, Any]) -> None:
-        """Log user activity"""
-        log_id = generate_id("LOG")
-        log = ActivityLog(
-            id=log_id,
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            details=details
-        )
-        self.db.add(log)
-        self.db.commit()
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.snapshot import SnapshotCache, invalidate_on_commit
+from app.models.product import Product
+from app.models.product_group import ProductGroup
+from app.services.price_matrix import AgentPrices
+
+# Every process rebuilds its catalog when products or groups change
+CATALOG_CHANNEL = "catalog_changed"
+# Serialized pages kept per snapshot, least recently used evicted first
+# (one per distinct filter/paging/agent price combination)
+MAX_CACHED_PAGES = 256
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def product_data(product: Product, group_name: Optional[str] = None) -> Dict[str, Any]:
+    """A product shaped like ProductResponse"""
+    if group_name is None:
+        group_name = product.group.name if product.group else ""
+    return {
+        "id": product.id,
+        "name": product.name,
+        "description": product.description,
+        "product_type": product.product_type.value,
+        "group_id": product.group_id,
+        "group_name": group_name,
+        "price": product.price,
+        "commission_rate": product.commission_rate,
+        "duration_type": product.duration_type.value,
+        "duration_value": product.duration_value,
+        "is_active": product.is_active,
+        "has_test_option": product.has_test_option,
+        "test_duration": product.test_duration,
+        "created_at": _isoformat(product.created_at),
+        "updated_at": _isoformat(product.updated_at),
+    }
+
+
+def group_data(group: ProductGroup, product_count: int) -> Dict[str, Any]:
+    """A product group shaped like ProductGroupResponse"""
+    return {
+        "id": group.id,
+        "name": group.name,
+        "description": group.description,
+        "product_count": product_count,
+        "created_at": _isoformat(group.created_at),
+        "updated_at": _isoformat(group.updated_at),
+    }
+
+
+def _with_price(product: Dict[str, Any], prices: Optional[AgentPrices]) -> Dict[str, Any]:
+    if prices is None:
+        return product
+    return {**product, "agent_price": prices.get(product["id"])}
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A serialized JSON response and its strong ETag"""
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, data: Any) -> "CachedBody":
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+    def response(self, request: Request) -> Response:
+        """200 with the body, or 304 when the client already has it"""
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if self.etag in tags or "*" in tags:
+                return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+@dataclass
+class CatalogSnapshot:
+    """Products and groups at one point in time; replaced whole, never modified"""
+    products: List[Dict[str, Any]]
+    groups: List[Dict[str, Any]]
+    product_entries: Dict[str, Dict[str, Any]]
+    products_by_id: Dict[str, CachedBody]
+    groups_by_id: Dict[str, CachedBody]
+    _pages: "OrderedDict[Tuple, CachedBody]" = field(default_factory=OrderedDict)
+    _pages_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def page(self, key: Tuple, build: Callable[[], Any]) -> CachedBody:
+        """A list response, serialized on first use and reused until the next change"""
+        with self._pages_lock:
+            cached = self._pages.get(key)
+            if cached is not None:
+                self._pages.move_to_end(key)
+                return cached
+        cached = CachedBody.of(build())
+        with self._pages_lock:
+            self._pages[key] = cached
+            self._pages.move_to_end(key)
+            if len(self._pages) > MAX_CACHED_PAGES:
+                self._pages.popitem(last=False)
+        return cached
+
+
+class CatalogCache(SnapshotCache[CatalogSnapshot]):
+    """
+    The product catalog as pre-serialized JSON with strong ETags, so list and
+    detail reads neither query the database nor run Pydantic, and conditional
+    requests get a 304. Writers call `invalidate_catalog`.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, ttl: Optional[int] = None):
+        super().__init__(ttl or settings.CATALOG_CACHE_TTL, session_factory)
+
+    def products(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        group_id: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        prices: Optional[AgentPrices] = None
+    ) -> CachedBody:
+        """A page of products; with `prices`, each carries the agent's price"""
+        snapshot = self.snapshot()
+
+        def build() -> List[Dict[str, Any]]:
+            products = [
+                product for product in snapshot.products
+                if (group_id is None or product["group_id"] == group_id)
+                and (is_active is None or product["is_active"] == is_active)
+            ]
+            return [_with_price(product, prices) for product in products[skip:skip + limit]]
+
+        key = ("products", skip, limit, group_id, is_active, prices.key if prices else None)
+        return snapshot.page(key, build)
+
+    def product(self, product_id: str, prices: Optional[AgentPrices] = None) -> Optional[CachedBody]:
+        snapshot = self.snapshot()
+        cached = snapshot.products_by_id.get(product_id)
+        if cached is None or prices is None:
+            return cached
+        product = snapshot.product_entries[product_id]
+        return snapshot.page(("product", product_id, prices.key), lambda: _with_price(product, prices))
+
+    def groups(self, skip: int = 0, limit: int = 100) -> CachedBody:
+        snapshot = self.snapshot()
+        return snapshot.page(("groups", skip, limit), lambda: snapshot.groups[skip:skip + limit])
+
+    def group(self, group_id: str) -> Optional[CachedBody]:
+        return self.snapshot().groups_by_id.get(group_id)
+
+    def _load(self, db: Session) -> CatalogSnapshot:
+        product_counts = (
+            select(Product.group_id, func.count(Product.id).label("product_count"))
+            .group_by(Product.group_id)
+            .subquery()
+        )
+        group_rows = db.execute(
+            select(ProductGroup, func.coalesce(product_counts.c.product_count, 0))
+            .outerjoin(product_counts, product_counts.c.group_id == ProductGroup.id)
+            .order_by(ProductGroup.id)
+        ).all()
+        product_rows = db.execute(
+            select(Product, ProductGroup.name)
+            .outerjoin(ProductGroup, ProductGroup.id == Product.group_id)
+            .order_by(Product.id)
+        ).all()
+        groups = [group_data(group, count) for group, count in group_rows]
+        products = [product_data(product, group_name or "") for product, group_name in product_rows]
+
+        return CatalogSnapshot(
+            products=products,
+            groups=groups,
+            product_entries={product["id"]: product for product in products},
+            products_by_id={product["id"]: CachedBody.of(product) for product in products},
+            groups_by_id={group["id"]: CachedBody.of(group) for group in groups},
+        )
+
+
+catalog_cache = CatalogCache()
+
+
+def invalidate_catalog(db: Session) -> None:
+    """
+    Rebuild every process's catalog once `db` commits.
+    Call before committing the change.
+    """
+    invalidate_on_commit(db, CATALOG_CHANNEL, catalog_cache)
@@ -0,0 +1,102 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import DateTime, String, column, func, update, values
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for users.last_login.
+
+    Logins only record the latest timestamp per user in memory; every
+    LAST_LOGIN_FLUSH_INTERVAL seconds all of them are written with a single
+    UPDATE ... FROM (VALUES ...), and the remainder is flushed on shutdown.
+    Logins therefore never commit or lock the users row themselves.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval or settings.LAST_LOGIN_FLUSH_INTERVAL
+        self._pending: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, user_id: str, logged_in_at: Optional[datetime] = None) -> None:
+        logged_in_at = logged_in_at or datetime.now()
+        with self._lock:
+            current = self._pending.get(user_id)
+            if current is None or logged_in_at > current:
+                self._pending[user_id] = logged_in_at
+        if not self._thread:
+            # Not running (scripts, maintenance jobs): write directly
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="last-login-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write what is still buffered"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered timestamps with one UPDATE. Returns the number of users written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        logins = values(
+            column("user_id", String), column("ts", DateTime(timezone=True)), name="v"
+        ).data(list(pending.items()))
+        db = self.session_factory()
+        try:
+            # GREATEST keeps the newest value when several processes flush the same user
+            db.execute(
+                update(User)
+                .where(User.id == logins.c.user_id)
+                .values(last_login=func.greatest(func.coalesce(User.last_login, logins.c.ts), logins.c.ts)),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+            return len(pending)
+        except Exception:
+            db.rollback()
+            logger.exception("Writing last login times failed; retrying with the next flush")
+            with self._lock:
+                for user_id, logged_in_at in pending.items():
+                    current = self._pending.get(user_id)
+                    if current is None or logged_in_at > current:
+                        self._pending[user_id] = logged_in_at
+            return 0
+        finally:
+            db.close()
+
+
+last_login_buffer = LastLoginBuffer()
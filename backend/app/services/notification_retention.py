@@ -0,0 +1,120 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.partitions import ensure_monthly_partitions, month_start, next_month, require_partitioned
+from app.db.session import SessionLocal
+from app.models.notification import notifications_archive
+
+logger = logging.getLogger(__name__)
+
+# Named columns: upgraded databases order them differently from the archive create_all builds
+_ARCHIVE_COLUMNS = ", ".join(column.name for column in notifications_archive.columns)
+
+# Move one batch of old read notifications into the archive table
+_ARCHIVE_BATCH = text(f"""
+    WITH moved AS (
+        DELETE FROM notifications
+        WHERE (id, created_at) IN (
+            SELECT id, created_at FROM notifications
+            WHERE is_read AND created_at < :cutoff
+            ORDER BY created_at
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {_ARCHIVE_COLUMNS}
+    )
+    INSERT INTO notifications_archive ({_ARCHIVE_COLUMNS}) SELECT {_ARCHIVE_COLUMNS} FROM moved
+""")
+
+
+class NotificationRetentionService:
+    """
+    Maintenance for the month-partitioned notifications table:
+    creates upcoming partitions, archives old read notifications in batches
+    and drops monthly partitions that have been emptied.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ensure_partitions(self, months_ahead: int = 3) -> List[str]:
+        """Create the partitions for the current month and the next `months_ahead` months"""
+        return ensure_monthly_partitions(self.db, "notifications", months_ahead)
+
+    def archive_read_notifications(
+        self,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> int:
+        """Move read notifications older than the retention age to notifications_archive"""
+        require_partitioned(self.db, "notifications")
+        older_than_days = older_than_days or settings.NOTIFICATION_RETENTION_DAYS
+        batch_size = batch_size or settings.NOTIFICATION_ARCHIVE_BATCH_SIZE
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+
+        archived = 0
+        while True:
+            # One short transaction per batch keeps locks and WAL bursts small
+            moved = self.db.execute(_ARCHIVE_BATCH, {"cutoff": cutoff, "batch_size": batch_size}).rowcount
+            self.db.commit()
+            archived += moved
+            if moved < batch_size:
+                break
+
+        return archived
+
+    def drop_empty_partitions(self, older_than_days: Optional[int] = None) -> List[str]:
+        """Drop monthly partitions that ended before the retention age and hold no rows"""
+        require_partitioned(self.db, "notifications")
+        older_than_days = older_than_days or settings.NOTIFICATION_RETENTION_DAYS
+        cutoff = month_start((datetime.now() - timedelta(days=older_than_days)).date())
+
+        partitions = self.db.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = 'notifications' AND child.relname ~ '^notifications_[0-9]{4}_[0-9]{2}$'
+        """)).scalars().all()
+
+        dropped = []
+        for name in sorted(partitions):
+            month = datetime.strptime(name[len("notifications_"):], "%Y_%m").date()
+            if next_month(month) > cutoff:
+                continue
+            # Unread notifications are never archived, so old partitions may still hold rows
+            if self.db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+                continue
+            self.db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+        self.db.commit()
+        return dropped
+
+    def run(self) -> None:
+        created = self.ensure_partitions()
+        archived = self.archive_read_notifications()
+        dropped = self.drop_empty_partitions()
+        logger.info(
+            "Notification retention: created %s, archived %s rows, dropped %s",
+            created, archived, dropped
+        )
+
+
+def run_notification_retention():
+    """Entry point for cron: python -m app.services.notification_retention"""
+    db = SessionLocal()
+    try:
+        NotificationRetentionService(db).run()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_notification_retention()
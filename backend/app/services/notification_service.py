@@ -1,14 +1,18 @@
 pythonfrom typing import List, Optional, Dict, Any
-import httpx
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import cast, func, insert, literal, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from app.core.security import generate_id
 from app.core.config import settings
+from app.core.security import generate_id, generate_id_sql
 from app.models.notification import Notification, NotificationType
 from app.models.user import User
+from app.services.notification_stream import notification_event, publish_broadcast_events, publish_user_events
+from app.services.recipients import select_recipients
+from app.services.telegram_worker import telegram_worker
+from app.services.unread_counter import unread_counter
 
 
 class NotificationService:
@@ -22,14 +26,35 @@ class NotificationService:
         limit: int = 100,
         unread_only: bool = False
     ) -> List[Notification]:
-        """Get notifications for a user"""
-        query = self.db.query(Notification).filter(Notification.user_id == user_id)
+        """Get recent notifications for a user"""
+        query = self.db.query(Notification).filter(
+            Notification.user_id == user_id,
+            Notification.created_at >= self._hot_since()
+        )
         
         if unread_only:
             query = query.filter(Notification.is_read == False)
         
         return query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
     
+    def get_unread_count(self, user_id: str) -> int:
+        """Get the number of unread notifications, counting in the database only on a cache miss"""
+        count = unread_counter.get(user_id)
+        if count is None:
+            count = self.db.query(func.count(Notification.id)).filter(
+                Notification.user_id == user_id,
+                Notification.created_at >= self._hot_since(),
+                Notification.is_read == False
+            ).scalar()
+            unread_counter.set(user_id, count)
+        
+        return count
+    
+    @staticmethod
+    def _hot_since() -> datetime:
+        """Start of the window listed and counted for users; a constant bound lets PostgreSQL prune older partitions"""
+        return datetime.now(timezone.utc) - timedelta(days=settings.NOTIFICATION_HOT_DAYS)
+    
     def get_notification(self, notification_id: str) -> Optional[Notification]:
         """Get notification by ID"""
         return self.db.query(Notification).filter(Notification.id == notification_id).first()
@@ -50,25 +75,95 @@ class NotificationService:
             message=notification_data["message"],
             type=notification_data["type"],
             is_read=False,
+            send_to_telegram=notification_data.get("send_to_telegram", False),
             is_sent_to_telegram=False,
             related_id=notification_data.get("related_id")
         )
         self.db.add(notification)
+        publish_user_events(self.db, [
+            ([notification.user_id], notification_event(dict(notification_data, id=notification_id)))
+        ])
         self.db.commit()
         self.db.refresh(notification)
         
+        unread_counter.incr(notification.user_id)
+        
+        # Delivery happens in the background worker
+        if notification.send_to_telegram:
+            telegram_worker.wake()
+        
         return notification
     
+    def broadcast_notification(self, broadcast_data: Dict[str, Any]) -> int:
+        """Create the same notification for every matching user with one INSERT ... SELECT"""
+        recipients = select_recipients(
+            User.id.label("user_id"),
+            agent_group_id=broadcast_data.get("agent_group_id"),
+            role=broadcast_data.get("role"),
+            active_only=broadcast_data.get("active_only", True)
+        ).subquery()
+        send_to_telegram = broadcast_data.get("send_to_telegram", False)
+        
+        rows = select(
+            generate_id_sql("NTF"),
+            recipients.c.user_id,
+            cast(broadcast_data["type"], Notification.type.type),
+            literal(broadcast_data["title"], Notification.title.type),
+            literal(broadcast_data["message"], Notification.message.type),
+            literal(False),
+            literal(send_to_telegram),
+            literal(False),
+            literal(broadcast_data.get("related_id"), Notification.related_id.type)
+        )
+        created = self.db.execute(
+            insert(Notification).from_select(
+                [
+                    Notification.id,
+                    Notification.user_id,
+                    Notification.type,
+                    Notification.title,
+                    Notification.message,
+                    Notification.is_read,
+                    Notification.send_to_telegram,
+                    Notification.is_sent_to_telegram,
+                    Notification.related_id
+                ],
+                rows
+            ).returning(Notification.user_id, Notification.id)
+        ).all()
+        # Each recipient's stream event carries the id of their own notification
+        publish_broadcast_events(self.db, created, notification_event(broadcast_data))
+        self.db.commit()
+        
+        recipient_ids = [user_id for user_id, _ in created]
+        
+        unread_counter.incr_many(recipient_ids)
+        
+        if send_to_telegram and recipient_ids:
+            telegram_worker.wake()
+        
+        return len(recipient_ids)
+    
     def mark_as_read(self, notification_id: str) -> Optional[Notification]:
         """Mark a notification as read"""
         notification = self.get_notification(notification_id)
         if not notification:
             return None
         
-        notification.is_read = True
+        # Only the call that actually flips the flag adjusts the count, so
+        # concurrent requests for the same notification decrement once
+        changed = self.db.query(Notification).filter(
+            Notification.id == notification.id,
+            Notification.created_at == notification.created_at,
+            Notification.is_read == False
+        ).update({"is_read": True}, synchronize_session=False)
         self.db.commit()
         self.db.refresh(notification)
         
+        # Only notifications inside the listed window are part of the unread count
+        if changed and notification.created_at >= self._hot_since():
+            unread_counter.incr(notification.user_id, -1)
+        
         return notification
     
     def mark_all_as_read(self, user_id: str) -> int:
@@ -79,45 +174,5 @@ class NotificationService:
         ).update({"is_read": True})
         
         self.db.commit()
+        unread_counter.reset(user_id)
         return result
-    
-    async def send_notification_to_telegram(self, notification_id: str) -> bool:
-        """Send notification to Telegram"""
-        notification = self.get_notification(notification_id)
-        if not notification:
-            return False
-        
-        # Check if user has Telegram ID
-        user = self.db.query(User).filter(User.id == notification.user_id).first()
-        if not user or not user.telegram_id:
-            return False
-        
-        # Check if Telegram bot token is configured
-        if not settings.TELEGRAM_BOT_TOKEN:
-            return False
-        
-        try:
-            # Send message to Telegram
-            telegram_api_url = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
-            message_text = f"*{notification.title}*\n\n{notification.message}"
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    telegram_api_url,
-                    json={
-                        "chat_id": user.telegram_id,
-                        "text": message_text,
-                        "parse_mode": "Markdown"
-                    }
-                )
-                
-                if response.status_code == 200:
-                    # Mark as sent
-                    notification.is_sent_to_telegram = True
-                    self.db.commit()
-                    return True
-            
-            return False
-        except Exception as e:
-            print(f"Error sending Telegram notification: {e}")
-            return False
\ No newline at end of file
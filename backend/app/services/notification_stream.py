@@ -0,0 +1,125 @@
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pubsub import notification_broker
+from app.db.listener import pg_notify
+
+logger = logging.getLogger(__name__)
+
+USER_EVENTS_CHANNEL = "user_events"
+# NOTIFY payloads must be shorter than 8000 bytes, so large recipient lists are split
+MAX_PAYLOAD_BYTES = 7900
+
+
+def publish_user_events(db: Session, events: Iterable[Tuple[Iterable[str], Dict[str, Any]]]) -> None:
+    """
+    Publish (user_ids, event) pairs to the users' open streams once `db` commits.
+
+    With the postgres backend the events travel through NOTIFY, so every app
+    process sees them; the memory backend only reaches streams of this process.
+    """
+    _publish(db, [(list(user_ids), data, None) for user_ids, data in events])
+
+
+def publish_broadcast_events(db: Session, recipients: Iterable[Tuple[str, str]], data: Dict[str, Any]) -> None:
+    """
+    Publish `data` to many users once `db` commits, each with its own `id`
+    from the (user_id, id) pairs, e.g. the notification rows of a broadcast.
+    Shares payloads like `publish_user_events` instead of one per user.
+    """
+    recipients = list(recipients)
+    if recipients:
+        _publish(db, [([user_id for user_id, _ in recipients], data, [event_id for _, event_id in recipients])])
+
+
+def _publish(db: Session, events: List[Tuple[List[str], Dict[str, Any], Optional[List[str]]]]) -> None:
+    if not events:
+        return
+
+    if settings.NOTIFICATION_STREAM_BACKEND == "postgres":
+        payloads: List[str] = []
+        for user_ids, data, ids in events:
+            payloads.extend(_event_payloads(user_ids, data, ids))
+        pg_notify(db, USER_EVENTS_CHANNEL, payloads)
+    else:
+        def deliver(session: Session) -> None:
+            for user_ids, data, ids in events:
+                _deliver(user_ids, data, ids)
+
+        event.listen(db, "after_commit", deliver, once=True)
+
+
+def _deliver(user_ids: List[str], data: Dict[str, Any], ids: Optional[List[str]]) -> None:
+    if ids is None:
+        notification_broker.publish_threadsafe(user_ids, data)
+        return
+    for user_id, event_id in zip(user_ids, ids):
+        notification_broker.publish_threadsafe([user_id], dict(data, id=event_id))
+
+
+def _event_payloads(user_ids: List[str], data: Dict[str, Any], ids: Optional[List[str]] = None) -> List[str]:
+    """
+    JSON payloads carrying `data` for `user_ids` (and each user's event id when
+    `ids` is given), split so each stays within MAX_PAYLOAD_BYTES
+    """
+    data_json = json.dumps(data, ensure_ascii=False, default=str)
+
+    def payload(user_items: List[str], id_items: List[str]) -> str:
+        lists = f'"user_ids": [{", ".join(user_items)}]'
+        if ids is not None:
+            lists += f', "ids": [{", ".join(id_items)}]'
+        return f'{{{lists}, "data": {data_json}}}'
+
+    overhead = len(payload([], []).encode())
+    payloads: List[str] = []
+    user_chunk: List[str] = []
+    id_chunk: List[str] = []
+    size = overhead
+    for index, user_id in enumerate(user_ids):
+        items = [json.dumps(user_id, ensure_ascii=False)]
+        if ids is not None:
+            items.append(json.dumps(ids[index], ensure_ascii=False))
+        item_size = sum(len(item.encode()) for item in items)
+        separators = 2 * len(items)  # ", " before each item after the first
+        if user_chunk and size + item_size + separators > MAX_PAYLOAD_BYTES:
+            payloads.append(payload(user_chunk, id_chunk))
+            user_chunk, id_chunk, size = [], [], overhead
+        if user_chunk:
+            item_size += separators
+        if overhead + item_size > MAX_PAYLOAD_BYTES:
+            # The event alone fills a payload; the stream is best effort, so skip it
+            logger.warning("User event too large for NOTIFY, not streamed: %s", data.get("event"))
+            return []
+        user_chunk.append(items[0])
+        if ids is not None:
+            id_chunk.append(items[1])
+        size += item_size
+    if user_chunk:
+        payloads.append(payload(user_chunk, id_chunk))
+    return payloads
+
+
+def dispatch_user_event(payload: str) -> None:
+    """NOTIFY callback: forward an event to this process's subscribers"""
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        logger.warning("Ignoring malformed user event payload")
+        return
+    _deliver(message["user_ids"], message["data"], message.get("ids"))
+
+
+def notification_event(notification: Dict[str, Any]) -> Dict[str, Any]:
+    """The stream representation of a new notification"""
+    return {
+        "event": "notification",
+        "id": notification.get("id"),
+        "type": notification.get("type"),
+        "title": notification.get("title"),
+        "related_id": notification.get("related_id"),
+    }
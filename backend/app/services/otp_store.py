@@ -0,0 +1,144 @@
+import abc
+import heapq
+import hmac
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import redis
+
+from app.core.cache import get_redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Compare and delete in one step so an OTP can only be used once
+_VERIFY_AND_DELETE = """
+local stored = redis.call('get', KEYS[1])
+if stored and stored == ARGV[1] then
+    redis.call('del', KEYS[1])
+    return 1
+end
+return 0
+"""
+
+
+class OTPStore(abc.ABC):
+    """Storage for one-time passwords, keyed by mobile number"""
+
+    @abc.abstractmethod
+    def save(self, mobile: str, otp: str, expires_in: int) -> bool:
+        """Store the OTP of a mobile, replacing any previous one"""
+
+    @abc.abstractmethod
+    def verify(self, mobile: str, otp: str) -> bool:
+        """Return True and consume the OTP if it matches and has not expired"""
+
+    @staticmethod
+    def _key(mobile: str) -> str:
+        return f"otp:{mobile}"
+
+
+class RedisOTPStore(OTPStore):
+    """OTPs in Redis with native expiry, shared by every worker process"""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self._verify_script = client.register_script(_VERIFY_AND_DELETE)
+
+    def save(self, mobile: str, otp: str, expires_in: int) -> bool:
+        try:
+            return bool(self.client.setex(self._key(mobile), expires_in, otp))
+        except redis.RedisError as e:
+            logger.error("Saving OTP failed: %s", e)
+            return False
+
+    def verify(self, mobile: str, otp: str) -> bool:
+        try:
+            return self._verify_script(keys=[self._key(mobile)], args=[otp]) == 1
+        except redis.RedisError as e:
+            logger.error("Verifying OTP failed: %s", e)
+            return False
+
+
+class MemoryOTPStore(OTPStore):
+    """
+    Process-local OTP store for single-node setups and development.
+
+    Entries sit in a dict for O(1) lookups and in a min-heap ordered by expiry,
+    so expired entries are swept in O(log n) each on every write. The store is
+    bounded: when full, the entry closest to expiry is evicted.
+    """
+
+    def __init__(self, max_entries: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self, mobile: str, otp: str, expires_in: int) -> bool:
+        key = self._key(mobile)
+        expires_at = self.clock() + expires_in
+        with self._lock:
+            self._sweep()
+            if key not in self._entries:
+                while self._expiry_heap and len(self._entries) >= self.max_entries:
+                    self._evict_one()
+            self._entries[key] = (otp, expires_at)
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            # Overwritten entries leave stale heap items behind; rebuild before it grows unbounded
+            if len(self._expiry_heap) > 2 * max(len(self._entries), 1024):
+                self._expiry_heap = [(expiry, k) for k, (_, expiry) in self._entries.items()]
+                heapq.heapify(self._expiry_heap)
+        return True
+
+    def verify(self, mobile: str, otp: str) -> bool:
+        key = self._key(mobile)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            stored_otp, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return False
+            if not hmac.compare_digest(stored_otp, otp):
+                return False
+            del self._entries[key]
+            return True
+
+    def _sweep(self) -> None:
+        """Drop expired entries from the front of the heap"""
+        now = self.clock()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            self._evict_one()
+
+    def _evict_one(self) -> None:
+        expires_at, key = heapq.heappop(self._expiry_heap)
+        entry = self._entries.get(key)
+        # Skip heap items left behind by an overwrite or a successful verify
+        if entry is not None and entry[1] == expires_at:
+            del self._entries[key]
+
+
+_otp_store: Optional[OTPStore] = None
+_otp_store_lock = threading.Lock()
+
+
+def get_otp_store() -> OTPStore:
+    """The process-wide OTP store: Redis when configured, memory otherwise"""
+    global _otp_store
+    if _otp_store is None:
+        with _otp_store_lock:
+            if _otp_store is None:
+                client = get_redis()
+                if client is not None:
+                    _otp_store = RedisOTPStore(client)
+                else:
+                    _otp_store = MemoryOTPStore(max_entries=settings.OTP_MEMORY_MAX_ENTRIES)
+    return _otp_store
@@ -0,0 +1,214 @@
+import abc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+import redis
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Take one token from every bucket in KEYS, or from none of them.
+# ARGV holds a (rate, capacity) pair per key. Returns the seconds to wait as a
+# string ("0" when allowed) because Lua numbers are truncated to integers.
+_TAKE_TOKENS = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - updated_at) * rate)
+    levels[i] = level
+    if level < 1 then
+        wait = math.max(wait, (1 - level) / rate)
+    end
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    redis.call('HSET', key, 'tokens', levels[i] - 1, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate))
+end
+return '0'
+"""
+
+# Count a verify attempt in a window that starts with the first attempt
+_COUNT_ATTEMPT = """
+local attempts = redis.call('INCR', KEYS[1])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+if attempts > tonumber(ARGV[1]) then
+    return 0
+end
+return 1
+"""
+
+Limit = Tuple[str, float, float]  # (key, tokens per second, capacity)
+
+
+class OTPThrottle(abc.ABC):
+    """
+    Limits on OTP traffic, checked before anything touches the database:
+    token buckets per mobile and per client IP for OTP requests, and a
+    capped number of verify attempts per mobile.
+    """
+
+    def check_request(self, mobile: str, client_ip: Optional[str]) -> float:
+        """Take a token for an OTP request. Returns 0 when allowed, otherwise the seconds to wait"""
+        limits = [(
+            f"otp:throttle:mobile:{mobile}",
+            settings.OTP_MOBILE_BURST / settings.OTP_MOBILE_PERIOD,
+            settings.OTP_MOBILE_BURST,
+        )]
+        if client_ip:
+            limits.append((
+                f"otp:throttle:ip:{client_ip}",
+                settings.OTP_IP_BURST / settings.OTP_IP_PERIOD,
+                settings.OTP_IP_BURST,
+            ))
+        return self._take(limits)
+
+    def check_verify(self, mobile: str) -> bool:
+        """Count a verify attempt; False once the mobile has used up its attempts"""
+        return self._count_attempt(
+            f"otp:throttle:verify:{mobile}",
+            settings.OTP_VERIFY_MAX_ATTEMPTS,
+            settings.OTP_EXPIRE_SECONDS,
+        )
+
+    def reset_verify(self, mobile: str) -> None:
+        """Forget the verify attempts of a mobile after a successful login or a new code"""
+        self._clear(f"otp:throttle:verify:{mobile}")
+
+    @abc.abstractmethod
+    def _take(self, limits: List[Limit]) -> float:
+        """Take one token from every bucket or from none; return the seconds to wait, 0 when taken"""
+
+    @abc.abstractmethod
+    def _count_attempt(self, key: str, max_attempts: int, window: int) -> bool:
+        """Count an attempt in a window that starts with the first one; False past max_attempts"""
+
+    @abc.abstractmethod
+    def _clear(self, key: str) -> None:
+        """Forget the attempts counted under key"""
+
+
+class RedisOTPThrottle(OTPThrottle):
+    """Limits shared by every worker process; each check is one atomic script call"""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self._take_tokens = client.register_script(_TAKE_TOKENS)
+        self._count = client.register_script(_COUNT_ATTEMPT)
+
+    def _take(self, limits: List[Limit]) -> float:
+        args = []
+        for _, rate, capacity in limits:
+            args.extend([rate, capacity])
+        try:
+            return float(self._take_tokens(keys=[key for key, _, _ in limits], args=args))
+        except redis.RedisError as e:
+            # Fail open: an unavailable Redis must not lock everyone out
+            logger.error("OTP throttle check failed: %s", e)
+            return 0.0
+
+    def _count_attempt(self, key: str, max_attempts: int, window: int) -> bool:
+        try:
+            return self._count(keys=[key], args=[max_attempts, window]) == 1
+        except redis.RedisError as e:
+            logger.error("OTP attempt check failed: %s", e)
+            return True
+
+    def _clear(self, key: str) -> None:
+        try:
+            self.client.delete(key)
+        except redis.RedisError as e:
+            logger.error("Clearing OTP attempts failed: %s", e)
+
+
+class MemoryOTPThrottle(OTPThrottle):
+    """
+    Process-local limits for single-node setups. Buckets and attempt counters
+    live in LRU-bounded dicts so random mobiles and IPs cannot grow memory
+    without limit.
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._attempts: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _take(self, limits: List[Limit]) -> float:
+        with self._lock:
+            taken: List[TokenBucket] = []
+            for key, rate, capacity in limits:
+                bucket = self._bucket(key, rate, capacity)
+                wait = bucket.consume()
+                if wait:
+                    for previous in taken:
+                        previous.refund()
+                    return wait
+                taken.append(bucket)
+            return 0.0
+
+    def _bucket(self, key: str, rate: float, capacity: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity, clock=self.clock)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _count_attempt(self, key: str, max_attempts: int, window: int) -> bool:
+        now = self.clock()
+        with self._lock:
+            attempts, expires_at = self._attempts.get(key, (0, 0.0))
+            if expires_at <= now:
+                attempts, expires_at = 0, now + window
+            attempts += 1
+            self._attempts[key] = (attempts, expires_at)
+            self._attempts.move_to_end(key)
+            if len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+            return attempts <= max_attempts
+
+    def _clear(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+
+_otp_throttle: Optional[OTPThrottle] = None
+_otp_throttle_lock = threading.Lock()
+
+
+def get_otp_throttle() -> OTPThrottle:
+    """The process-wide OTP throttle: Redis when configured, memory otherwise"""
+    global _otp_throttle
+    if _otp_throttle is None:
+        with _otp_throttle_lock:
+            if _otp_throttle is None:
+                client = get_redis()
+                if client is not None:
+                    _otp_throttle = RedisOTPThrottle(client)
+                else:
+                    _otp_throttle = MemoryOTPThrottle(max_keys=settings.OTP_THROTTLE_MAX_KEYS)
+    return _otp_throttle
@@ -1,19 +1,24 @@
 pythonfrom typing import List, Optional, Dict, Any
 from datetime import datetime
 
+from sqlalchemy import Float, String, column, insert, update, values
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.core.security import generate_id
 from app.models.user import User
 from app.models.agent import Agent
+from app.models.credit import Credit
 from app.models.payment import Payment, PaymentMethod, PaymentStatus
-from app.models.activity_log import ActivityLog
 from app.schemas.payment import PaymentCreate, PaymentUpdate
+from app.services.activity_log_writer import activity_log_writer, activity_row
 from app.services.credit_service import CreditService
 from app.services.notification_service import NotificationService
-from app.models.transaction import TransactionType
-from app.models.notification import NotificationType
+from app.services.notification_stream import notification_event, publish_user_events
+from app.services.telegram_worker import telegram_worker
+from app.services.unread_counter import unread_counter
+from app.models.transaction import Transaction, TransactionType
+from app.models.notification import Notification, NotificationType
 
 
 class PaymentService:
@@ -77,7 +82,7 @@ class PaymentService:
         self.db.refresh(payment)
         
         # Log activity
-        self._log_activity(
+        activity_log_writer.log(
             user_id, 
             "create", 
             "payment", 
@@ -118,6 +123,19 @@ class PaymentService:
         if not agent:
             raise ValueError("Agent not found for payment user")
         
+        # Log activity; add_transaction commits it with the payment and the credit
+        activity_log_writer.log(
+            admin_id, 
+            "approve", 
+            "payment", 
+            payment.id, 
+            {
+                "amount": payment.amount,
+                "agent_id": agent.id
+            },
+            db=self.db
+        )
+        
         # Add credit to agent
         credit = self.credit_service.add_transaction(
             agent_id=agent.id,
@@ -141,18 +159,6 @@ class PaymentService:
             "send_to_telegram": True
         })
         
-        # Log activity
-        self._log_activity(
-            admin_id, 
-            "approve", 
-            "payment", 
-            payment.id, 
-            {
-                "amount": payment.amount,
-                "agent_id": agent.id
-            }
-        )
-        
         return payment
     
     def reject_payment(
@@ -178,6 +184,19 @@ class PaymentService:
         if admin_note:
             payment.admin_note = admin_note
         
+        # Log activity
+        activity_log_writer.log(
+            admin_id, 
+            "reject", 
+            "payment", 
+            payment.id, 
+            {
+                "amount": payment.amount,
+                "reason": admin_note
+            },
+            db=self.db
+        )
+        
         self.db.commit()
         self.db.refresh(payment)
         
@@ -191,30 +210,239 @@ class PaymentService:
             "send_to_telegram": True
         })
         
-        # Log activity
-        self._log_activity(
-            admin_id, 
-            "reject", 
-            "payment", 
-            payment.id, 
+        return payment
+    
+    def batch_approve_payments(
+        self,
+        payment_ids: List[str],
+        admin_id: str,
+        admin_note: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Approve several payments and deposit their credit in one transaction"""
+        payments, results = self._lock_pending_payments(payment_ids, "approve")
+        if not payments:
+            return self._ordered_results(payment_ids, results)
+        
+        # Resolve the agent of every payment owner with one query
+        user_ids = {payment.user_id for payment in payments}
+        agent_ids = dict(
+            self.db.query(Agent.user_id, Agent.id).filter(Agent.user_id.in_(user_ids)).all()
+        )
+        
+        # Lock the credit rows in id order so concurrent batches cannot deadlock
+        credits: Dict[str, Credit] = {}
+        if agent_ids:
+            for credit in self.db.query(Credit).filter(
+                Credit.agent_id.in_(agent_ids.values())
+            ).order_by(Credit.id).with_for_update().all():
+                credits.setdefault(credit.agent_id, credit)
+        
+        now = datetime.now()
+        balances: Dict[str, float] = {}
+        deltas: Dict[str, float] = {}
+        new_credits = []
+        transactions = []
+        notifications = []
+        logs = []
+        approved_ids = []
+        
+        for payment in payments:
+            agent_id = agent_ids.get(payment.user_id)
+            if not agent_id:
+                results[payment.id] = self._batch_result(
+                    payment.id, False, payment.status, "Agent not found for payment user"
+                )
+                continue
+            
+            credit = credits.get(agent_id)
+            if not credit:
+                # Same behaviour as CreditService.get_agent_credit: create on demand
+                credit = Credit(id=generate_id("CRD"), agent_id=agent_id, balance=0)
+                credits[agent_id] = credit
+                new_credits.append({"id": credit.id, "agent_id": agent_id, "balance": 0})
+            
+            balance = balances.get(credit.id, credit.balance or 0) + payment.amount
+            balances[credit.id] = balance
+            deltas[credit.id] = deltas.get(credit.id, 0) + payment.amount
+            approved_ids.append(payment.id)
+            
+            transactions.append({
+                "id": generate_id("TRN"),
+                "credit_id": credit.id,
+                "payment_id": payment.id,
+                "type": TransactionType.DEPOSIT,
+                "amount": payment.amount,
+                "balance_after": balance,
+                "description": f"Payment approved: {payment.id}",
+                "created_by": admin_id
+            })
+            notifications.append({
+                "id": generate_id("NTF"),
+                "user_id": payment.user_id,
+                "type": NotificationType.PAYMENT,
+                "title": "پرداخت تایید شد",
+                "message": f"پرداخت شما به مبلغ {payment.amount} تومان تایید شد و به اعتبار شما افزوده شد.",
+                "is_read": False,
+                "send_to_telegram": True,
+                "is_sent_to_telegram": False,
+                "related_id": payment.id
+            })
+            logs.append(activity_row(admin_id, "approve", "payment", payment.id, {
+                "amount": payment.amount,
+                "agent_id": agent_id
+            }))
+            results[payment.id] = self._batch_result(payment.id, True, PaymentStatus.COMPLETED)
+        
+        if approved_ids:
+            self._set_payments_status(approved_ids, PaymentStatus.COMPLETED, admin_id, admin_note, now)
+            
+            if new_credits:
+                self.db.execute(insert(Credit), new_credits)
+            
+            # UPDATE credits SET balance = balance + v.delta FROM (VALUES ...) v WHERE credits.id = v.id
+            credit_deltas = values(
+                column("id", String), column("delta", Float), name="v"
+            ).data(list(deltas.items()))
+            self.db.execute(
+                update(Credit)
+                .where(Credit.id == credit_deltas.c.id)
+                .values(balance=Credit.balance + credit_deltas.c.delta),
+                execution_options={"synchronize_session": False}
+            )
+            
+            self.db.execute(insert(Transaction), transactions)
+            self.db.execute(insert(Notification), notifications)
+            activity_log_writer.log_many(logs, db=self.db)
+            publish_user_events(self.db, [
+                ([notification["user_id"]], notification_event(notification))
+                for notification in notifications
+            ])
+        
+        self.db.commit()
+        
+        if approved_ids:
+            unread_counter.incr_many(notification["user_id"] for notification in notifications)
+            telegram_worker.wake()
+        
+        return self._ordered_results(payment_ids, results)
+    
+    def batch_reject_payments(
+        self,
+        payment_ids: List[str],
+        admin_id: str,
+        admin_note: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Reject several payments in one transaction"""
+        payments, results = self._lock_pending_payments(payment_ids, "reject")
+        if not payments:
+            return self._ordered_results(payment_ids, results)
+        
+        now = datetime.now()
+        rejected_ids = [payment.id for payment in payments]
+        self._set_payments_status(rejected_ids, PaymentStatus.REJECTED, admin_id, admin_note, now)
+        
+        notifications = [
             {
+                "id": generate_id("NTF"),
+                "user_id": payment.user_id,
+                "type": NotificationType.PAYMENT,
+                "title": "پرداخت رد شد",
+                "message": f"پرداخت شما به مبلغ {payment.amount} تومان رد شد. {admin_note if admin_note else ''}",
+                "is_read": False,
+                "send_to_telegram": True,
+                "is_sent_to_telegram": False,
+                "related_id": payment.id
+            }
+            for payment in payments
+        ]
+        self.db.execute(insert(Notification), notifications)
+        activity_log_writer.log_many([
+            activity_row(admin_id, "reject", "payment", payment.id, {
                 "amount": payment.amount,
                 "reason": admin_note
-            }
-        )
+            })
+            for payment in payments
+        ], db=self.db)
+        publish_user_events(self.db, [
+            ([notification["user_id"]], notification_event(notification))
+            for notification in notifications
+        ])
         
-        return payment
+        self.db.commit()
+        unread_counter.incr_many(payment.user_id for payment in payments)
+        telegram_worker.wake()
+        
+        for payment in payments:
+            results[payment.id] = self._batch_result(payment.id, True, PaymentStatus.REJECTED)
+        
+        return self._ordered_results(payment_ids, results)
     
-    def _log_activity(self, user_id: str, action: str, entity_type: str, entity_id: str, details: Dict[str, Any]) -> None:
-        """Log user activity"""
-        log_id = generate_id("LOG")
-        log = ActivityLog(
-            id=log_id,
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            details=details
+    def _lock_pending_payments(self, payment_ids: List[str], action: str):
+        """Lock the target payments in id order and split off the ones that cannot change"""
+        results: Dict[str, Dict[str, Any]] = {}
+        locked = self.db.query(Payment).filter(
+            Payment.id.in_(set(payment_ids))
+        ).order_by(Payment.id).with_for_update().all()
+        found = {payment.id for payment in locked}
+        
+        for payment_id in payment_ids:
+            if payment_id not in found:
+                results[payment_id] = self._batch_result(payment_id, False, None, "Payment not found")
+        
+        pending = []
+        for payment in locked:
+            if payment.status != PaymentStatus.PENDING:
+                results[payment.id] = self._batch_result(
+                    payment.id, False, payment.status, f"Cannot {action} {payment.status} payment"
+                )
+            else:
+                pending.append(payment)
+        
+        return pending, results
+    
+    def _set_payments_status(
+        self,
+        payment_ids: List[str],
+        payment_status: PaymentStatus,
+        admin_id: str,
+        admin_note: Optional[str],
+        approved_at: datetime
+    ) -> None:
+        """Apply a status change to a set of payments with a single UPDATE"""
+        changes = {
+            "status": payment_status,
+            "approved_by": admin_id,
+            "approved_at": approved_at
+        }
+        if admin_note:
+            changes["admin_note"] = admin_note
+        
+        self.db.execute(
+            update(Payment).where(Payment.id.in_(payment_ids)).values(**changes),
+            execution_options={"synchronize_session": False}
         )
-        self.db.add(log)
-        self.db.commit()
\ No newline at end of file
+    
+    @staticmethod
+    def _batch_result(
+        payment_id: str,
+        success: bool,
+        payment_status: Optional[PaymentStatus],
+        message: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return {
+            "payment_id": payment_id,
+            "success": success,
+            "status": payment_status,
+            "message": message
+        }
+    
+    @staticmethod
+    def _ordered_results(payment_ids: List[str], results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return one outcome per requested id, in request order"""
+        ordered = []
+        seen = set()
+        for payment_id in payment_ids:
+            if payment_id not in seen:
+                seen.add(payment_id)
+                ordered.append(results[payment_id])
+        return ordered
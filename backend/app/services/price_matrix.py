@@ -0,0 +1,134 @@
+import itertools
+from collections import ChainMap
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.snapshot import SnapshotCache, invalidate_on_commit
+from app.models.agent import agent_group_association
+from app.models.product import Product
+from app.models.product_price import ProductPriceOverride
+
+# Every process rebuilds its price matrix when prices or group memberships change
+PRICES_CHANNEL = "prices_changed"
+
+_generations = itertools.count(1)
+
+
+def effective_price(price: Optional[float], commission_rate: Optional[float]) -> float:
+    """A price after its commission/discount percentage"""
+    return round((price or 0) * (1 - (commission_rate or 0) / 100), 2)
+
+
+@dataclass(frozen=True)
+class AgentPrices:
+    """One agent's row of the price matrix: product id -> price"""
+    # (matrix generation, agent id or None for the shared default row); a cache key for derived data
+    key: Tuple[int, Optional[str]]
+    prices: Mapping[str, float]
+
+    def get(self, product_id: str) -> Optional[float]:
+        return self.prices.get(product_id)
+
+
+@dataclass(frozen=True)
+class PriceMatrix:
+    """
+    Effective price of every product for every agent. Agents without
+    overrides share the default row, so only agents that have a price of
+    their own (directly or through a group) take extra memory.
+    """
+    generation: int
+    default: AgentPrices
+    by_agent: Mapping[str, AgentPrices]
+
+    def prices_for(self, agent_id: Optional[str]) -> AgentPrices:
+        return self.by_agent.get(agent_id, self.default) if agent_id else self.default
+
+    def price_for(self, agent_id: Optional[str], product_id: str) -> Optional[float]:
+        return self.prices_for(agent_id).get(product_id)
+
+
+class PriceMatrixCache(SnapshotCache[PriceMatrix]):
+    """
+    The precomputed price matrix, so pricing is a dictionary lookup instead of
+    rule evaluation. Rules, most specific first:
+
+    1. an override for the agent itself;
+    2. the lowest override among the agent's groups;
+    3. the product price less the product's commission_rate.
+
+    An override is a fixed price or a commission_rate applied to the product
+    price. Writers call `invalidate_prices`.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, ttl: Optional[int] = None):
+        super().__init__(ttl or settings.PRICE_MATRIX_CACHE_TTL, session_factory)
+
+    def prices_for(self, agent_id: Optional[str]) -> AgentPrices:
+        return self.snapshot().prices_for(agent_id)
+
+    def price_for(self, agent_id: Optional[str], product_id: str) -> Optional[float]:
+        return self.snapshot().price_for(agent_id, product_id)
+
+    def _load(self, db: Session) -> PriceMatrix:
+        base = {
+            row.id: row
+            for row in db.execute(select(Product.id, Product.price, Product.commission_rate))
+        }
+        default = {product_id: effective_price(row.price, row.commission_rate) for product_id, row in base.items()}
+
+        group_prices: Dict[str, Dict[str, float]] = {}
+        agent_prices: Dict[str, Dict[str, float]] = {}
+        for override in db.execute(select(ProductPriceOverride)).scalars():
+            product = base.get(override.product_id)
+            if product is None:
+                continue
+            if override.price is not None:
+                price = override.price
+            else:
+                price = effective_price(product.price, override.commission_rate)
+            if override.agent_id:
+                agent_prices.setdefault(override.agent_id, {})[override.product_id] = price
+            else:
+                group_prices.setdefault(override.agent_group_id, {})[override.product_id] = price
+
+        by_agent: Dict[str, Dict[str, float]] = {}
+        if group_prices:
+            memberships = db.execute(
+                select(agent_group_association.c.agent_id, agent_group_association.c.group_id)
+                .where(agent_group_association.c.group_id.in_(list(group_prices)))
+            ).all()
+            for agent_id, group_id in memberships:
+                row = by_agent.setdefault(agent_id, {})
+                for product_id, price in group_prices[group_id].items():
+                    if product_id not in row or price < row[product_id]:
+                        row[product_id] = price
+        # An agent's own price wins over its groups', even when higher
+        for agent_id, prices in agent_prices.items():
+            by_agent.setdefault(agent_id, {}).update(prices)
+
+        generation = next(_generations)
+        return PriceMatrix(
+            generation=generation,
+            default=AgentPrices((generation, None), default),
+            by_agent={
+                agent_id: AgentPrices((generation, agent_id), ChainMap(prices, default))
+                for agent_id, prices in by_agent.items()
+            },
+        )
+
+
+price_matrix = PriceMatrixCache()
+
+
+def invalidate_prices(db: Session) -> None:
+    """
+    Rebuild every process's price matrix once `db` commits.
+    Call before committing the change.
+    """
+    invalidate_on_commit(db, PRICES_CHANNEL, price_matrix)
@@ -0,0 +1,105 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.security import generate_id
+from app.models.agent import Agent
+from app.models.agent_group import AgentGroup
+from app.models.product import Product
+from app.models.product_price import ProductPriceOverride
+from app.schemas.pricing import PriceOverrideCreate, PriceOverrideUpdate
+from app.services.price_matrix import invalidate_prices, price_matrix
+
+
+class PricingService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_overrides(
+        self,
+        product_id: Optional[str] = None,
+        agent_group_id: Optional[str] = None,
+        agent_id: Optional[str] = None
+    ) -> List[ProductPriceOverride]:
+        """Get price overrides with optional filters"""
+        query = self.db.query(ProductPriceOverride)
+        
+        if product_id:
+            query = query.filter(ProductPriceOverride.product_id == product_id)
+        
+        if agent_group_id:
+            query = query.filter(ProductPriceOverride.agent_group_id == agent_group_id)
+        
+        if agent_id:
+            query = query.filter(ProductPriceOverride.agent_id == agent_id)
+        
+        return query.order_by(ProductPriceOverride.product_id).all()
+    
+    def get_override(self, override_id: str) -> Optional[ProductPriceOverride]:
+        """Get price override by ID"""
+        return self.db.query(ProductPriceOverride).filter(ProductPriceOverride.id == override_id).first()
+    
+    def create_override(self, override_in: PriceOverrideCreate) -> ProductPriceOverride:
+        """Set a product price for an agent group or a single agent"""
+        if bool(override_in.agent_group_id) == bool(override_in.agent_id):
+            raise ValueError("Exactly one of agent_group_id and agent_id is required")
+        if override_in.price is None and override_in.commission_rate is None:
+            raise ValueError("Either price or commission_rate is required")
+        
+        if not self.db.query(Product.id).filter(Product.id == override_in.product_id).first():
+            raise ValueError("Product not found")
+        if override_in.agent_group_id and not self.db.query(AgentGroup.id).filter(
+            AgentGroup.id == override_in.agent_group_id
+        ).first():
+            raise ValueError("Agent group not found")
+        if override_in.agent_id and not self.db.query(Agent.id).filter(Agent.id == override_in.agent_id).first():
+            raise ValueError("Agent not found")
+        
+        existing = self.db.query(ProductPriceOverride.id).filter(
+            ProductPriceOverride.product_id == override_in.product_id,
+            ProductPriceOverride.agent_group_id == override_in.agent_group_id
+            if override_in.agent_group_id else
+            ProductPriceOverride.agent_id == override_in.agent_id
+        ).first()
+        if existing:
+            raise ValueError("A price override for this product and target already exists")
+        
+        override = ProductPriceOverride(id=generate_id("PRC"), **override_in.dict())
+        self.db.add(override)
+        invalidate_prices(self.db)
+        self.db.commit()
+        self.db.refresh(override)
+        
+        return override
+    
+    def update_override(self, override_id: str, override_in: PriceOverrideUpdate) -> Optional[ProductPriceOverride]:
+        """Change the price of an override"""
+        override = self.get_override(override_id)
+        if not override:
+            return None
+        if override_in.price is None and override_in.commission_rate is None:
+            raise ValueError("Either price or commission_rate is required")
+        
+        override.price = override_in.price
+        override.commission_rate = override_in.commission_rate
+        invalidate_prices(self.db)
+        self.db.commit()
+        self.db.refresh(override)
+        
+        return override
+    
+    def delete_override(self, override_id: str) -> bool:
+        """Remove an override; the agent or group falls back to the next rule"""
+        override = self.get_override(override_id)
+        if not override:
+            return False
+        
+        self.db.delete(override)
+        invalidate_prices(self.db)
+        self.db.commit()
+        
+        return True
+    
+    def get_agent_prices(self, agent_id: Optional[str]) -> Dict[str, float]:
+        """Effective price of every product for an agent"""
+        return dict(price_matrix.prices_for(agent_id).prices)
@@ -0,0 +1,159 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Iterable, Optional, Tuple
+
+import redis
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.db.listener import pg_notify
+from app.models.agent import Agent
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Other processes drop their in-memory copy when a principal changes
+PRINCIPAL_CHANNEL = "principal_invalidated"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by authorization checks"""
+    id: str
+    role: UserRole
+    is_active: bool
+    agent_id: Optional[str] = None
+
+
+class PrincipalCache:
+    """
+    Principals by user id: a short-TTL LRU in process, backed by Redis when
+    configured, then one users/agents query. Writers that change a user's
+    role, active flag or agent call `invalidate_principals` so changes apply
+    on the next request instead of after the TTL.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl or settings.PRINCIPAL_CACHE_TTL
+        self.max_entries = max_entries or settings.PRINCIPAL_CACHE_MAX_ENTRIES
+        self._memory: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"principal:{user_id}"
+
+    def get(self, db: Session, user_id: str) -> Optional[Principal]:
+        principal = self._get_local(user_id)
+        if principal is not None:
+            return principal
+
+        principal = self._get_shared(user_id)
+        if principal is None:
+            principal = self._load(db, user_id)
+            if principal is None:
+                return None
+            self._set_shared(principal)
+
+        self._set_local(principal)
+        return principal
+
+    def forget(self, user_id: str) -> None:
+        """Drop this process's copy"""
+        with self._lock:
+            self._memory.pop(user_id, None)
+
+    def invalidate(self, user_ids: Iterable[str]) -> None:
+        """Drop this process's copies and the shared ones"""
+        user_ids = list(user_ids)
+        for user_id in user_ids:
+            self.forget(user_id)
+        client = get_redis()
+        if client and user_ids:
+            try:
+                client.delete(*(self._key(user_id) for user_id in user_ids))
+            except redis.RedisError as e:
+                logger.warning("Principal cache invalidation failed: %s", e)
+
+    def _load(self, db: Session, user_id: str) -> Optional[Principal]:
+        # One round trip for the user and their agent record
+        row = db.execute(
+            select(User.id, User.role, User.is_active, Agent.id.label("agent_id"))
+            .outerjoin(Agent, Agent.user_id == User.id)
+            .where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        return Principal(id=row.id, role=row.role, is_active=bool(row.is_active), agent_id=row.agent_id)
+
+    def _get_local(self, user_id: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._memory.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._memory[user_id]
+                return None
+            self._memory.move_to_end(user_id)
+            return principal
+
+    def _set_local(self, principal: Principal) -> None:
+        with self._lock:
+            self._memory[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._memory.move_to_end(principal.id)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _get_shared(self, user_id: str) -> Optional[Principal]:
+        client = get_redis()
+        if not client:
+            return None
+        try:
+            value = client.get(self._key(user_id))
+        except redis.RedisError as e:
+            logger.warning("Principal cache read failed: %s", e)
+            return None
+        if value is None:
+            return None
+        data = json.loads(value)
+        data["role"] = UserRole(data["role"])
+        return Principal(**data)
+
+    def _set_shared(self, principal: Principal) -> None:
+        client = get_redis()
+        if not client:
+            return
+        data = asdict(principal)
+        data["role"] = principal.role.value
+        try:
+            client.setex(self._key(principal.id), self.ttl, json.dumps(data))
+        except redis.RedisError as e:
+            logger.warning("Principal cache write failed: %s", e)
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_principals(db: Session, user_ids: Iterable[str]) -> None:
+    """
+    Invalidate cached principals once `db` commits: locally and in Redis
+    right after the commit, and in other processes through NOTIFY.
+    Call before committing the change.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    pg_notify(db, PRINCIPAL_CHANNEL, user_ids)
+
+    def invalidate(session: Session) -> None:
+        principal_cache.invalidate(user_ids)
+
+    event.listen(db, "after_commit", invalidate, once=True)
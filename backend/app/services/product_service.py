@@ -1,14 +1,20 @@
 pythonfrom typing import List, Optional, Dict, Any
 from datetime import datetime
 
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from pydantic import ValidationError
 from fastapi import HTTPException, status
 
 from app.core.security import generate_id
 from app.models.product import Product, ProductType, DurationType
 from app.models.product_group import ProductGroup
-from app.schemas.product import ProductCreate, ProductUpdate
+from app.schemas.product import ProductCreate, ProductUpdate, ProductImportRow, ProductImportResult
 from app.schemas.product_group import ProductGroupCreate, ProductGroupUpdate
+from app.services.catalog_cache import invalidate_catalog
+from app.services.price_matrix import invalidate_prices
+from app.services.product_transfer import PRODUCT_FIELDS, row_errors
 
 
 class ProductService:
@@ -51,6 +57,8 @@ class ProductService:
         
         product = Product(**product_data)
         self.db.add(product)
+        invalidate_catalog(self.db)
+        invalidate_prices(self.db)
         self.db.commit()
         self.db.refresh(product)
         
@@ -73,6 +81,8 @@ class ProductService:
         for field, value in update_data.items():
             setattr(product, field, value)
         
+        invalidate_catalog(self.db)
+        invalidate_prices(self.db)
         self.db.commit()
         self.db.refresh(product)
         
@@ -85,6 +95,7 @@ class ProductService:
             return None
         
         product.is_active = True
+        invalidate_catalog(self.db)
         self.db.commit()
         self.db.refresh(product)
         
@@ -97,11 +108,94 @@ class ProductService:
             return None
         
         product.is_active = False
+        invalidate_catalog(self.db)
         self.db.commit()
         self.db.refresh(product)
         
         return product
     
+    def import_products(self, rows: List[ProductImportRow], dry_run: bool = False) -> ProductImportResult:
+        """
+        Create or update many products in one transaction. Rows with the id of
+        an existing product update only the fields they contain; other rows
+        create products. With dry_run nothing is written and the result is
+        the diff that would be applied.
+        """
+        errors = []
+        seen_ids = set()
+        for number, row in enumerate(rows, start=1):
+            if row.id and row.id in seen_ids:
+                errors.append(f"Row {number}: duplicate id {row.id}")
+            seen_ids.add(row.id)
+        
+        # Validate every group reference in one query; update rows may leave the group out
+        group_ids = {row.group_id for row in rows if row.group_id is not None}
+        known_groups = set(
+            self.db.scalars(select(ProductGroup.id).where(ProductGroup.id.in_(group_ids)))
+        ) if group_ids else set()
+        for number, row in enumerate(rows, start=1):
+            if row.group_id is not None and row.group_id not in known_groups:
+                errors.append(f"Row {number}: product group {row.group_id} not found")
+        
+        product_ids = [row.id for row in rows if row.id]
+        existing = {
+            record.id: record._asdict()
+            for record in self.db.execute(
+                select(*(getattr(Product, field) for field in PRODUCT_FIELDS)).where(Product.id.in_(product_ids))
+            )
+        } if product_ids else {}
+        
+        # Rows creating a product need what ProductCreate requires; its defaults fill the rest
+        new_products = {}
+        for number, row in enumerate(rows, start=1):
+            if row.id not in existing:
+                try:
+                    new_products[number] = ProductCreate(**row.dict(exclude_unset=True, exclude={"id"})).dict()
+                except ValidationError as e:
+                    errors.extend(row_errors(number, e))
+        if errors:
+            raise ValueError("; ".join(errors))
+        
+        created = []
+        updated = []
+        unchanged = 0
+        values = []
+        for number, row in enumerate(rows, start=1):
+            current = existing.get(row.id)
+            if current is None:
+                product = new_products[number]
+                product["id"] = row.id or generate_id("PRD")
+                changes = {field: [None, product[field]] for field in PRODUCT_FIELDS if field != "id"}
+                created.append({"id": product["id"], "name": product["name"], "changes": changes})
+            else:
+                product = {**current, **row.dict(exclude_unset=True)}
+                changes = {
+                    field: [current[field], product[field]]
+                    for field in PRODUCT_FIELDS
+                    if current[field] != product[field]
+                }
+                if not changes:
+                    unchanged += 1
+                    continue
+                updated.append({"id": product["id"], "name": product["name"], "changes": changes})
+            values.append(product)
+        
+        if values and not dry_run:
+            stmt = insert(Product)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Product.id],
+                set_={
+                    **{field: stmt.excluded[field] for field in PRODUCT_FIELDS if field != "id"},
+                    "updated_at": func.now()
+                }
+            )
+            self.db.execute(stmt, values)
+            invalidate_catalog(self.db)
+            invalidate_prices(self.db)
+            self.db.commit()
+        
+        return ProductImportResult(dry_run=dry_run, created=created, updated=updated, unchanged=unchanged)
+    
     # Product Group methods
     def get_product_groups(self, skip: int = 0, limit: int = 100) -> List[ProductGroup]:
         """Get all product groups"""
@@ -120,6 +214,7 @@ class ProductService:
             description=group_in.description
         )
         self.db.add(group)
+        invalidate_catalog(self.db)
         self.db.commit()
         self.db.refresh(group)
         
@@ -134,6 +229,7 @@ class ProductService:
         group.name = group_in.name
         group.description = group_in.description
         
+        invalidate_catalog(self.db)
         self.db.commit()
         self.db.refresh(group)
         
@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.schemas.product import ProductImportRow
+
+# Columns of an export file, which is also a valid import file
+PRODUCT_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "product_type",
+    "group_id",
+    "price",
+    "commission_rate",
+    "duration_type",
+    "duration_value",
+    "is_active",
+    "has_test_option",
+    "test_duration",
+]
+
+
+def parse_products(content: bytes, filename: str = "") -> List[ProductImportRow]:
+    """
+    Read a product import file: CSV (by extension) or a JSON array of objects.
+    Empty CSV cells are treated as missing. Raises ValueError listing every
+    invalid row.
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("File must be UTF-8 encoded")
+
+    if filename.lower().endswith(".csv"):
+        records = [
+            {key: value for key, value in record.items() if key and value not in (None, "")}
+            for record in csv.DictReader(io.StringIO(text))
+        ]
+    else:
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise ValueError("JSON import must be an array of objects")
+
+    if not records:
+        raise ValueError("File contains no products")
+    if len(records) > settings.PRODUCT_IMPORT_MAX_ROWS:
+        raise ValueError(f"At most {settings.PRODUCT_IMPORT_MAX_ROWS} products can be imported at once")
+
+    rows = []
+    errors = []
+    for number, record in enumerate(records, start=1):
+        try:
+            rows.append(ProductImportRow(**record))
+        except ValidationError as e:
+            errors.extend(row_errors(number, e))
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    return rows
+
+
+def row_errors(number: int, error: ValidationError) -> List[str]:
+    """One message per invalid field of an import row"""
+    return [
+        f"Row {number}: {'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+
+def _export_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def export_products(db: Session, fmt: str = "csv") -> Iterator[str]:
+    """
+    Stream every product as CSV or a JSON array, reading the table in batches
+    so memory stays flat regardless of catalog size.
+    """
+    result = db.execute(
+        select(*(getattr(Product, field) for field in PRODUCT_FIELDS))
+        .order_by(Product.id)
+        .execution_options(yield_per=settings.PRODUCT_EXPORT_BATCH_SIZE)
+    )
+
+    if fmt == "json":
+        yield "["
+        first = True
+        for row in result:
+            record: Dict[str, Any] = {field: _export_value(value) for field, value in zip(PRODUCT_FIELDS, row)}
+            yield ("" if first else ",") + json.dumps(record, ensure_ascii=False)
+            first = False
+        yield "]"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(PRODUCT_FIELDS)
+    for partition in result.partitions():
+        for row in partition:
+            writer.writerow([_export_value(value) for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
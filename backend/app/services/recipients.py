@@ -0,0 +1,33 @@
+from typing import Optional
+
+from sqlalchemy import Select, select
+
+from app.models.agent import Agent, agent_group_association
+from app.models.user import User, UserRole
+
+
+def select_recipients(
+    *columns,
+    agent_group_id: Optional[str] = None,
+    role: Optional[UserRole] = None,
+    active_only: bool = True
+) -> Select:
+    """
+    One query for the users targeted by a broadcast: members of an agent group
+    and/or users with a role, everyone if both are empty.
+    Selects `columns` (User.id by default) with duplicates removed.
+    """
+    query = select(*(columns or (User.id,)))
+    
+    if agent_group_id:
+        query = query.join(Agent, Agent.user_id == User.id).join(
+            agent_group_association, agent_group_association.c.agent_id == Agent.id
+        ).where(agent_group_association.c.group_id == agent_group_id)
+    
+    if role:
+        query = query.where(User.role == role)
+    
+    if active_only:
+        query = query.where(User.is_active == True)
+    
+    return query.distinct()
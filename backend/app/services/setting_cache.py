@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.snapshot import SnapshotCache, invalidate_on_commit
+from app.models.setting import Setting
+
+# Every process reloads its snapshot when settings change
+SETTINGS_CHANNEL = "settings_changed"
+
+
+@dataclass(frozen=True)
+class SettingEntry:
+    """A row of the settings table as cached in a snapshot"""
+    id: str
+    key: str
+    value: str
+    description: Optional[str]
+    category: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """All settings at one point in time; never modified, only replaced"""
+    by_key: Mapping[str, SettingEntry]
+    by_category: Mapping[str, Mapping[str, str]]
+
+
+class SettingCache(SnapshotCache[SettingsSnapshot]):
+    """
+    All settings in one immutable snapshot, so reads are dictionary lookups.
+    Writers call `invalidate_settings`.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, ttl: Optional[int] = None):
+        super().__init__(ttl or settings.SETTINGS_CACHE_TTL, session_factory)
+
+    def get(self, key: str) -> Optional[SettingEntry]:
+        return self.snapshot().by_key.get(key)
+
+    def get_category(self, category: str) -> Mapping[str, str]:
+        return self.snapshot().by_category.get(category, MappingProxyType({}))
+
+    def _load(self, db: Session) -> SettingsSnapshot:
+        entries = [
+            SettingEntry(
+                id=row.id,
+                key=row.key,
+                value=row.value,
+                description=row.description,
+                category=row.category,
+                created_at=row.created_at,
+                updated_at=row.updated_at
+            )
+            for row in db.execute(select(Setting).order_by(Setting.key)).scalars()
+        ]
+
+        by_category = {}
+        for entry in entries:
+            by_category.setdefault(entry.category, {})[entry.key] = entry.value
+        return SettingsSnapshot(
+            by_key=MappingProxyType({entry.key: entry for entry in entries}),
+            by_category=MappingProxyType({
+                category: MappingProxyType(values) for category, values in by_category.items()
+            })
+        )
+
+
+setting_cache = SettingCache()
+
+
+def invalidate_settings(db: Session) -> None:
+    """
+    Refresh every process's settings snapshot once `db` commits.
+    Call before committing the change.
+    """
+    invalidate_on_commit(db, SETTINGS_CHANNEL, setting_cache)
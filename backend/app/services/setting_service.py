@@ -1,30 +1,32 @@
-pythonfrom typing import List, Dict, Optional, Any
+pythonfrom typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 
+from sqlalchemy import String, Text, column, func, update, values
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.core.security import generate_id
 from app.models.setting import Setting
 from app.schemas.setting import SettingCreate, SettingUpdate
+from app.services.setting_cache import SettingEntry, invalidate_settings, setting_cache
 
 
 class SettingService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_settings(self) -> List[Setting]:
+    def get_settings(self) -> List[SettingEntry]:
         """Get all settings"""
-        return self.db.query(Setting).all()
+        return list(setting_cache.snapshot().by_key.values())
     
-    def get_setting_by_key(self, key: str) -> Optional[Setting]:
+    def get_setting_by_key(self, key: str) -> Optional[SettingEntry]:
         """Get setting by key"""
-        return self.db.query(Setting).filter(Setting.key == key).first()
+        return setting_cache.get(key)
     
     def create_setting(self, setting_in: SettingCreate) -> Setting:
         """Create a new setting"""
         # Check if setting key already exists
-        existing_setting = self.get_setting_by_key(setting_in.key)
+        existing_setting = self._get_setting_row(setting_in.key)
         if existing_setting:
             raise ValueError(f"Setting with key '{setting_in.key}' already exists")
         
@@ -38,6 +40,7 @@ class SettingService:
             category=setting_in.category
         )
         self.db.add(setting)
+        invalidate_settings(self.db)
         self.db.commit()
         self.db.refresh(setting)
         
@@ -45,7 +48,7 @@ class SettingService:
     
     def update_setting(self, key: str, setting_in: SettingUpdate) -> Optional[Setting]:
         """Update a setting"""
-        setting = self.get_setting_by_key(key)
+        setting = self._get_setting_row(key)
         if not setting:
             return None
         
@@ -58,6 +61,7 @@ class SettingService:
         if setting_in.category is not None:
             setting.category = setting_in.category
         
+        invalidate_settings(self.db)
         self.db.commit()
         self.db.refresh(setting)
         
@@ -65,24 +69,38 @@ class SettingService:
     
     def get_settings_by_category(self, category: str) -> Dict[str, str]:
         """Get settings by category as a dictionary"""
-        settings = self.db.query(Setting).filter(Setting.category == category).all()
-        
-        # Convert to dictionary
-        settings_dict = {}
-        for setting in settings:
-            settings_dict[setting.key] = setting.value
-        
-        return settings_dict
+        return dict(setting_cache.get_category(category))
     
-    def bulk_update_settings(self, settings_dict: Dict[str, str]) -> int:
-        """Update multiple settings at once"""
-        updated_count = 0
+    def bulk_update_settings(self, settings_dict: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """
+        Update multiple settings with one UPDATE ... FROM (VALUES ...) in one
+        transaction. Returns the updated keys and the keys that do not exist;
+        if any key does not exist nothing is updated.
+        """
+        if not settings_dict:
+            return [], []
         
-        for key, value in settings_dict.items():
-            setting = self.get_setting_by_key(key)
-            if setting:
-                setting.value = value
-                updated_count += 1
+        new_values = values(
+            column("key", String), column("value", Text), name="v"
+        ).data(list(settings_dict.items()))
+        updated = self.db.execute(
+            update(Setting)
+            .where(Setting.key == new_values.c.key)
+            .values(value=new_values.c.value, updated_at=func.now())
+            .returning(Setting.key),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
         
+        updated_keys = set(updated)
+        unknown_keys = [key for key in settings_dict if key not in updated_keys]
+        if unknown_keys:
+            self.db.rollback()
+            return [], unknown_keys
+        
+        invalidate_settings(self.db)
         self.db.commit()
-        return updated_count
\ No newline at end of file
+        return list(updated), []
+    
+    def _get_setting_row(self, key: str) -> Optional[Setting]:
+        """The database row, for changes; reads go through the cache"""
+        return self.db.query(Setting).filter(Setting.key == key).first()
\ No newline at end of file
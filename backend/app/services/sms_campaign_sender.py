@@ -0,0 +1,274 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import String, column, exists, func, select, tuple_, update, values
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.sms_campaign import SMSCampaign, SMSCampaignRecipient, SMSCampaignStatus, SMSRecipientStatus
+from app.services.sms_service import SMSOutbox, sms_outbox
+
+logger = logging.getLogger(__name__)
+
+# Recipients stuck in `sending` for longer than this belong to a crashed sender
+SENDING_LEASE = timedelta(minutes=10)
+# How often running campaigns are picked up and stale recipients recovered
+SWEEP_INTERVAL = 60
+
+
+class SMSCampaignSender:
+    """
+    Sends SMS campaigns from the `sms_campaign_recipients` table.
+
+    Recipients are claimed in batches (`pending` -> `sending`) and the claim is
+    committed before anything goes to a provider, so a crash can never cause a
+    second send: after SENDING_LEASE such rows become `unknown` instead of
+    being retried. At most SMS_CAMPAIGN_CONCURRENCY batches are in flight per
+    campaign, and claims use SKIP LOCKED so several processes can share one.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        outbox: SMSOutbox = sms_outbox,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.outbox = outbox
+        self.batch_size = batch_size or settings.SMS_CAMPAIGN_BATCH_SIZE
+        self.concurrency = concurrency or settings.SMS_CAMPAIGN_CONCURRENCY
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._campaigns: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sweeping for campaigns on the running event loop"""
+        if not self.outbox.enabled or self._task:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        tasks = list(self._campaigns.values())
+        if self._task:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._campaigns = {}
+        self._task = None
+
+    def launch(self, campaign_id: str) -> None:
+        """Start sending a campaign now instead of at the next sweep. Safe to call from any thread."""
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._launch, campaign_id)
+
+    def _launch(self, campaign_id: str) -> None:
+        task = self._campaigns.get(campaign_id)
+        if task and not task.done():
+            return
+        task = asyncio.create_task(self.send_campaign(campaign_id))
+        self._campaigns[campaign_id] = task
+        task.add_done_callback(lambda _: self._campaigns.pop(campaign_id, None))
+
+    async def run(self) -> None:
+        while True:
+            try:
+                for campaign_id in await asyncio.to_thread(self._sweep):
+                    self._launch(campaign_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("SMS campaign sweep failed")
+            await asyncio.sleep(SWEEP_INTERVAL)
+
+    async def send_campaign(self, campaign_id: str) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        in_flight: Set[asyncio.Task] = set()
+        try:
+            while True:
+                await slots.acquire()
+                claimed = await asyncio.to_thread(self._claim_batch, campaign_id)
+                if not claimed:
+                    slots.release()
+                    if not in_flight:
+                        break
+                    # Batches still out may put deferred recipients back to pending
+                    await asyncio.wait(set(in_flight))
+                    continue
+                message, recipients = claimed
+                task = asyncio.create_task(self._send_batch(campaign_id, message, recipients, slots))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        finally:
+            # Let batches already handed to providers record their outcome
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        await asyncio.to_thread(self._complete_if_done, campaign_id)
+
+    async def _send_batch(
+        self,
+        campaign_id: str,
+        message: str,
+        recipients: List[Tuple[str, str]],
+        slots: asyncio.Semaphore,
+    ) -> None:
+        try:
+            mobiles = list(dict.fromkeys(mobile for _, mobile in recipients))
+            sent, errors, deferred = await self.outbox.deliver_many(mobiles, message)
+            deferred = set(deferred)
+            await asyncio.to_thread(
+                self._record_outcomes,
+                campaign_id,
+                {user_id: sent[mobile] for user_id, mobile in recipients if mobile in sent},
+                {
+                    user_id: errors.get(mobile, "not sent")
+                    for user_id, mobile in recipients
+                    if mobile not in sent and mobile not in deferred
+                },
+                [user_id for user_id, mobile in recipients if mobile in deferred],
+            )
+        except Exception:
+            # Rows stay `sending` and are marked `unknown` after the lease
+            logger.exception("SMS campaign %s batch failed", campaign_id)
+        finally:
+            slots.release()
+
+    def _claim_batch(self, campaign_id: str) -> Optional[Tuple[str, List[Tuple[str, str]]]]:
+        """Move the next pending recipients to `sending`. Returns None when there is nothing to send."""
+        db = self.session_factory()
+        try:
+            campaign = db.execute(
+                select(SMSCampaign.status, SMSCampaign.message).where(SMSCampaign.id == campaign_id)
+            ).first()
+            if not campaign or campaign.status != SMSCampaignStatus.SENDING:
+                return None
+
+            candidates = (
+                select(SMSCampaignRecipient.campaign_id, SMSCampaignRecipient.user_id)
+                .where(
+                    SMSCampaignRecipient.campaign_id == campaign_id,
+                    SMSCampaignRecipient.status == SMSRecipientStatus.PENDING,
+                )
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            claimed = db.execute(
+                update(SMSCampaignRecipient)
+                .where(tuple_(SMSCampaignRecipient.campaign_id, SMSCampaignRecipient.user_id).in_(candidates))
+                .values(status=SMSRecipientStatus.SENDING, updated_at=func.now())
+                .returning(SMSCampaignRecipient.user_id, SMSCampaignRecipient.mobile),
+                execution_options={"synchronize_session": False},
+            ).all()
+            db.commit()
+
+            if not claimed:
+                return None
+            return campaign.message, [(row.user_id, row.mobile) for row in claimed]
+        finally:
+            db.close()
+
+    def _record_outcomes(
+        self,
+        campaign_id: str,
+        sent: Dict[str, str],
+        failed: Dict[str, str],
+        requeued: Optional[List[str]] = None,
+    ) -> None:
+        """Store each recipient's result; `requeued` never reached a provider and goes back to pending"""
+        db = self.session_factory()
+        try:
+            options = {"synchronize_session": False}
+            for provider in set(sent.values()):
+                db.execute(
+                    update(SMSCampaignRecipient)
+                    .where(
+                        SMSCampaignRecipient.campaign_id == campaign_id,
+                        SMSCampaignRecipient.user_id.in_([user_id for user_id, name in sent.items() if name == provider]),
+                    )
+                    .values(status=SMSRecipientStatus.SENT, provider=provider, sent_at=func.now(), error=None),
+                    execution_options=options,
+                )
+            if failed:
+                errors = values(
+                    column("user_id", String), column("error", String), name="v"
+                ).data(list(failed.items()))
+                db.execute(
+                    update(SMSCampaignRecipient)
+                    .where(
+                        SMSCampaignRecipient.campaign_id == campaign_id,
+                        SMSCampaignRecipient.user_id == errors.c.user_id,
+                    )
+                    .values(status=SMSRecipientStatus.FAILED, error=errors.c.error),
+                    execution_options=options,
+                )
+            if requeued:
+                db.execute(
+                    update(SMSCampaignRecipient)
+                    .where(
+                        SMSCampaignRecipient.campaign_id == campaign_id,
+                        SMSCampaignRecipient.user_id.in_(requeued),
+                    )
+                    .values(status=SMSRecipientStatus.PENDING),
+                    execution_options=options,
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    def _complete_if_done(self, campaign_id: str) -> None:
+        """Mark the campaign completed once no recipient is pending or in flight"""
+        db = self.session_factory()
+        try:
+            unfinished = exists().where(
+                SMSCampaignRecipient.campaign_id == campaign_id,
+                SMSCampaignRecipient.status.in_([SMSRecipientStatus.PENDING, SMSRecipientStatus.SENDING]),
+            )
+            db.execute(
+                update(SMSCampaign)
+                .where(
+                    SMSCampaign.id == campaign_id,
+                    SMSCampaign.status == SMSCampaignStatus.SENDING,
+                    ~unfinished,
+                )
+                .values(status=SMSCampaignStatus.COMPLETED, completed_at=func.now()),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _sweep(self) -> List[str]:
+        """
+        Recover recipients left in `sending` by a crashed sender and
+        return the campaigns that still have work to do.
+        """
+        db = self.session_factory()
+        try:
+            # Whether these reached the provider is unknown; never send them twice
+            recovered = db.execute(
+                update(SMSCampaignRecipient)
+                .where(
+                    SMSCampaignRecipient.status == SMSRecipientStatus.SENDING,
+                    SMSCampaignRecipient.updated_at < func.now() - SENDING_LEASE,
+                )
+                .values(status=SMSRecipientStatus.UNKNOWN, updated_at=func.now()),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+            if recovered:
+                logger.warning("Marked %s interrupted campaign SMS as unknown", recovered)
+
+            campaign_ids = db.execute(
+                select(SMSCampaign.id).where(SMSCampaign.status == SMSCampaignStatus.SENDING)
+            ).scalars().all()
+            db.commit()
+            return list(campaign_ids)
+        finally:
+            db.close()
+
+
+sms_campaign_sender = SMSCampaignSender()
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import cast, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.security import generate_id
+from app.models.sms_campaign import SMSCampaign, SMSCampaignRecipient, SMSCampaignStatus, SMSRecipientStatus
+from app.models.user import User
+from app.services.recipients import select_recipients
+from app.services.sms_campaign_sender import sms_campaign_sender
+
+
+class SMSCampaignService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_campaign(self, campaign_id: str) -> Optional[SMSCampaign]:
+        return self.db.query(SMSCampaign).filter(SMSCampaign.id == campaign_id).first()
+
+    def get_campaigns(self, skip: int = 0, limit: int = 100) -> List[SMSCampaign]:
+        return self.db.query(SMSCampaign).order_by(SMSCampaign.created_at.desc()).offset(skip).limit(limit).all()
+
+    def create_campaign(self, campaign_data: Dict[str, Any], created_by: str) -> SMSCampaign:
+        """Create a campaign, snapshot its recipients with one INSERT ... SELECT and start sending"""
+        self._require_sender()
+        campaign = SMSCampaign(
+            id=generate_id("CMP"),
+            title=campaign_data["title"],
+            message=campaign_data["message"],
+            status=SMSCampaignStatus.SENDING,
+            agent_group_id=campaign_data.get("agent_group_id"),
+            role=campaign_data.get("role"),
+            created_by=created_by
+        )
+        self.db.add(campaign)
+        self.db.flush()
+
+        recipients = select_recipients(
+            User.id.label("user_id"),
+            User.mobile.label("mobile"),
+            agent_group_id=campaign_data.get("agent_group_id"),
+            role=campaign_data.get("role"),
+            active_only=campaign_data.get("active_only", True)
+        ).where(User.mobile != None).subquery()
+
+        rows = select(
+            literal(campaign.id, SMSCampaignRecipient.campaign_id.type),
+            recipients.c.user_id,
+            recipients.c.mobile,
+            cast(SMSRecipientStatus.PENDING, SMSCampaignRecipient.status.type)
+        )
+        campaign.total_recipients = self.db.execute(
+            insert(SMSCampaignRecipient).from_select(
+                [
+                    SMSCampaignRecipient.campaign_id,
+                    SMSCampaignRecipient.user_id,
+                    SMSCampaignRecipient.mobile,
+                    SMSCampaignRecipient.status
+                ],
+                rows
+            )
+        ).rowcount
+        self.db.commit()
+        self.db.refresh(campaign)
+
+        sms_campaign_sender.launch(campaign.id)
+        return campaign
+
+    def cancel_campaign(self, campaign_id: str) -> SMSCampaign:
+        """Stop a campaign; recipients not yet handed to a provider stay pending"""
+        campaign = self.get_campaign(campaign_id)
+        if not campaign:
+            raise ValueError("Campaign not found")
+        if campaign.status != SMSCampaignStatus.SENDING:
+            raise ValueError("Only a campaign that is sending can be cancelled")
+
+        campaign.status = SMSCampaignStatus.CANCELLED
+        self.db.commit()
+        self.db.refresh(campaign)
+        return campaign
+
+    def resume_campaign(self, campaign_id: str) -> SMSCampaign:
+        """Continue a cancelled campaign with its remaining pending recipients"""
+        campaign = self.get_campaign(campaign_id)
+        if not campaign:
+            raise ValueError("Campaign not found")
+        if campaign.status == SMSCampaignStatus.COMPLETED:
+            raise ValueError("Campaign is already completed")
+        self._require_sender()
+
+        campaign.status = SMSCampaignStatus.SENDING
+        self.db.commit()
+        self.db.refresh(campaign)
+
+        sms_campaign_sender.launch(campaign.id)
+        return campaign
+
+    @staticmethod
+    def _require_sender() -> None:
+        # Without providers the sender never runs and the campaign would stay sending
+        if not sms_campaign_sender.outbox.enabled:
+            raise ValueError("SMS service is not configured")
+
+    def get_recipient_counts(self, campaign_id: str) -> Dict[str, int]:
+        """Number of recipients in each delivery state"""
+        counts = {recipient_status.value: 0 for recipient_status in SMSRecipientStatus}
+        rows = self.db.execute(
+            select(SMSCampaignRecipient.status, func.count())
+            .where(SMSCampaignRecipient.campaign_id == campaign_id)
+            .group_by(SMSCampaignRecipient.status)
+        ).all()
+        for recipient_status, count in rows:
+            counts[recipient_status.value] = count
+        return counts
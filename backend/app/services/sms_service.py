@@ -1,31 +1,305 @@
-pythonimport httpx
-from typing import Optional
+pythonimport asyncio
+import concurrent.futures
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
 
 from app.core.config import settings
+from app.core.metrics import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+# How long shutdown waits for queued messages to go out
+DRAIN_TIMEOUT = 5.0
+# How long a caller on another thread waits for the event loop to accept a message
+ENQUEUE_TIMEOUT = 1.0
+# `_post` result when no pooled connection freed up in time, so nothing reached the provider
+POOL_BUSY = "connection pool busy"
+
+
+class SMSProvider:
+    def __init__(self, name: str, url: str, api_key: str, batch_url: Optional[str] = None):
+        self.name = name
+        self.url = url
+        self.api_key = api_key
+        # Endpoint taking many recipients per request, when the provider has one
+        self.batch_url = batch_url
+
+
+class ProviderStats:
+    """Delivery counters and latencies of one provider"""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.latency = LatencyWindow()
+        self.last_error: Optional[str] = None
+
+    def record(self, latency: float, error: Optional[str] = None) -> None:
+        self.latency.record(latency)
+        if error is None:
+            self.sent += 1
+        else:
+            self.failed += 1
+            self.last_error = error
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            **self.latency.summary("latency"),
+            "last_error": self.last_error,
+        }
+
+
+def configured_providers() -> List[SMSProvider]:
+    providers = []
+    if settings.SMS_API_URL and settings.SMS_API_KEY:
+        providers.append(SMSProvider(
+            "primary", settings.SMS_API_URL, settings.SMS_API_KEY, settings.SMS_BATCH_API_URL
+        ))
+    if settings.SMS_SECONDARY_API_URL and settings.SMS_SECONDARY_API_KEY:
+        providers.append(SMSProvider(
+            "secondary", settings.SMS_SECONDARY_API_URL, settings.SMS_SECONDARY_API_KEY,
+            settings.SMS_SECONDARY_BATCH_API_URL
+        ))
+    return providers
+
+
+class SMSOutbox:
+    """
+    Queue of outgoing SMS drained by a few async senders on the app's event loop.
+
+    Callers only enqueue, so request latency no longer depends on the provider.
+    Messages go out over one pooled `httpx.AsyncClient`; a failed send falls
+    over to the next provider and whole rounds are retried with backoff.
+    The pool has room for `concurrency` senders plus as many bulk requests
+    from `deliver_many`, so campaigns cannot starve OTP delivery.
+    """
+
+    def __init__(
+        self,
+        providers: Optional[List[SMSProvider]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        queue_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        send_retries: Optional[int] = None,
+    ):
+        self.providers = providers if providers is not None else configured_providers()
+        self.queue_size = queue_size or settings.SMS_OUTBOX_SIZE
+        self.concurrency = concurrency or settings.SMS_OUTBOX_CONCURRENCY
+        self.timeout = timeout or settings.SMS_TIMEOUT
+        self.send_retries = send_retries if send_retries is not None else settings.SMS_SEND_RETRIES
+
+        self.stats: Dict[str, ProviderStats] = {provider.name: ProviderStats() for provider in self.providers}
+        self.enqueued = 0
+        self.dropped = 0
+        self.enqueue_timeouts = 0
+        self.delivered = 0
+        self.undelivered = 0
+
+        self._client = client
+        self._owns_client = client is None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._bulk_slots = asyncio.Semaphore(self.concurrency)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.providers)
+
+    def start(self) -> None:
+        """Start the senders on the running event loop"""
+        if not self.enabled or self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 3.0)),
+                limits=httpx.Limits(
+                    max_connections=self.concurrency * 2,
+                    max_keepalive_connections=self.concurrency * 2,
+                ),
+            )
+        self._tasks = [asyncio.create_task(self.run()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("Shutting down with %s SMS still queued", self._queue.qsize())
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        if self._client and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+    def enqueue(self, mobile: str, text: str) -> bool:
+        """
+        Queue a message for delivery. Safe to call from any thread; off the event
+        loop it blocks until the loop takes the message, at most ENQUEUE_TIMEOUT.
+        Returns False when the outbox is not running, the message was dropped or
+        the loop did not take it in time.
+        """
+        if not self._tasks or self._loop is None or self._loop.is_closed():
+            return False
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            return self._put((mobile, text))
+        # Wait for the loop to run _put so a full queue is reported to the caller
+        future = asyncio.run_coroutine_threadsafe(self._put_async((mobile, text)), self._loop)
+        try:
+            return future.result(timeout=ENQUEUE_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.enqueue_timeouts += 1
+            logger.error("SMS outbox did not accept the message to %s in time", mobile)
+            return False
+
+    async def _put_async(self, message: Tuple[str, str]) -> bool:
+        return self._put(message)
+
+    def _put(self, message: Tuple[str, str]) -> bool:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.error("SMS outbox full, dropping message to %s", message[0])
+            return False
+        self.enqueued += 1
+        return True
+
+    async def run(self) -> None:
+        while True:
+            mobile, text = await self._queue.get()
+            try:
+                if await self.deliver(mobile, text):
+                    self.delivered += 1
+                else:
+                    self.undelivered += 1
+                    logger.error("Giving up on SMS to %s", mobile)
+            except Exception:
+                self.undelivered += 1
+                logger.exception("SMS delivery to %s failed", mobile)
+            finally:
+                self._queue.task_done()
+
+    async def deliver(self, mobile: str, text: str) -> bool:
+        """Try every provider in order, retrying whole rounds with backoff"""
+        for attempt in range(self.send_retries + 1):
+            for provider in self.providers:
+                if await self._send(provider, mobile, text):
+                    return True
+            if attempt < self.send_retries:
+                await asyncio.sleep(2 ** attempt)
+        return False
+
+    async def deliver_many(
+        self, mobiles: List[str], text: str
+    ) -> Tuple[Dict[str, str], Dict[str, str], List[str]]:
+        """
+        Send one text to many mobiles in a single round over the providers, without retries.
+        Providers with a batch endpoint get one request for all remaining mobiles.
+        Returns ({mobile: provider that accepted it}, {mobile: last error}, mobiles
+        that never reached a provider because the connection pool stayed busy).
+        """
+        sent: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        deferred: List[str] = []
+        remaining = list(mobiles)
+        for provider in self.providers:
+            if not remaining:
+                break
+            if provider.batch_url:
+                error = await self._post_bulk(provider, provider.batch_url, {"to": remaining, "text": text})
+                results = [error] * len(remaining)
+            else:
+                results = await asyncio.gather(*(
+                    self._post_bulk(provider, provider.url, {"to": mobile, "text": text}) for mobile in remaining
+                ))
+            failed = []
+            for mobile, error in zip(remaining, results):
+                if error is None:
+                    sent[mobile] = provider.name
+                    errors.pop(mobile, None)
+                elif error is POOL_BUSY:
+                    # Every provider shares the pool; leave these for a later batch
+                    errors.pop(mobile, None)
+                    deferred.append(mobile)
+                else:
+                    errors[mobile] = f"{provider.name}: {error}"
+                    failed.append(mobile)
+            remaining = failed
+        return sent, errors, deferred
+
+    async def _post_bulk(self, provider: SMSProvider, url: str, payload: Dict[str, Any]) -> Optional[str]:
+        async with self._bulk_slots:
+            return await self._post(provider, url, payload)
+
+    async def _send(self, provider: SMSProvider, mobile: str, text: str) -> bool:
+        return await self._post(provider, provider.url, {"to": mobile, "text": text}) is None
+
+    async def _post(self, provider: SMSProvider, url: str, payload: Dict[str, Any]) -> Optional[str]:
+        """POST to a provider and record its stats. Returns None on success, otherwise the error."""
+        started = time.perf_counter()
+        error = None
+        try:
+            response = await self._client.post(
+                url,
+                headers={"Authorization": f"Bearer {provider.api_key}"},
+                json=payload,
+            )
+            if not response.is_success:
+                error = f"HTTP {response.status_code}"
+        except httpx.PoolTimeout:
+            logger.warning("No free connection for SMS provider %s", provider.name)
+            return POOL_BUSY
+        except httpx.HTTPError as e:
+            error = f"{type(e).__name__}: {e}"
+
+        self.stats[provider.name].record(time.perf_counter() - started, error)
+        if error:
+            logger.warning("SMS provider %s failed: %s", provider.name, error)
+        return error
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "enqueue_timeouts": self.enqueue_timeouts,
+            "delivered": self.delivered,
+            "undelivered": self.undelivered,
+            "providers": {name: stats.as_dict() for name, stats in self.stats.items()},
+        }
+
+
+sms_outbox = SMSOutbox()
 
 
 class SMSService:
-    async def send_otp(self, mobile: str, otp: str) -> bool:
+    def __init__(self, outbox: SMSOutbox = sms_outbox):
+        self.outbox = outbox
+
+    def send_otp(self, mobile: str, otp: str) -> bool:
         """
-        Send OTP code via SMS
+        Queue the OTP code for delivery via SMS
         """
-        if not settings.SMS_API_URL or not settings.SMS_API_KEY:
+        if not self.outbox.enabled:
             # SMS service not configured
-            print(f"SMS service not configured. Would send OTP {otp} to {mobile}")
+            logger.warning(f"SMS service not configured. Would send OTP {otp} to {mobile}")
             return True
         
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    settings.SMS_API_URL,
-                    headers={"Authorization": f"Bearer {settings.SMS_API_KEY}"},
-                    json={
-                        "to": mobile,
-                        "text": f"Your verification code is: {otp}"
-                    }
-                )
-                
-                return response.status_code == 200
-        except Exception as e:
-            print(f"Error sending SMS: {e}")
-            return False
\ No newline at end of file
+        return self.outbox.enqueue(mobile, f"Your verification code is: {otp}")
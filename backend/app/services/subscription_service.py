@@ -5,13 +5,15 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.core.security import generate_id
-from app.models.user import User
 from app.models.subscription import Subscription, SubscriptionStatus
 from app.models.product import Product, DurationType
 from app.models.agent import Agent
+from app.models.user import UserRole
 from app.models.transaction import Transaction, TransactionType
-from app.models.activity_log import ActivityLog
+from app.services.activity_log_writer import activity_log_writer
 from app.services.credit_service import CreditService
+from app.services.price_matrix import effective_price, price_matrix
+from app.services.principal_cache import Principal
 from app.schemas.subscription import SubscriptionCreate, SubscriptionUpdate
 
 
@@ -46,7 +48,7 @@ class SubscriptionService:
         """Get subscription by ID"""
         return self.db.query(Subscription).filter(Subscription.id == subscription_id).first()
     
-    def create_subscription(self, subscription_in: SubscriptionCreate, current_user: User) -> Subscription:
+    def create_subscription(self, subscription_in: SubscriptionCreate, current_user: Principal) -> Subscription:
         """Create a new subscription"""
         # Check if product exists
         product = self.db.query(Product).filter(Product.id == subscription_in.product_id).first()
@@ -62,8 +64,13 @@ class SubscriptionService:
         if not agent:
             raise ValueError("Agent not found")
         
-        # Calculate price if not provided
-        price = subscription_in.price if subscription_in.price is not None else product.price
+        # Agents always pay their price from the price matrix; only admins may set one by hand
+        price = subscription_in.price if current_user.role != UserRole.AGENT else None
+        if price is None:
+            price = price_matrix.price_for(agent.id, product.id)
+        if price is None:
+            # Product created after the matrix was built
+            price = effective_price(product.price, product.commission_rate)
         
         # If test subscription, use test duration
         if subscription_in.is_test:
@@ -91,7 +98,7 @@ class SubscriptionService:
         self.db.refresh(subscription)
         
         # Log activity
-        self._log_activity(
+        activity_log_writer.log(
             current_user.id, 
             "create", 
             "subscription", 
@@ -128,7 +135,7 @@ class SubscriptionService:
         
         return subscription
     
-    def activate_subscription(self, subscription_id: str, current_user: User) -> Optional[Subscription]:
+    def activate_subscription(self, subscription_id: str, current_user: Principal) -> Optional[Subscription]:
         """Activate a subscription"""
         subscription = self.get_subscription(subscription_id)
         if not subscription:
@@ -178,11 +185,8 @@ class SubscriptionService:
         # Update status
         subscription.status = SubscriptionStatus.ACTIVE
         
-        self.db.commit()
-        self.db.refresh(subscription)
-        
-        # Log activity
-        self._log_activity(
+        # Log activity; committed together with the activation
+        activity_log_writer.log(
             current_user.id, 
             "activate", 
             "subscription", 
@@ -190,12 +194,16 @@ class SubscriptionService:
             {
                 "start_date": subscription.start_date.isoformat(),
                 "end_date": subscription.end_date.isoformat() if subscription.end_date else None
-            }
+            },
+            db=self.db
         )
         
+        self.db.commit()
+        self.db.refresh(subscription)
+        
         return subscription
     
-    def suspend_subscription(self, subscription_id: str, current_user: User) -> Optional[Subscription]:
+    def suspend_subscription(self, subscription_id: str, current_user: Principal) -> Optional[Subscription]:
         """Suspend a subscription"""
         subscription = self.get_subscription(subscription_id)
         if not subscription:
@@ -212,7 +220,7 @@ class SubscriptionService:
         self.db.refresh(subscription)
         
         # Log activity
-        self._log_activity(
+        activity_log_writer.log(
             current_user.id, 
             "suspend", 
             "subscription", 
@@ -221,17 +229,3 @@ class SubscriptionService:
         )
         
         return subscription
-    
-    def _log_activity(self, user_id: str, action: str, entity_type: str, entity_id: str, details: Dict[str, Any]) -> None:
-        """Log user activity"""
-        log_id = generate_id("LOG")
-        log = ActivityLog(
-            id=log_id,
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            details=details
-        )
-        self.db.add(log)
-        self.db.commit()
\ No newline at end of file
@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucket
+from app.db.session import SessionLocal
+from app.models.notification import Notification
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed notification stays invisible to other workers
+CLAIM_LEASE = timedelta(minutes=2)
+# Base delay in seconds for the persistent backoff between claims (doubles per attempt)
+RETRY_BASE_DELAY = 30
+
+SENT = "sent"
+RETRY = "retry"
+DROP = "drop"
+# Not attempted before the claim ran out; the row goes back without using an attempt
+RELEASE = "release"
+
+
+class TelegramDeliveryWorker:
+    """
+    Drains notifications waiting for Telegram delivery
+    (`send_to_telegram = true AND is_sent_to_telegram = false`) in batches.
+
+    Rows are claimed with `FOR UPDATE SKIP LOCKED` so several app processes can
+    run a worker each. Messages go out over one pooled `httpx.AsyncClient`,
+    throttled by a global and a per-chat token bucket. Inline retries stop at
+    half the claim lease; later ones are rescheduled on the row (honouring
+    Telegram's `retry_after`) so a reclaiming worker never sends twice.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        client: Optional[httpx.AsyncClient] = None,
+        api_url: Optional[str] = None,
+        bot_token: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        global_rate: Optional[float] = None,
+        per_chat_rate: Optional[float] = None,
+        send_retries: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.api_url = (api_url or settings.TELEGRAM_API_URL).rstrip("/")
+        self.bot_token = bot_token or settings.TELEGRAM_BOT_TOKEN
+        self.batch_size = batch_size or settings.TELEGRAM_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.TELEGRAM_POLL_INTERVAL
+        self.per_chat_rate = per_chat_rate or settings.TELEGRAM_PER_CHAT_RATE
+        self.send_retries = send_retries if send_retries is not None else settings.TELEGRAM_SEND_RETRIES
+        self.max_attempts = max_attempts or settings.TELEGRAM_MAX_ATTEMPTS
+
+        global_rate = global_rate or settings.TELEGRAM_GLOBAL_RATE
+        self.global_bucket = TokenBucket(rate=global_rate, capacity=global_rate)
+        self.chat_buckets: Dict[str, TokenBucket] = {}
+
+        self._client = client
+        self._owns_client = client is None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.bot_token)
+
+    def start(self) -> None:
+        """Start the delivery loop on the running event loop"""
+        if not self.enabled or self._task:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+            )
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+    def wake(self) -> None:
+        """Signal that new notifications are waiting. Safe to call from any thread."""
+        if self._loop and self._wake and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delivered = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Telegram delivery batch failed")
+                delivered = 0
+
+            # A full batch means there is probably more waiting
+            if delivered >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def drain_once(self) -> int:
+        """Claim and deliver one batch. Returns the number of claimed notifications."""
+        batch = await asyncio.to_thread(self._claim_batch)
+        if not batch:
+            return 0
+        # Leave the other half of the lease for recording the outcomes
+        deadline = time.monotonic() + CLAIM_LEASE.total_seconds() / 2
+
+        # Messages for the same chat go out in order, different chats in parallel
+        by_chat: Dict[str, List[Tuple[str, str]]] = {}
+        outcomes: Dict[str, str] = {}
+        retry_after: Dict[str, float] = {}
+        for notification_id, chat_id, text in batch:
+            if not chat_id:
+                outcomes[notification_id] = DROP
+            else:
+                by_chat.setdefault(chat_id, []).append((notification_id, text))
+
+        async def deliver_chat(chat_id: str, messages: List[Tuple[str, str]]) -> None:
+            for notification_id, text in messages:
+                outcome, delay = await self._send(chat_id, text, deadline)
+                outcomes[notification_id] = outcome
+                if delay:
+                    retry_after[notification_id] = delay
+
+        await asyncio.gather(*(deliver_chat(chat_id, messages) for chat_id, messages in by_chat.items()))
+        await asyncio.to_thread(self._record_outcomes, outcomes, retry_after)
+        self._prune_chat_buckets()
+
+        return len(batch)
+
+    def _claim_batch(self) -> List[Tuple[str, Optional[str], str]]:
+        db = self.session_factory()
+        try:
+            now = func.now()
+            candidates = (
+                select(Notification.id)
+                .where(
+                    Notification.send_to_telegram == True,
+                    Notification.is_sent_to_telegram == False,
+                    Notification.telegram_attempts < self.max_attempts,
+                    (Notification.telegram_next_attempt_at == None) | (Notification.telegram_next_attempt_at <= now),
+                )
+                .order_by(Notification.created_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            claimed = db.execute(
+                update(Notification)
+                .where(Notification.id.in_(candidates))
+                .values(
+                    telegram_attempts=Notification.telegram_attempts + 1,
+                    telegram_next_attempt_at=now + CLAIM_LEASE,
+                )
+                .returning(Notification.id, Notification.user_id, Notification.title, Notification.message),
+                execution_options={"synchronize_session": False},
+            ).all()
+
+            chat_ids = {}
+            if claimed:
+                chat_ids = dict(db.execute(
+                    select(User.id, User.telegram_id).where(User.id.in_({row.user_id for row in claimed}))
+                ).all())
+            db.commit()
+
+            return [
+                (row.id, chat_ids.get(row.user_id), f"*{row.title}*\n\n{row.message}")
+                for row in claimed
+            ]
+        finally:
+            db.close()
+
+    def _record_outcomes(self, outcomes: Dict[str, str], retry_after: Optional[Dict[str, float]] = None) -> None:
+        """Store each outcome; `retry_after` holds the delays Telegram asked for on RETRY rows"""
+        retry_after = retry_after or {}
+        sent = [notification_id for notification_id, outcome in outcomes.items() if outcome == SENT]
+        retry = [notification_id for notification_id, outcome in outcomes.items() if outcome == RETRY]
+        drop = [notification_id for notification_id, outcome in outcomes.items() if outcome == DROP]
+        release = [notification_id for notification_id, outcome in outcomes.items() if outcome == RELEASE]
+
+        # Rows retried at the same delay share one UPDATE; 0 means the backoff alone
+        retry_by_delay: Dict[float, List[str]] = {}
+        for notification_id in retry:
+            retry_by_delay.setdefault(retry_after.get(notification_id, 0), []).append(notification_id)
+
+        db = self.session_factory()
+        try:
+            options = {"synchronize_session": False}
+            if sent:
+                db.execute(
+                    update(Notification).where(Notification.id.in_(sent))
+                    .values(is_sent_to_telegram=True, telegram_next_attempt_at=None),
+                    execution_options=options,
+                )
+            for delay, ids in retry_by_delay.items():
+                # 30s, 60s, 120s, ... between attempts, or longer when Telegram says so
+                db.execute(
+                    update(Notification).where(Notification.id.in_(ids))
+                    .values(
+                        telegram_next_attempt_at=func.now() + func.make_interval(
+                            0, 0, 0, 0, 0, 0,
+                            func.greatest(RETRY_BASE_DELAY * func.power(2, Notification.telegram_attempts - 1), delay)
+                        )
+                    ),
+                    execution_options=options,
+                )
+            if drop:
+                db.execute(
+                    update(Notification).where(Notification.id.in_(drop))
+                    .values(send_to_telegram=False, telegram_next_attempt_at=None),
+                    execution_options=options,
+                )
+            if release:
+                db.execute(
+                    update(Notification).where(Notification.id.in_(release))
+                    .values(telegram_attempts=Notification.telegram_attempts - 1, telegram_next_attempt_at=None),
+                    execution_options=options,
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    async def _send(self, chat_id: str, text: str, deadline: float) -> Tuple[str, Optional[float]]:
+        """
+        Deliver one message, retrying inline until `deadline` (monotonic).
+        Returns the outcome and, for RETRY, the `retry_after` Telegram sent if any.
+        """
+        url = f"{self.api_url}/bot{self.bot_token}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": "Markdown"}
+
+        attempt = 0
+        while True:
+            await self._acquire(self._chat_bucket(chat_id))
+            await self._acquire(self.global_bucket)
+            if attempt == 0 and time.monotonic() > deadline:
+                # Throttled past the lease: another worker may own the row by now
+                return RELEASE, None
+
+            delay = 2 ** attempt
+            retry_after = None
+            try:
+                response = await self._client.post(url, json=payload)
+            except httpx.HTTPError as e:
+                logger.warning("Telegram request failed for chat %s: %s", chat_id, e)
+            else:
+                if response.status_code == 200:
+                    return SENT, None
+                if response.status_code == 429:
+                    # Telegram tells us exactly how long to back off
+                    try:
+                        retry_after = delay = float(response.json()["parameters"]["retry_after"])
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                elif response.status_code < 500:
+                    # Blocked bot, unknown chat, malformed message: retrying will not help
+                    logger.warning(
+                        "Telegram rejected message for chat %s: %s %s",
+                        chat_id, response.status_code, response.text,
+                    )
+                    return DROP, None
+
+            if attempt >= self.send_retries or time.monotonic() + delay > deadline:
+                # Reschedule on the row rather than sleep past the claim
+                return RETRY, retry_after
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(rate=self.per_chat_rate, capacity=1)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _prune_chat_buckets(self) -> None:
+        for chat_id in [chat_id for chat_id, bucket in self.chat_buckets.items() if bucket.is_full()]:
+            del self.chat_buckets[chat_id]
+
+    @staticmethod
+    async def _acquire(bucket: TokenBucket) -> None:
+        wait = bucket.consume()
+        while wait:
+            await asyncio.sleep(wait)
+            wait = bucket.consume()
+
+
+telegram_worker = TelegramDeliveryWorker()
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import redis
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.db.listener import pg_notify
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Memory mode: other processes learn about revocations through NOTIFY
+TOKEN_VERSION_CHANNEL = "token_version"
+MEMORY_MAX_USERS = 10000
+
+# Versions only grow, so a stale value can never overwrite a newer one
+_SET_IF_GREATER = """
+local current = tonumber(redis.call('get', KEYS[1]))
+local value = tonumber(ARGV[1])
+if current == nil or value > current then
+    redis.call('set', KEYS[1], value, 'EX', ARGV[2])
+    return value
+end
+return current
+"""
+
+
+class TokenVersionStore:
+    """
+    Current token version per user, i.e. a compact revocation list: a token
+    is valid only while its `ver` claim equals the user's version.
+
+    Versions are cached in Redis when configured, otherwise in a bounded
+    in-process LRU kept current across processes by NOTIFY. A miss costs one
+    primary-key lookup.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, max_users: int = MEMORY_MAX_USERS):
+        self.ttl = ttl or settings.TOKEN_VERSION_CACHE_TTL
+        self.max_users = max_users
+        self._memory: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._set_script = None
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"token_version:{user_id}"
+
+    def get(self, db: Session, user_id: str) -> Optional[int]:
+        """The user's current version, or None if the user does not exist"""
+        cached = self._get_cached(user_id)
+        if cached is not None:
+            return cached
+
+        version = db.execute(select(User.token_version).where(User.id == user_id)).scalar()
+        if version is None:
+            return None
+        return self.store(user_id, version)
+
+    def store(self, user_id: str, version: int) -> int:
+        """Cache a version unless a newer one is known. Returns the version in effect."""
+        client = get_redis()
+        if client:
+            if self._set_script is None:
+                self._set_script = client.register_script(_SET_IF_GREATER)
+            try:
+                return int(self._set_script(keys=[self._key(user_id)], args=[version, self.ttl]))
+            except redis.RedisError as e:
+                logger.warning("Token version write failed: %s", e)
+                return version
+
+        with self._lock:
+            entry = self._memory.get(user_id)
+            if entry is not None and entry[0] > version:
+                version = entry[0]
+            self._memory[user_id] = (version, time.monotonic() + self.ttl)
+            self._memory.move_to_end(user_id)
+            while len(self._memory) > self.max_users:
+                self._memory.popitem(last=False)
+            return version
+
+    def on_notify(self, payload: str) -> None:
+        """NOTIFY callback carrying `user_id:version`"""
+        user_id, _, version = payload.rpartition(":")
+        try:
+            self.store(user_id, int(version))
+        except ValueError:
+            logger.warning("Ignoring malformed token version payload")
+
+    def _get_cached(self, user_id: str) -> Optional[int]:
+        client = get_redis()
+        if client:
+            try:
+                value = client.get(self._key(user_id))
+                return int(value) if value is not None else None
+            except redis.RedisError as e:
+                logger.warning("Token version read failed: %s", e)
+                return None
+
+        with self._lock:
+            entry = self._memory.get(user_id)
+            if entry is None:
+                return None
+            version, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._memory[user_id]
+                return None
+            self._memory.move_to_end(user_id)
+            return version
+
+
+token_versions = TokenVersionStore()
+
+
+def revoke_tokens(db: Session, user_ids: Iterable[str]) -> Dict[str, int]:
+    """
+    Invalidate every access and refresh token of the given users by bumping
+    their token version. Takes effect when `db` commits. Call before committing.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+
+    versions = dict(db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(token_version=User.token_version + 1)
+        .returning(User.id, User.token_version),
+        execution_options={"synchronize_session": False},
+    ).all())
+
+    if get_redis() is None:
+        pg_notify(db, TOKEN_VERSION_CHANNEL, [f"{user_id}:{version}" for user_id, version in versions.items()])
+
+    def publish(session: Session) -> None:
+        for user_id, version in versions.items():
+            token_versions.store(user_id, version)
+
+    event.listen(db, "after_commit", publish, once=True)
+    return versions
@@ -0,0 +1,89 @@
+import logging
+from typing import Iterable, Optional
+
+import redis
+
+from app.core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Counters expire so any drift from the database heals on the next read
+COUNTER_TTL = 300
+
+# Adjust a counter only if it is cached; never go below zero
+_INCR_IF_EXISTS = """
+if redis.call('exists', KEYS[1]) == 1 then
+    local value = redis.call('incrby', KEYS[1], ARGV[1])
+    if value < 0 then
+        redis.call('set', KEYS[1], 0, 'KEEPTTL')
+        return 0
+    end
+    return value
+end
+return nil
+"""
+
+
+class UnreadCounter:
+    """
+    Per-user unread notification counts, cached in Redis.
+
+    A missing counter means "unknown": the caller counts from the database and
+    stores the result with `set`. Writers only adjust counters that exist, so a
+    stale value can at worst live for COUNTER_TTL seconds.
+
+    Without Redis nothing is cached and every read counts from the database:
+    a per-process copy would miss the writes handled by other workers.
+    """
+
+    def __init__(self, ttl: int = COUNTER_TTL):
+        self.ttl = ttl
+        self._incr_script = None
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"notifications:unread:{user_id}"
+
+    def get(self, user_id: str) -> Optional[int]:
+        client = get_redis()
+        if not client:
+            return None
+        try:
+            value = client.get(self._key(user_id))
+            return int(value) if value is not None else None
+        except redis.RedisError as e:
+            logger.warning("Unread counter read failed: %s", e)
+            return None
+
+    def set(self, user_id: str, count: int) -> None:
+        client = get_redis()
+        if not client:
+            return
+        try:
+            client.setex(self._key(user_id), self.ttl, count)
+        except redis.RedisError as e:
+            logger.warning("Unread counter write failed: %s", e)
+
+    def incr(self, user_id: str, amount: int = 1) -> None:
+        self.incr_many([user_id], amount)
+
+    def incr_many(self, user_ids: Iterable[str], amount: int = 1) -> None:
+        """Adjust the cached counters of several users in one round trip"""
+        client = get_redis()
+        if not client:
+            return
+        try:
+            if self._incr_script is None:
+                self._incr_script = client.register_script(_INCR_IF_EXISTS)
+            pipe = client.pipeline(transaction=False)
+            for user_id in user_ids:
+                self._incr_script(keys=[self._key(user_id)], args=[amount], client=pipe)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Unread counter update failed: %s", e)
+
+    def reset(self, user_id: str) -> None:
+        self.set(user_id, 0)
+
+
+unread_counter = UnreadCounter()
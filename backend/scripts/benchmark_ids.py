@@ -0,0 +1,71 @@
+"""
+Compare primary key insert throughput and index size of the old random IDs
+against the time-ordered IDs produced by generate_id.
+
+Run from backend/ against a scratch database (uses the app's settings):
+
+    python scripts/benchmark_ids.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.security import generate_id  # noqa: E402
+from app.db.session import engine  # noqa: E402
+
+
+def random_id(prefix: str) -> str:
+    """The previous scheme: 10 random characters, scattered over the whole index"""
+    return f"{prefix}-{''.join(random.choices(string.ascii_uppercase + string.digits, k=10))}"
+
+
+def run(name, make_id, rows: int, batch_size: int) -> None:
+    table = f"id_benchmark_{name}"
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(text(f"CREATE TABLE {table} (id varchar PRIMARY KEY, payload text)"))
+
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        batch = [{"id": make_id("BEN"), "payload": "x" * 64} for _ in range(min(batch_size, rows - offset))]
+        with engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {table} (id, payload) VALUES (:id, :payload)"), batch)
+    elapsed = time.perf_counter() - started
+
+    with engine.begin() as conn:
+        index_size = conn.execute(text(f"SELECT pg_relation_size('{table}_pkey')")).scalar()
+        leaf_density = conn.execute(text(
+            f"SELECT avg_leaf_density FROM pgstatindex('{table}_pkey')"
+        )).scalar() if _has_pgstattuple(conn) else None
+        conn.execute(text(f"DROP TABLE {table}"))
+
+    density = f"{leaf_density:.1f}%" if leaf_density is not None else "n/a"
+    print(
+        f"{name:>12}: {rows / elapsed:>10.0f} rows/s  "
+        f"index {index_size / 1024 / 1024:>8.1f} MiB  leaf density {density}"
+    )
+
+
+def _has_pgstattuple(conn) -> bool:
+    return bool(conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pgstattuple'")).scalar())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    run("random", random_id, args.rows, args.batch_size)
+    run("time_sorted", generate_id, args.rows, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
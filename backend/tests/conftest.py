@@ -0,0 +1,126 @@
+import itertools
+import queue
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.security import generate_id
+from app.db.base import Base
+from app.db import listener as listener_module
+from app.db.listener import PgListener, pg_notify
+from app.db.session import SessionLocal, engine
+from app.models.agent import Agent
+from app.models.user import User, UserRole
+
+_mobiles = itertools.count(9120000001)
+_READY = "listener-ready"
+
+
+@pytest.fixture(scope="session")
+def database():
+    """
+    The tests write to and truncate the configured database, so they only
+    run against one whose name ends in "test".
+    """
+    if not (engine.url.database or "").endswith("test"):
+        pytest.skip("POSTGRES_DB must name a scratch database ending in 'test'")
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("database is not reachable")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def db(database):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+        with database.begin() as connection:
+            connection.execute(text(f"TRUNCATE {tables} CASCADE"))
+
+
+@pytest.fixture
+def make_user(db):
+    def make(role: UserRole = UserRole.ADMIN, **fields) -> User:
+        mobile = f"0{next(_mobiles)}"
+        user = User(
+            id=generate_id("USR"),
+            role=role,
+            **{
+                "username": mobile,
+                "mobile": mobile,
+                "first_name": "Test",
+                "last_name": role.value,
+                "is_active": True,
+                **fields
+            }
+        )
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_agent(db, make_user):
+    def make(**fields) -> Agent:
+        agent = Agent(id=generate_id("AGT"), user=make_user(UserRole.AGENT, **fields))
+        db.add(agent)
+        db.commit()
+        return agent
+    return make
+
+
+@pytest.fixture
+def listen(database, monkeypatch):
+    """
+    Start a PgListener standing in for another process. `listen(channel, callback)`
+    returns once LISTEN is in place, with a queue receiving every payload after
+    `callback` has handled it.
+    """
+    # Short polls so stopping the listener does not hold up the test
+    monkeypatch.setattr(listener_module, "POLL_TIMEOUT", 0.2)
+    listeners = []
+
+    def start(channel, callback) -> queue.Queue:
+        received = queue.Queue()
+
+        def forward(payload: str) -> None:
+            if payload != _READY:
+                callback(payload)
+            received.put(payload)
+
+        listener = PgListener(database)
+        listener.subscribe(channel, forward)
+        listener.start()
+        listeners.append(listener)
+        # LISTEN is issued on the listener thread, so notify until it is in place
+        deadline = time.monotonic() + 10
+        while True:
+            with Session(database) as session:
+                pg_notify(session, channel, [_READY])
+                session.commit()
+            try:
+                if received.get(timeout=0.5) == _READY:
+                    break
+            except queue.Empty:
+                if time.monotonic() > deadline:
+                    pytest.fail("LISTEN never took effect")
+        # Drop duplicate ready payloads still in flight
+        time.sleep(0.1)
+        while not received.empty():
+            received.get()
+        return received
+
+    yield start
+    for listener in listeners:
+        listener.stop()
@@ -0,0 +1,104 @@
+import time
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.models.activity_log import ActivityLog
+from app.services import activity_log_writer as writer_module
+from app.services.activity_log_writer import ActivityLogWriter, activity_row
+
+
+class FakeSessions:
+    """Session factory whose inserts fail with `error` for the first `failures` calls"""
+
+    def __init__(self, error=None, failures=0, bad_ids=()):
+        self.error = error
+        self.failures = failures
+        self.bad_ids = set(bad_ids)
+        self.attempts = []
+        self.written = []
+
+    def __call__(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    def execute(self, statement, rows):
+        sessions = self.sessions
+        sessions.attempts.append(len(rows))
+        if sessions.failures:
+            sessions.failures -= 1
+            raise sessions.error
+        if any(row["id"] in sessions.bad_ids for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("violates foreign key constraint"))
+        sessions.written.extend(rows)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _rows(count):
+    return [activity_row("USR-1", "login") for _ in range(count)]
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_connection_errors_retry_the_whole_batch(monkeypatch):
+    monkeypatch.setattr(writer_module, "RETRY_DELAY", 0.01)
+    sessions = FakeSessions(OperationalError("INSERT", {}, Exception("connection refused")), failures=2)
+    writer = ActivityLogWriter(session_factory=sessions, flush_interval=0.05)
+    writer.start()
+    try:
+        writer.log_many(_rows(3))
+        _wait_for(lambda: len(sessions.written) == 3)
+    finally:
+        writer.stop()
+
+    # Retried as one batch, never split into single rows
+    assert sessions.attempts == [3, 3, 3]
+    assert len(sessions.written) == 3
+
+
+def test_shutdown_gives_up_on_an_unreachable_database(monkeypatch):
+    monkeypatch.setattr(writer_module, "RETRY_DELAY", 0.01)
+    sessions = FakeSessions(OperationalError("INSERT", {}, Exception("connection refused")), failures=100)
+    writer = ActivityLogWriter(session_factory=sessions, flush_interval=0.05)
+    writer.start()
+    writer.log_many(_rows(2))
+    _wait_for(lambda: sessions.attempts)
+
+    writer.stop()
+
+    assert sessions.written == []
+
+
+def test_data_errors_fall_back_to_single_rows():
+    rows = _rows(3)
+    sessions = FakeSessions(bad_ids=[rows[1]["id"]])
+
+    ActivityLogWriter(session_factory=sessions).log_many(rows)
+
+    assert sessions.attempts == [3, 1, 1, 1]
+    assert [row["id"] for row in sessions.written] == [rows[0]["id"], rows[2]["id"]]
+
+
+def test_a_bad_row_does_not_lose_the_rest_of_the_batch(db, make_user):
+    user = make_user()
+    rows = [activity_row(user.id, "login"), activity_row("USR-missing", "login"), activity_row(user.id, "logout")]
+
+    ActivityLogWriter().log_many(rows)
+
+    written = {row.id for row in db.query(ActivityLog.id)}
+    assert written == {rows[0]["id"], rows[2]["id"]}
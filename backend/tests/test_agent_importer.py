@@ -0,0 +1,174 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.core.security import generate_id
+from app.models.agent import Agent
+from app.models.agent_group import AgentGroup
+from app.models.agent_import import AgentImportJob, AgentImportStatus
+from app.models.user import User
+from app.services import agent_importer as importer_module
+from app.services.agent_importer import JOB_LEASE, AgentImporter
+
+
+@pytest.fixture
+def importer():
+    importer = AgentImporter(hash_workers=1, hash_chunk=2)
+    yield importer
+    importer.shutdown()
+
+
+@pytest.fixture
+def make_job(db, make_user):
+    admin = make_user()
+
+    def make(status=AgentImportStatus.PENDING, idle=timedelta(0)) -> str:
+        job = AgentImportJob(
+            id=generate_id("IMP"),
+            status=status,
+            total_rows=0,
+            processed_rows=0,
+            created_count=0,
+            skipped_count=0,
+            created_by=admin.id
+        )
+        db.add(job)
+        db.commit()
+        db.execute(update(AgentImportJob).where(AgentImportJob.id == job.id).values(updated_at=func.now() - idle))
+        db.commit()
+        return job.id
+    return make
+
+
+def status_of(db, job_id):
+    db.expire_all()
+    return db.get(AgentImportJob, job_id).status
+
+
+def test_recovery_fails_jobs_past_the_lease(db, importer, make_job):
+    stale_running = make_job(AgentImportStatus.RUNNING, JOB_LEASE + timedelta(minutes=1))
+    stale_pending = make_job(AgentImportStatus.PENDING, JOB_LEASE + timedelta(minutes=1))
+    live = make_job(AgentImportStatus.RUNNING)
+    done = make_job(AgentImportStatus.COMPLETED, JOB_LEASE * 2)
+
+    assert importer.recover_stale_jobs() == 2
+
+    assert status_of(db, stale_running) == AgentImportStatus.FAILED
+    assert status_of(db, stale_pending) == AgentImportStatus.FAILED
+    assert db.get(AgentImportJob, stale_running).completed_at is not None
+    assert status_of(db, live) == AgentImportStatus.RUNNING
+    assert status_of(db, done) == AgentImportStatus.COMPLETED
+
+
+def test_recovered_job_is_not_run(db, importer, make_job):
+    job_id = make_job(AgentImportStatus.PENDING, JOB_LEASE + timedelta(minutes=1))
+    importer.recover_stale_jobs()
+
+    importer.run(job_id, [{"mobile": "09121110000", "first_name": "A", "last_name": "B"}])
+
+    assert status_of(db, job_id) == AgentImportStatus.FAILED
+    assert db.scalar(select(func.count()).select_from(Agent)) == 0
+
+
+def test_jobs_share_one_hash_pool(db, importer, make_job):
+    first, second = make_job(), make_job()
+
+    importer.run(first, [{"mobile": "09121110001", "first_name": "A", "last_name": "B", "password": "secret-1"}])
+    pool = importer._hash_pool
+    importer.run(second, [{"mobile": "09121110002", "first_name": "A", "last_name": "B", "password": "secret-2"}])
+
+    assert pool is not None and importer._hash_pool is pool
+    assert status_of(db, first) == AgentImportStatus.COMPLETED
+    assert status_of(db, second) == AgentImportStatus.COMPLETED
+    assert db.scalar(select(func.count()).select_from(Agent)) == 2
+
+
+def run_import(db, importer, make_job, records):
+    job_id = make_job()
+    importer.run(job_id, records)
+    db.expire_all()
+    return db.get(AgentImportJob, job_id)
+
+
+def statuses(job):
+    return [(entry["row"], entry["mobile"], entry["status"]) for entry in job.report]
+
+
+def test_rows_are_validated_and_reported(db, importer, make_job):
+    job = run_import(db, importer, make_job, [
+        {"mobile": "+98 912 111 0003", "first_name": "A", "email": "a@example.com"},
+        {"mobile": "98-912-111-0004"},
+        {"mobile": "12345"},
+        {"mobile": "09121110003"},
+        {"mobile": "09121110005", "email": "A@Example.com"},
+        {"mobile": "09121110006", "email": "not-an-email"},
+    ])
+
+    assert job.status == AgentImportStatus.COMPLETED
+    assert (job.processed_rows, job.created_count, job.skipped_count) == (6, 2, 4)
+    assert statuses(job) == [
+        (1, "09121110003", "created"),
+        (2, "09121110004", "created"),
+        (3, "12345", "invalid"),
+        (4, "09121110003", "duplicate"),
+        (5, "09121110005", "duplicate"),
+        (6, "09121110006", "invalid"),
+    ]
+    assert job.report[5]["error"].startswith("email:")
+    created = db.get(User, job.report[0]["user_id"])
+    assert (created.mobile, created.username, created.email) == ("09121110003", "09121110003", "a@example.com")
+    assert db.get(Agent, job.report[0]["agent_id"]).user_id == created.id
+
+
+def test_existing_users_are_matched_on_mobile_username_and_email(db, importer, make_job, make_user):
+    make_user(mobile="09121110011", username="someone")
+    make_user(mobile="09121119999", username="09121110012")
+    make_user(mobile="09121119998", username="other", email="Taken@Example.com")
+
+    job = run_import(db, importer, make_job, [
+        {"mobile": "09121110011"},
+        {"mobile": "09121110012"},
+        {"mobile": "09121110013", "email": "taken@example.COM"},
+        {"mobile": "09121110014"},
+    ])
+
+    assert [status for _, _, status in statuses(job)] == ["exists", "exists", "exists", "created"]
+    assert job.created_count == 1
+
+
+def test_groups_are_resolved_by_id_or_unique_name(db, importer, make_job):
+    db.add_all([
+        AgentGroup(id="AGG-1", name="North"),
+        AgentGroup(id="AGG-2", name="North"),
+        AgentGroup(id="AGG-3", name="South"),
+    ])
+    db.commit()
+
+    job = run_import(db, importer, make_job, [
+        {"mobile": "09121110021", "groups": "AGG-1; South"},
+        {"mobile": "09121110022", "groups": "North"},
+        {"mobile": "09121110023", "groups": "South;Nowhere"},
+    ])
+
+    assert [status for _, _, status in statuses(job)] == ["created", "invalid", "invalid"]
+    assert job.report[1]["error"] == "Unknown or ambiguous agent group: North"
+    assert job.report[2]["error"] == "Unknown or ambiguous agent group: Nowhere"
+    agent = db.get(Agent, job.report[0]["agent_id"])
+    assert sorted(group.id for group in agent.groups) == ["AGG-1", "AGG-3"]
+
+
+def test_failed_insert_rolls_back_the_whole_job(db, importer, make_job, monkeypatch):
+    def fail(rows, db=None):
+        raise RuntimeError("activity log unavailable")
+
+    monkeypatch.setattr(importer_module.activity_log_writer, "log_many", fail)
+
+    job = run_import(db, importer, make_job, [{"mobile": "09121110031"}, {"mobile": "09121110032"}])
+
+    assert job.status == AgentImportStatus.FAILED
+    assert job.error == "activity log unavailable"
+    assert job.completed_at is not None
+    assert job.report is None
+    assert db.scalar(select(func.count()).select_from(User).where(User.mobile.in_(["09121110031", "09121110032"]))) == 0
+    assert db.scalar(select(func.count()).select_from(Agent)) == 0
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.api.deps import get_current_admin, get_current_user
+from app.api.endpoints import agents
+from app.db.query_counter import assert_max_queries
+from app.models.agent_group import AgentGroup
+from app.models.user import UserRole
+from app.services.principal_cache import Principal
+
+# Agents with their users in one query, groups of every agent in one more
+AGENT_QUERIES = 2
+
+
+@pytest.fixture
+def client(db, make_user):
+    admin = make_user()
+    principal = Principal(id=admin.id, role=UserRole.ADMIN, is_active=True)
+    app = FastAPI()
+    app.include_router(agents.router, prefix="/agents")
+    app.dependency_overrides[get_current_admin] = lambda: principal
+    app.dependency_overrides[get_current_user] = lambda: principal
+    return TestClient(app)
+
+
+@pytest.fixture
+def grouped_agents(db, make_agent):
+    groups = [AgentGroup(id=f"AGG-{number}", name=f"Group {number}") for number in range(3)]
+    made = []
+    for number in range(20):
+        agent = make_agent(business_name=f"Shop {number}")
+        agent.groups = groups[:number % 3 + 1]
+        made.append(agent)
+    db.commit()
+    return made
+
+
+def test_agent_list_query_count_does_not_grow_with_agents(client, grouped_agents):
+    with assert_max_queries(AGENT_QUERIES):
+        response = client.get("/agents/?limit=100")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 20
+    assert sorted(len(agent["group_names"]) for agent in response.json()) == [1] * 7 + [2] * 7 + [3] * 6
+
+
+def test_agent_search_query_count(db, client, grouped_agents):
+    if not db.execute(text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")).scalar():
+        pytest.skip("agent search needs the pg_trgm extension")
+
+    with assert_max_queries(AGENT_QUERIES):
+        response = client.get("/agents/?search=shop")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 20
+
+
+def test_agent_detail_query_count(client, grouped_agents):
+    agent_id, user_id = grouped_agents[2].id, grouped_agents[2].user_id
+
+    with assert_max_queries(AGENT_QUERIES):
+        response = client.get(f"/agents/{agent_id}")
+
+    assert response.status_code == 200
+    assert response.json()["user"]["id"] == user_id
+    assert len(response.json()["group_names"]) == 3
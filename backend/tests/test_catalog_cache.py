@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app.schemas.product import ProductCreate, ProductUpdate
+from app.schemas.product_group import ProductGroupCreate
+from app.services import catalog_cache as catalog_module
+from app.services.catalog_cache import CachedBody, catalog_cache
+from app.services.product_service import ProductService
+
+
+def request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.fixture
+def group(db):
+    catalog_cache.invalidate()
+    return ProductService(db).create_product_group(ProductGroupCreate(name="VPN"))
+
+
+def test_matching_etag_gets_304():
+    cached = CachedBody.of([{"id": "PRD-1"}])
+
+    fresh = cached.response(request())
+    assert fresh.status_code == 200
+    assert fresh.body == cached.body
+    assert fresh.headers["etag"] == cached.etag
+
+    for header in (cached.etag, f'"other", W/{cached.etag}', "*"):
+        not_modified = cached.response(request(header))
+        assert not_modified.status_code == 304
+        assert not_modified.body == b""
+        assert not_modified.headers["etag"] == cached.etag
+
+    assert cached.response(request('"other"')).status_code == 200
+
+
+def test_writes_invalidate_the_catalog_after_commit(db, group):
+    service = ProductService(db)
+    product = service.create_product(ProductCreate(name="Monthly", group_id=group.id, price=1000))
+    before = catalog_cache.products()
+    assert [item["name"] for item in json.loads(before.body)] == ["Monthly"]
+    assert catalog_cache.products() is before
+
+    service.update_product(product.id, ProductUpdate(name="Monthly plus"))
+
+    after = catalog_cache.products()
+    assert after.etag != before.etag
+    assert [item["name"] for item in json.loads(after.body)] == ["Monthly plus"]
+    assert json.loads(catalog_cache.product(product.id).body)["name"] == "Monthly plus"
+    assert json.loads(catalog_cache.group(group.id).body)["product_count"] == 1
+
+
+def test_pages_are_evicted_least_recently_used(db, group, monkeypatch):
+    monkeypatch.setattr(catalog_module, "MAX_CACHED_PAGES", 2)
+    first = catalog_cache.products(limit=1)
+    catalog_cache.products(limit=2)
+
+    assert catalog_cache.products(limit=1) is first
+    catalog_cache.products(limit=3)
+
+    assert catalog_cache.products(limit=1) is first
+    assert ("products", 0, 2, None, None, None) not in catalog_cache.snapshot()._pages
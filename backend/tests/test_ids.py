@@ -0,0 +1,69 @@
+import re
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from app.core import security
+from app.core.security import generate_id, generate_id_sql
+
+ID_PATTERN = re.compile(r"^SUB-[0-9A-F]{26}$")
+
+
+def _time_ms(generated: str) -> int:
+    return int(generated.split("-", 1)[1][:12], 16)
+
+
+def test_id_shape_and_time_part():
+    before = time.time_ns() // 1_000_000
+    generated = generate_id("SUB")
+    after = time.time_ns() // 1_000_000
+
+    assert ID_PATTERN.match(generated)
+    assert before <= _time_ms(generated) <= after
+
+
+def test_ids_increase_within_one_millisecond(monkeypatch):
+    now = time.time_ns()
+    monkeypatch.setattr(security.time, "time_ns", lambda: now)
+
+    ids = [generate_id("SUB") for _ in range(1000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert {_time_ms(generated) for generated in ids} == {now // 1_000_000}
+
+
+def test_ids_keep_increasing_when_the_clock_steps_back(monkeypatch):
+    clock = [time.time_ns()]
+    monkeypatch.setattr(security.time, "time_ns", lambda: clock[0])
+    first = generate_id("SUB")
+
+    clock[0] -= 5_000_000_000
+
+    assert generate_id("SUB") > first
+
+
+def test_ids_are_unique_across_threads():
+    ids = []
+
+    def generate():
+        ids.extend(generate_id("SUB") for _ in range(2000))
+
+    threads = [threading.Thread(target=generate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(ids)) == 16000
+
+
+def test_sql_ids_match_the_python_shape(db):
+    python_id = generate_id("SUB")
+    sql_ids = db.execute(select(generate_id_sql("SUB")).select_from(func.generate_series(1, 1000))).scalars().all()
+
+    assert all(ID_PATTERN.match(generated) for generated in sql_ids)
+    assert len(set(sql_ids)) == len(sql_ids)
+    assert len(sql_ids[0]) == len(python_id)
+    assert abs(_time_ms(sql_ids[0]) - _time_ms(python_id)) < 5000
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app.services.last_login_buffer import LastLoginBuffer
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def updates(database):
+    """UPDATE statements sent to the database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            statements.append(statement)
+
+    event.listen(database, "before_cursor_execute", record)
+    yield statements
+    event.remove(database, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def buffer():
+    # Started so logins are only buffered; the interval keeps the flusher idle
+    buffer = LastLoginBuffer(flush_interval=3600)
+    buffer.start()
+    yield buffer
+    buffer.stop()
+
+
+def last_login(db, user):
+    db.refresh(user)
+    return user.last_login
+
+
+def test_flush_merges_repeated_logins(db, make_user, buffer, updates):
+    first, second = make_user(), make_user()
+    buffer.record(first.id, NOW)
+    buffer.record(first.id, NOW + timedelta(minutes=5))
+    buffer.record(first.id, NOW + timedelta(minutes=1))
+    buffer.record(second.id, NOW)
+
+    assert updates == []
+    assert buffer.flush() == 2
+
+    assert len(updates) == 1 and "FROM (VALUES" in updates[0]
+    assert last_login(db, first) == NOW + timedelta(minutes=5)
+    assert last_login(db, second) == NOW
+    assert buffer.flush() == 0
+
+
+def test_last_login_never_moves_backwards(db, make_user, buffer):
+    user = make_user()
+    buffer.record(user.id, NOW)
+    buffer.flush()
+
+    # Another process flushes an older login after this one
+    other = LastLoginBuffer()
+    other.record(user.id, NOW - timedelta(hours=1))
+
+    assert last_login(db, user) == NOW
+
+
+def test_first_login_is_written(db, make_user):
+    user = make_user()
+
+    LastLoginBuffer().record(user.id, NOW)
+
+    assert last_login(db, user) == NOW
+
+
+def test_stop_flushes_buffered_logins(db, make_user):
+    user = make_user()
+    buffer = LastLoginBuffer(flush_interval=3600)
+    buffer.start()
+    buffer.record(user.id, NOW)
+    assert last_login(db, user) is None
+
+    buffer.stop()
+
+    assert last_login(db, user) == NOW
@@ -0,0 +1,33 @@
+import queue
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.listener import PgListener, pg_notify
+
+CHANNEL = "test_listener"
+
+
+def test_notify_from_another_connection_reaches_callback(database):
+    received = queue.Queue()
+    listener = PgListener(database)
+    listener.subscribe(CHANNEL, received.put)
+    listener.start()
+    try:
+        # LISTEN is issued on the listener thread, so notify until it is in place
+        deadline = time.monotonic() + 10
+        while True:
+            with Session(database) as session:
+                pg_notify(session, CHANNEL, ["hello"])
+                session.commit()
+            try:
+                payload = received.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if time.monotonic() > deadline:
+                    pytest.fail("NOTIFY never reached the listener")
+    finally:
+        listener.stop()
+
+    assert payload == "hello"
@@ -0,0 +1,36 @@
+import threading
+
+from app.core.metrics import LatencyWindow
+
+
+def test_percentiles_in_milliseconds():
+    window = LatencyWindow()
+    assert window.percentile(0.5) is None
+    for ms in range(1, 101):
+        window.record(ms / 1000)
+
+    assert window.summary("latency") == {
+        "latency_p50_ms": 51.0,
+        "latency_p95_ms": 96.0,
+        "latency_max_ms": 100.0,
+    }
+
+
+def test_summary_while_other_threads_record():
+    window = LatencyWindow(size=50)
+    stop = threading.Event()
+
+    def record():
+        while not stop.is_set():
+            window.record(0.001)
+
+    recorders = [threading.Thread(target=record) for _ in range(4)]
+    for thread in recorders:
+        thread.start()
+    try:
+        for _ in range(2000):
+            assert window.summary("latency")["latency_max_ms"] == 1.0
+    finally:
+        stop.set()
+        for thread in recorders:
+            thread.join()
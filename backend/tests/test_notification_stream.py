@@ -0,0 +1,149 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.core.security import generate_id
+from app.models.agent_group import AgentGroup
+from app.models.notification import Notification
+from app.models.user import UserRole
+from app.services import notification_stream
+from app.services.notification_service import NotificationService
+from app.services.notification_stream import (
+    MAX_PAYLOAD_BYTES,
+    dispatch_user_event,
+    notification_event,
+    publish_user_events
+)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Payloads queued for NOTIFY, still sent to PostgreSQL"""
+    payloads = []
+    real_pg_notify = notification_stream.pg_notify
+
+    def record(session, channel, batch):
+        payloads.extend(batch)
+        real_pg_notify(session, channel, batch)
+
+    monkeypatch.setattr(notification_stream, "pg_notify", record)
+    return payloads
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Events handed to this process's broker, as (user_ids, event)"""
+    events = []
+    monkeypatch.setattr(
+        notification_stream.notification_broker,
+        "publish_threadsafe",
+        lambda user_ids, event: events.append((list(user_ids), event))
+    )
+    return events
+
+
+def broadcast(db, **fields):
+    data = {"title": "اطلاعیه", "message": "متن", "type": "system", **fields}
+    return NotificationService(db).broadcast_notification(data)
+
+
+def notifications_by_user(db):
+    return dict(db.execute(select(Notification.user_id, Notification.id)).all())
+
+
+def test_large_recipient_lists_fit_in_notify_payloads(db, sent):
+    user_ids = [generate_id("USR") for _ in range(1000)]
+    event = notification_event({"id": generate_id("NTF"), "type": "system", "title": "اطلاعیه همگانی"})
+
+    publish_user_events(db, [(user_ids, event)])
+    # PostgreSQL rejects any payload of 8000 bytes or more when it is queued
+    db.commit()
+
+    messages = [json.loads(payload) for payload in sent]
+    assert len(messages) > 1
+    assert all(len(payload.encode()) <= MAX_PAYLOAD_BYTES for payload in sent)
+    assert [user_id for message in messages for user_id in message["user_ids"]] == user_ids
+    assert all(message["data"] == event for message in messages)
+
+
+def test_broadcast_selects_recipients(db, make_user, make_agent):
+    group = AgentGroup(id=generate_id("AGG"), name="North")
+    member, other_agent = make_agent(), make_agent()
+    inactive_member = make_agent(is_active=False)
+    member.groups.append(group)
+    inactive_member.groups.append(group)
+    admin = make_user(UserRole.ADMIN)
+    inactive_admin = make_user(UserRole.ADMIN, is_active=False)
+    db.commit()
+
+    assert broadcast(db, agent_group_id=group.id) == 1
+    assert set(notifications_by_user(db)) == {member.user_id}
+
+    db.query(Notification).delete()
+    assert broadcast(db, agent_group_id=group.id, active_only=False) == 2
+    assert set(notifications_by_user(db)) == {member.user_id, inactive_member.user_id}
+
+    db.query(Notification).delete()
+    assert broadcast(db, role=UserRole.ADMIN) == 1
+    assert set(notifications_by_user(db)) == {admin.id}
+
+    db.query(Notification).delete()
+    assert broadcast(db) == 3
+    assert set(notifications_by_user(db)) == {member.user_id, other_agent.user_id, admin.id}
+    assert inactive_admin.id not in notifications_by_user(db)
+
+
+def test_broadcast_events_carry_each_users_notification_id(db, make_user, sent):
+    users = [make_user() for _ in range(3)]
+
+    assert broadcast(db, related_id="ORD-1") == 3
+
+    messages = [json.loads(payload) for payload in sent]
+    streamed = {
+        user_id: dict(message["data"], id=event_id)
+        for message in messages
+        for user_id, event_id in zip(message["user_ids"], message["ids"])
+    }
+    created = notifications_by_user(db)
+    assert set(streamed) == {user.id for user in users}
+    assert {user_id: event["id"] for user_id, event in streamed.items()} == created
+    assert all(event["related_id"] == "ORD-1" for event in streamed.values())
+
+
+def test_broadcast_ids_are_split_with_their_users(db, sent):
+    recipients = [(generate_id("USR"), generate_id("NTF")) for _ in range(1000)]
+
+    notification_stream.publish_broadcast_events(db, recipients, notification_event({"type": "system"}))
+    db.commit()
+
+    messages = [json.loads(payload) for payload in sent]
+    assert len(messages) > 1
+    assert all(len(payload.encode()) <= MAX_PAYLOAD_BYTES for payload in sent)
+    assert [
+        pair for message in messages for pair in zip(message["user_ids"], message["ids"])
+    ] == recipients
+
+
+def test_dispatch_publishes_each_user_their_own_id(published):
+    event = notification_event({"type": "system", "title": "t"})
+
+    dispatch_user_event(json.dumps({"user_ids": ["USR-1", "USR-2"], "ids": ["NTF-1", "NTF-2"], "data": event}))
+    dispatch_user_event(json.dumps({"user_ids": ["USR-3"], "data": dict(event, id="NTF-3")}))
+
+    assert published == [
+        (["USR-1"], dict(event, id="NTF-1")),
+        (["USR-2"], dict(event, id="NTF-2")),
+        (["USR-3"], dict(event, id="NTF-3")),
+    ]
+
+
+def test_memory_backend_publishes_ids_after_commit(db, published, monkeypatch):
+    monkeypatch.setattr(notification_stream.settings, "NOTIFICATION_STREAM_BACKEND", "memory")
+    event = notification_event({"type": "system"})
+
+    notification_stream.publish_broadcast_events(db, [("USR-1", "NTF-1"), ("USR-2", "NTF-2")], event)
+    assert published == []
+    db.commit()
+
+    assert published == [(["USR-1"], dict(event, id="NTF-1")), (["USR-2"], dict(event, id="NTF-2"))]
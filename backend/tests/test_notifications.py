@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.core.config import settings
+from app.core.security import generate_id
+from app.db.partitions import ensure_monthly_partitions, is_partitioned
+from app.models.notification import Notification, NotificationType, notifications_archive
+from app.services.notification_retention import NotificationRetentionService
+from app.services.notification_service import NotificationService
+
+
+def _add_notification(db, user_id, age_days=0, is_read=False):
+    notification_id = generate_id("NTF")
+    db.execute(insert(Notification), [{
+        "id": notification_id,
+        "user_id": user_id,
+        "type": NotificationType.SYSTEM,
+        "title": "title",
+        "message": "message",
+        "is_read": is_read,
+        "created_at": datetime.now(timezone.utc) - timedelta(days=age_days)
+    }])
+    db.commit()
+    return notification_id
+
+
+def test_create_all_builds_the_partitioned_layout(db):
+    assert is_partitioned(db, "notifications")
+    assert db.execute(text("SELECT to_regclass('notifications_default')")).scalar()
+    assert db.execute(text("SELECT to_regclass('notifications_archive')")).scalar()
+
+
+def test_partition_maintenance_refuses_an_unpartitioned_table(db):
+    db.execute(text("CREATE TABLE unpartitioned_test (id int, created_at timestamptz)"))
+    try:
+        with pytest.raises(RuntimeError, match="not a partitioned table"):
+            ensure_monthly_partitions(db, "unpartitioned_test")
+    finally:
+        db.rollback()
+
+
+def test_unread_count_uses_the_listed_window(db, make_user):
+    user = make_user()
+    _add_notification(db, user.id)
+    old_id = _add_notification(db, user.id, age_days=settings.NOTIFICATION_HOT_DAYS + 1)
+    service = NotificationService(db)
+
+    listed = service.get_user_notifications(user.id, unread_only=True)
+    assert len(listed) == 1
+    assert service.get_unread_count(user.id) == 1
+
+    # Reading a notification outside the window leaves the count alone
+    service.mark_as_read(old_id)
+    assert service.get_unread_count(user.id) == 1
+
+
+def test_archive_moves_old_read_notifications(db, make_user):
+    user = make_user()
+    recent_id = _add_notification(db, user.id, is_read=True)
+    old_read_id = _add_notification(db, user.id, age_days=settings.NOTIFICATION_RETENTION_DAYS + 1, is_read=True)
+    old_unread_id = _add_notification(db, user.id, age_days=settings.NOTIFICATION_RETENTION_DAYS + 1)
+
+    assert NotificationRetentionService(db).archive_read_notifications() == 1
+
+    remaining = {row.id for row in db.query(Notification.id).filter(Notification.user_id == user.id)}
+    assert remaining == {recent_id, old_unread_id}
+    assert db.query(notifications_archive.c.id).all() == [(old_read_id,)]
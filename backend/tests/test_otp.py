@@ -0,0 +1,142 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import VestaException
+from app.services.auth_service import AuthService
+from app.services.otp_service import OTPService
+from app.services.otp_store import MemoryOTPStore, RedisOTPStore
+from app.services.otp_throttle import MemoryOTPThrottle, RedisOTPThrottle
+
+MOBILE = "09121234567"
+
+
+class SentCodes:
+    """SMSService stand-in keeping the last code sent to each mobile"""
+
+    def __init__(self):
+        self.codes = {}
+
+    def send_otp(self, mobile: str, otp: str) -> bool:
+        self.codes[mobile] = otp
+        return True
+
+
+class MemoryBackend:
+    def __init__(self):
+        self.now = 1000.0
+
+    def clock(self) -> float:
+        return self.now
+
+    def store(self):
+        return MemoryOTPStore(clock=self.clock)
+
+    def throttle(self):
+        return MemoryOTPThrottle(clock=self.clock)
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class RedisBackend:
+    def __init__(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")  # fakeredis runs the Lua scripts with lupa
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+    def store(self):
+        return RedisOTPStore(self.client)
+
+    def throttle(self):
+        return RedisOTPThrottle(self.client)
+
+    def advance(self, seconds: float) -> None:
+        # Redis expires keys on its own clock
+        time.sleep(seconds)
+
+
+@pytest.fixture(params=[MemoryBackend, RedisBackend], ids=["memory", "redis"])
+def backend(request):
+    return request.param()
+
+
+def test_otp_is_single_use(backend):
+    store = backend.store()
+    assert store.save(MOBILE, "123456", 60)
+
+    assert not store.verify(MOBILE, "654321")
+    assert store.verify(MOBILE, "123456")
+    assert not store.verify(MOBILE, "123456")
+
+
+def test_otp_expires(backend):
+    store = backend.store()
+    store.save(MOBILE, "123456", 1)
+
+    backend.advance(1.1)
+
+    assert not store.verify(MOBILE, "123456")
+
+
+def test_saving_replaces_the_previous_otp(backend):
+    store = backend.store()
+    store.save(MOBILE, "111111", 60)
+    store.save(MOBILE, "222222", 60)
+
+    assert not store.verify(MOBILE, "111111")
+    assert store.verify(MOBILE, "222222")
+
+
+def test_verify_attempts_are_capped_until_reset(backend, monkeypatch):
+    monkeypatch.setattr(settings, "OTP_VERIFY_MAX_ATTEMPTS", 3)
+    throttle = backend.throttle()
+
+    assert [throttle.check_verify(MOBILE) for _ in range(4)] == [True, True, True, False]
+    assert throttle.check_verify("09120000000")
+
+    throttle.reset_verify(MOBILE)
+    assert throttle.check_verify(MOBILE)
+
+
+def test_verify_attempt_window_expires(backend, monkeypatch):
+    monkeypatch.setattr(settings, "OTP_VERIFY_MAX_ATTEMPTS", 1)
+    monkeypatch.setattr(settings, "OTP_EXPIRE_SECONDS", 1)
+    throttle = backend.throttle()
+    throttle.check_verify(MOBILE)
+    assert not throttle.check_verify(MOBILE)
+
+    backend.advance(1.1)
+
+    assert throttle.check_verify(MOBILE)
+
+
+def test_request_bucket_allows_a_burst_then_asks_to_wait(backend):
+    throttle = backend.throttle()
+
+    waits = [throttle.check_request(MOBILE, "10.0.0.1") for _ in range(settings.OTP_MOBILE_BURST + 1)]
+
+    assert waits[:-1] == [0] * settings.OTP_MOBILE_BURST
+    assert 0 < waits[-1] <= settings.OTP_MOBILE_PERIOD / settings.OTP_MOBILE_BURST
+
+
+def test_new_code_lifts_the_verify_lockout(backend, monkeypatch):
+    monkeypatch.setattr(settings, "OTP_VERIFY_MAX_ATTEMPTS", 2)
+    auth = AuthService(db=None)
+    auth.otp_service = OTPService(store=backend.store())
+    auth.otp_throttle = backend.throttle()
+    auth.sms_service = sent = SentCodes()
+
+    def verify_wrong_code() -> int:
+        wrong = "000000" if sent.codes[MOBILE] != "000000" else "111111"
+        with pytest.raises(VestaException) as error:
+            auth.verify_otp(MOBILE, wrong)
+        return error.value.status_code
+
+    auth.request_otp(MOBILE)
+    assert [verify_wrong_code() for _ in range(3)] == [401, 401, 429]
+
+    auth.request_otp(MOBILE)
+
+    assert verify_wrong_code() == 401
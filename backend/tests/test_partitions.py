@@ -0,0 +1,59 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.db.partitions import ensure_monthly_partitions, is_partitioned, month_start, partition_name
+
+
+@pytest.fixture
+def partitioned_table(db):
+    """A month-partitioned table holding only its default partition"""
+    db.execute(text(
+        "CREATE TABLE partition_test (id text, created_at timestamptz NOT NULL, PRIMARY KEY (id, created_at)) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+    db.execute(text("CREATE TABLE partition_test_default PARTITION OF partition_test DEFAULT"))
+    db.commit()
+    yield "partition_test"
+    db.rollback()
+    db.execute(text("DROP TABLE partition_test CASCADE"))
+    db.commit()
+
+
+def _locations(db):
+    return dict(db.execute(text("SELECT id, tableoid::regclass::text FROM partition_test")).all())
+
+
+def test_create_all_partitions_activity_logs(db):
+    assert is_partitioned(db, "activity_logs")
+    assert db.execute(text("SELECT to_regclass('activity_logs_default')")).scalar()
+
+
+def test_rows_already_in_default_move_into_the_new_month(db, partitioned_table):
+    now = datetime.now(timezone.utc)
+    db.execute(text(
+        "INSERT INTO partition_test VALUES ('current', :now), ('next', :next), ('old', :old)"
+    ), {"now": now, "next": now + timedelta(days=40), "old": now - timedelta(days=400)})
+    db.commit()
+    assert set(_locations(db).values()) == {"partition_test_default"}
+
+    created = ensure_monthly_partitions(db, partitioned_table, months_ahead=2)
+
+    this_month = month_start(date.today())
+    assert created[0] == partition_name(partitioned_table, this_month)
+    assert len(created) == 3
+    locations = _locations(db)
+    assert locations["current"] == created[0]
+    assert locations["next"] in created[1:]
+    # Rows outside the new months stay in the default partition
+    assert locations["old"] == "partition_test_default"
+    # The moved rows still belong to the table: later inserts route into the new partitions
+    db.execute(text("INSERT INTO partition_test VALUES ('later', :now)"), {"now": now})
+    db.commit()
+    assert _locations(db)["later"] == created[0]
+
+
+def test_maintenance_is_idempotent(db, partitioned_table):
+    assert len(ensure_monthly_partitions(db, partitioned_table, months_ahead=1)) == 2
+    assert ensure_monthly_partitions(db, partitioned_table, months_ahead=1) == []
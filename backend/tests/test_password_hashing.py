@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.exceptions import VestaException
+from app.core.hashing import PasswordHasher, PasswordHashingBusy
+from app.schemas.user import UserCreate
+from app.services import auth_service as auth_module
+from app.services.auth_service import AuthService
+
+PASSWORD = "correct horse"
+
+
+class BlockingContext:
+    """CryptContext stand-in whose calls wait until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def verify_and_update(self, password, hashed_password):
+        self.release.wait(5)
+        return True, None
+
+    def hash(self, password):
+        self.release.wait(5)
+        return "hashed"
+
+
+@pytest.fixture
+def busy_hasher(monkeypatch):
+    """A hasher with one worker and one queue slot, both taken"""
+    context = BlockingContext()
+    hasher = PasswordHasher(context=context, workers=1, max_pending=1)
+    blocked = [hasher._submit(context.hash, (PASSWORD,)) for _ in range(2)]
+    monkeypatch.setattr(auth_module, "password_hasher", hasher)
+    yield hasher
+    context.release.set()
+    for future in blocked:
+        future.result()
+    hasher.shutdown()
+
+
+def test_outdated_hash_is_replaced_on_login(db, make_user):
+    cheap = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash(PASSWORD)
+    user = make_user(hashed_password=cheap)
+    auth = AuthService(db)
+
+    with pytest.raises(VestaException) as error:
+        asyncio.run(auth.authenticate(user.username, "wrong"))
+    assert error.value.status_code == 401
+    db.refresh(user)
+    assert user.hashed_password == cheap
+
+    asyncio.run(auth.authenticate(user.username, PASSWORD))
+
+    db.refresh(user)
+    assert user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert asyncio.run(auth.authenticate(user.username, PASSWORD)).id == user.id
+
+
+def test_full_queue_rejects_login_with_503(db, make_user, busy_hasher):
+    user = make_user(hashed_password="$2b$04$" + "a" * 53)
+
+    with pytest.raises(VestaException) as error:
+        asyncio.run(AuthService(db).authenticate(user.username, PASSWORD))
+
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    assert busy_hasher.rejected == 1
+
+
+def test_full_queue_rejects_registration_with_503(db, busy_hasher):
+    user_in = UserCreate(mobile="09121112233", first_name="A", last_name="B", password=PASSWORD)
+
+    with pytest.raises(VestaException) as error:
+        AuthService(db).create_user(user_in)
+
+    assert error.value.status_code == 503
+    assert AuthService(db).get_user_by_mobile("09121112233") is None
+
+
+def test_registration_hashes_on_the_executor(db, monkeypatch):
+    hasher = PasswordHasher(workers=1)
+    monkeypatch.setattr(auth_module, "password_hasher", hasher)
+    user_in = UserCreate(mobile="09121112233", first_name="A", last_name="B", password=PASSWORD)
+
+    user = AuthService(db).create_user(user_in)
+
+    assert hasher.completed == 1
+    assert hasher.context.verify(PASSWORD, user.hashed_password)
+    hasher.shutdown()
+
+
+def test_job_past_the_queue_timeout_is_skipped():
+    context = BlockingContext()
+    hasher = PasswordHasher(context=context, workers=1, queue_timeout=0.05)
+    running = hasher._submit(context.hash, (PASSWORD,))
+    queued = hasher._submit(context.hash, (PASSWORD,))
+
+    threading.Timer(0.2, context.release.set).start()
+
+    assert running.result(5) == "hashed"
+    with pytest.raises(PasswordHashingBusy):
+        queued.result(5)
+    assert hasher.timed_out == 1
+    hasher.shutdown()
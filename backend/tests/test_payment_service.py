@@ -0,0 +1,46 @@
+from app.core.security import generate_id
+from app.models.credit import Credit
+from app.models.notification import Notification, NotificationType
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.services.payment_service import PaymentService
+
+
+def _pending_payments(db, user_id, amounts):
+    payments = [
+        Payment(id=generate_id("PMT"), user_id=user_id, method=PaymentMethod.CARD_TO_CARD, amount=amount)
+        for amount in amounts
+    ]
+    db.add_all(payments)
+    db.commit()
+    return [payment.id for payment in payments]
+
+
+def test_batch_approve_queues_notifications_for_telegram(db, make_user, make_agent):
+    admin = make_user()
+    agent = make_agent()
+    payment_ids = _pending_payments(db, agent.user_id, [1000, 2500])
+
+    results = PaymentService(db).batch_approve_payments(payment_ids + ["PMT-missing"], admin.id)
+
+    assert [result["success"] for result in results] == [True, True, False]
+    notifications = db.query(Notification).filter(Notification.related_id.in_(payment_ids)).all()
+    assert len(notifications) == 2
+    for notification in notifications:
+        assert notification.type == NotificationType.PAYMENT
+        assert notification.user_id == agent.user_id
+        assert notification.send_to_telegram is True
+        assert notification.is_sent_to_telegram is False
+    assert db.query(Credit.balance).filter(Credit.agent_id == agent.id).scalar() == 3500
+
+
+def test_batch_reject_queues_notifications_for_telegram(db, make_user, make_agent):
+    admin = make_user()
+    agent = make_agent()
+    payment_ids = _pending_payments(db, agent.user_id, [1000])
+
+    results = PaymentService(db).batch_reject_payments(payment_ids, admin.id, "duplicate")
+
+    assert results[0]["status"] == PaymentStatus.REJECTED
+    notification = db.query(Notification).filter(Notification.related_id == payment_ids[0]).one()
+    assert notification.send_to_telegram is True
+    assert notification.is_sent_to_telegram is False
@@ -0,0 +1,88 @@
+import pytest
+
+from app.models.user import UserRole
+from app.schemas.agent import AgentCreate, AgentUpdate
+from app.schemas.agent_group import AgentGroupCreate
+from app.schemas.pricing import PriceOverrideCreate
+from app.schemas.product import ProductCreate
+from app.schemas.product_group import ProductGroupCreate
+from app.schemas.subscription import SubscriptionCreate
+from app.services.agent_service import AgentService
+from app.services.price_matrix import price_matrix
+from app.services.pricing_service import PricingService
+from app.services.principal_cache import Principal
+from app.services.product_service import ProductService
+from app.services.subscription_service import SubscriptionService
+
+
+@pytest.fixture
+def product(db):
+    price_matrix.invalidate()
+    service = ProductService(db)
+    group = service.create_product_group(ProductGroupCreate(name="VPN"))
+    return service.create_product(ProductCreate(name="Monthly", group_id=group.id, price=1000, commission_rate=10))
+
+
+def _principal(agent, role=UserRole.AGENT):
+    return Principal(id=agent.user_id, role=role, is_active=True, agent_id=agent.id)
+
+
+def _subscribe(db, principal, agent, product, price):
+    subscription_in = SubscriptionCreate(product_id=product.id, agent_id=agent.id, customer_name="Customer", price=price)
+    return SubscriptionService(db).create_subscription(subscription_in, principal)
+
+
+def test_agent_supplied_price_is_ignored(db, make_agent, product):
+    agent = make_agent()
+    PricingService(db).create_override(PriceOverrideCreate(product_id=product.id, agent_id=agent.id, price=700))
+
+    subscription = _subscribe(db, _principal(agent), agent, product, price=1)
+
+    assert subscription.price == 700
+
+
+def test_agent_without_override_pays_the_product_price(db, make_agent, product):
+    agent = make_agent()
+
+    subscription = _subscribe(db, _principal(agent), agent, product, price=1)
+
+    assert subscription.price == 900
+
+
+def test_admin_may_set_the_price(db, make_user, make_agent, product):
+    admin = make_user()
+    agent = make_agent()
+    principal = Principal(id=admin.id, role=UserRole.ADMIN, is_active=True)
+
+    subscription = _subscribe(db, principal, agent, product, price=1)
+
+    assert subscription.price == 1
+
+
+@pytest.fixture
+def group_price(db, product):
+    """An agent group whose members pay 500 for the product"""
+    group = AgentService(db).create_agent_group(AgentGroupCreate(name="Gold"))
+    PricingService(db).create_override(PriceOverrideCreate(product_id=product.id, agent_group_id=group.id, price=500))
+    return group
+
+
+def test_creating_an_agent_in_a_group_refreshes_prices(db, make_user, product, group_price):
+    user = make_user(UserRole.AGENT)
+    assert price_matrix.price_for(None, product.id) == 900  # matrix loaded before the agent exists
+
+    agent = AgentService(db).create_agent(AgentCreate(user_id=user.id, group_ids=[group_price.id]))
+
+    assert price_matrix.price_for(agent.id, product.id) == 500
+
+
+def test_changing_agent_groups_refreshes_prices(db, make_agent, product, group_price):
+    agent = make_agent()
+    service = AgentService(db)
+    assert price_matrix.price_for(agent.id, product.id) == 900
+
+    service.update_agent(agent.id, AgentUpdate(group_ids=[group_price.id]))
+    assert price_matrix.price_for(agent.id, product.id) == 500
+
+    service.update_agent(agent.id, AgentUpdate(group_ids=[]))
+    assert price_matrix.price_for(agent.id, product.id) == 900
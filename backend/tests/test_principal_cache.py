@@ -0,0 +1,85 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.deps import get_current_admin, get_user_from_token
+from app.core.security import create_access_token
+from app.models.user import UserRole
+from app.schemas.agent import AgentCreate
+from app.services import principal_cache as principal_module
+from app.services.agent_service import AgentService
+from app.services.principal_cache import PRINCIPAL_CHANNEL, PrincipalCache, principal_cache
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    monkeypatch.setattr(principal_module, "get_redis", lambda: client)
+    return client
+
+
+def authenticate(db, user_id):
+    # A token without role/version claims is resolved through the principal cache
+    return get_user_from_token(db, create_access_token(user_id))
+
+
+def test_deactivated_user_is_rejected_right_after_commit(db, make_agent):
+    agent = make_agent()
+    assert authenticate(db, agent.user_id).is_active
+
+    AgentService(db).deactivate_agent(agent.id)
+
+    with pytest.raises(HTTPException) as error:
+        authenticate(db, agent.user_id)
+    assert error.value.status_code == 403
+
+
+def test_demoted_admin_loses_admin_access(db, make_user):
+    admin = make_user(UserRole.ADMIN)
+    assert get_current_admin(authenticate(db, admin.id)).role == UserRole.ADMIN
+
+    AgentService(db).create_agent(AgentCreate(user_id=admin.id))
+
+    principal = authenticate(db, admin.id)
+    assert principal.role == UserRole.AGENT
+    assert principal.agent_id is not None
+    with pytest.raises(HTTPException) as error:
+        get_current_admin(principal)
+    assert error.value.status_code == 403
+
+
+def test_rollback_leaves_the_cached_principal(db, make_agent, monkeypatch):
+    agent = make_agent()
+    cached = principal_cache.get(db, agent.user_id)
+    dropped = []
+    monkeypatch.setattr(principal_cache, "invalidate", dropped.append)
+
+    agent.user.is_active = False
+    principal_module.invalidate_principals(db, [agent.user_id])
+    db.rollback()
+
+    assert dropped == []
+    assert principal_cache.get(db, agent.user_id) is cached
+
+
+def test_shared_copy_is_dropped_on_commit(db, make_agent, redis_client):
+    agent = make_agent()
+    principal_cache.get(db, agent.user_id)
+    assert redis_client.exists(f"principal:{agent.user_id}")
+
+    AgentService(db).deactivate_agent(agent.id)
+
+    assert not redis_client.exists(f"principal:{agent.user_id}")
+    assert not principal_cache.get(db, agent.user_id).is_active
+
+
+def test_other_processes_forget_the_principal_through_notify(db, make_agent, listen):
+    agent = make_agent()
+    other = PrincipalCache()
+    received = listen(PRINCIPAL_CHANNEL, other.forget)
+    assert other.get(db, agent.user_id).is_active
+
+    AgentService(db).deactivate_agent(agent.id)
+
+    assert received.get(timeout=5) == agent.user_id
+    assert not other.get(db, agent.user_id).is_active
@@ -0,0 +1,56 @@
+import pytest
+
+from app.models.product import Product
+from app.schemas.product import ProductCreate
+from app.schemas.product_group import ProductGroupCreate
+from app.services.product_service import ProductService
+from app.services.product_transfer import parse_products
+
+
+@pytest.fixture
+def existing(db):
+    service = ProductService(db)
+    group = service.create_product_group(ProductGroupCreate(name="VPN"))
+    return service.create_product(ProductCreate(name="Monthly", group_id=group.id, price=1000, commission_rate=10))
+
+
+def test_update_rows_only_need_an_id(db, existing):
+    rows = parse_products(f"id,price\n{existing.id},1200\n".encode(), "products.csv")
+
+    result = ProductService(db).import_products(rows)
+
+    assert result.updated[0].changes == {"price": [1000, 1200]}
+    db.expire_all()
+    product = db.get(Product, existing.id)
+    assert (product.name, product.group_id, product.price, product.commission_rate) == (
+        "Monthly", existing.group_id, 1200, 10
+    )
+
+
+def test_new_rows_need_name_group_and_price(db, existing):
+    rows = parse_products(
+        f'[{{"id": "{existing.id}", "is_active": false}}, {{"name": "Yearly", "price": 9000}}]'.encode(),
+        "products.json"
+    )
+
+    with pytest.raises(ValueError) as error:
+        ProductService(db).import_products(rows)
+
+    assert str(error.value) == "Row 2: group_id: Field required"
+    assert db.get(Product, existing.id).is_active is True
+
+
+def test_new_rows_get_the_product_defaults(db, existing):
+    content = f"name,group_id,price\nYearly,{existing.group_id},9000\n".encode()
+
+    result = ProductService(db).import_products(parse_products(content, "products.csv"))
+
+    product = db.get(Product, result.created[0].id)
+    assert (product.name, product.price, product.commission_rate, product.is_active) == ("Yearly", 9000, 0, True)
+
+
+def test_unknown_group_is_reported_per_row(db, existing):
+    rows = parse_products(f"id,group_id\n{existing.id},PGP-missing\n".encode(), "products.csv")
+
+    with pytest.raises(ValueError, match="Row 1: product group PGP-missing not found"):
+        ProductService(db).import_products(rows)
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.utils import normalize_search_text
+
+# Arabic ye, alef maksura, kaf, heh with yeh above and teh marbuta, as typed on Arabic keyboards
+ARABIC_NAME = "علي مكارم خانۀ فاطمة موسى"
+PERSIAN_NAME = "علی مکارم خانه فاطمه موسی"
+
+SAMPLES = [
+    ARABIC_NAME,
+    # ZWNJ inside a word, and fatha/kasra/shadda/tatweel
+    "می‌رود مَحمَّد مــریم",
+    # Persian and Arabic-Indic digits
+    "۰۹۱۲۳۴۵۶۷۸۹ ٠١٢",
+    "  Ali\tREZAEI\n  Shop  ",
+]
+
+
+def test_arabic_letters_become_persian():
+    assert normalize_search_text(ARABIC_NAME) == PERSIAN_NAME
+    assert normalize_search_text(PERSIAN_NAME) == PERSIAN_NAME
+
+
+def test_zwnj_becomes_a_space():
+    assert normalize_search_text("می‌رود") == "می رود"
+    assert normalize_search_text("نامه‌‌ ها") == "نامه ها"
+
+
+def test_digits_become_ascii():
+    assert normalize_search_text("۰۹۱۲۳۴۵۶۷۸۹") == "09123456789"
+    assert normalize_search_text("٠١٢٣٤٥٦٧٨٩") == "0123456789"
+
+
+def test_diacritics_and_tatweel_are_dropped():
+    assert normalize_search_text("مَحمَّد") == "محمد"
+    assert normalize_search_text("مــریم") == "مریم"
+    assert normalize_search_text("كَتَبَ") == "کتب"
+
+
+def test_case_and_whitespace_are_folded():
+    assert normalize_search_text("  Ali\tREZAEI\n  Shop  ") == "ali rezaei shop"
+    assert normalize_search_text("") == ""
+
+
+@pytest.fixture
+def search_text_column(db):
+    if not db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar():
+        pytest.skip("pg_trgm is not installed")
+    return db
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_generated_column_matches_python(search_text_column, make_user, sample):
+    db = search_text_column
+    user = make_user(first_name=sample, last_name="كريمی", email=None, business_name=sample)
+    db.refresh(user)
+
+    expected = normalize_search_text(" ".join([sample, "كريمی", user.mobile, "", sample]))
+    assert user.search_text == expected
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.security import generate_id
+from app.db.snapshot import invalidate_on_commit
+from app.models.setting import Setting
+from app.services.setting_cache import SETTINGS_CHANNEL, SettingCache
+
+
+@pytest.fixture
+def queries(database):
+    """Number of statements sent to the database"""
+    count = [0]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        count[0] += 1
+
+    event.listen(database, "before_cursor_execute", record)
+    yield count
+    event.remove(database, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def cache():
+    return SettingCache(ttl=3600)
+
+
+def add_setting(db, key, value, category="general"):
+    db.add(Setting(id=generate_id("SET"), key=key, value=value, category=category))
+
+
+def test_reads_do_not_query_after_the_first_load(db, cache, queries):
+    add_setting(db, "site_name", "Vesta")
+    add_setting(db, "sms_sender", "3000", category="sms")
+    db.commit()
+    queries[0] = 0
+
+    assert cache.get("site_name").value == "Vesta"
+    loaded = queries[0]
+    assert loaded > 0
+
+    for _ in range(100):
+        assert cache.get("site_name").value == "Vesta"
+        assert cache.get("missing") is None
+        assert dict(cache.get_category("sms")) == {"sms_sender": "3000"}
+    assert queries[0] == loaded
+
+
+def test_change_is_swapped_in_after_commit(db, cache):
+    add_setting(db, "site_name", "Vesta")
+    db.commit()
+    assert cache.get("site_name").value == "Vesta"
+
+    db.query(Setting).filter(Setting.key == "site_name").update({"value": "Vesta 2"})
+    invalidate_on_commit(db, SETTINGS_CHANNEL, cache)
+    assert cache.get("site_name").value == "Vesta"
+
+    db.commit()
+    assert cache.get("site_name").value == "Vesta 2"
+
+
+def test_rolled_back_change_keeps_the_snapshot(db, cache, queries):
+    add_setting(db, "site_name", "Vesta")
+    db.commit()
+    snapshot = cache.snapshot()
+
+    db.query(Setting).filter(Setting.key == "site_name").update({"value": "Vesta 2"})
+    invalidate_on_commit(db, SETTINGS_CHANNEL, cache)
+    db.rollback()
+
+    # A later, unrelated commit on the same session does not invalidate either
+    add_setting(db, "other", "1")
+    db.commit()
+    queries[0] = 0
+
+    assert cache.snapshot() is snapshot
+    assert queries[0] == 0
+
+
+def test_change_is_notified_to_other_processes(db, cache, listen):
+    received = listen(SETTINGS_CHANNEL, cache.invalidate)
+    add_setting(db, "site_name", "Vesta")
+    db.commit()
+    assert cache.get("site_name").value == "Vesta"
+
+    db.query(Setting).filter(Setting.key == "site_name").update({"value": "Vesta 2"})
+    # The cache of this test stands in for another process: only NOTIFY reaches it
+    invalidate_on_commit(db, SETTINGS_CHANNEL, SettingCache())
+    db.commit()
+
+    assert received.get(timeout=5) == "changed"
+    assert cache.get("site_name").value == "Vesta 2"
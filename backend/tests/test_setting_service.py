@@ -0,0 +1,74 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_admin, get_current_super_admin, get_db
+from app.api.endpoints import settings as settings_endpoints
+from app.core.security import generate_id
+from app.models.setting import Setting
+from app.models.user import UserRole
+from app.services.principal_cache import Principal
+from app.services.setting_service import SettingService
+
+
+@pytest.fixture
+def stored(db):
+    db.add_all([
+        Setting(id=generate_id("SET"), key="site_name", value="Vesta", category="general"),
+        Setting(id=generate_id("SET"), key="sms_sender", value="3000", category="sms"),
+    ])
+    db.commit()
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(settings_endpoints.router, prefix="/settings")
+    admin = Principal(id="USR-1", role=UserRole.SUPER_ADMIN, is_active=True)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_admin] = lambda: admin
+    app.dependency_overrides[get_current_super_admin] = lambda: admin
+    return TestClient(app)
+
+
+def stored_values(db):
+    db.expire_all()
+    return {setting.key: setting.value for setting in db.query(Setting)}
+
+
+def test_bulk_update_applies_every_key(db, stored):
+    service = SettingService(db)
+
+    updated, unknown = service.bulk_update_settings({"site_name": "Vesta 2", "sms_sender": "3001"})
+
+    assert sorted(updated) == ["site_name", "sms_sender"]
+    assert unknown == []
+    assert stored_values(db) == {"site_name": "Vesta 2", "sms_sender": "3001"}
+    assert service.get_setting_by_key("site_name").value == "Vesta 2"
+
+
+def test_unknown_keys_are_reported_and_nothing_is_applied(db, stored):
+    updated, unknown = SettingService(db).bulk_update_settings(
+        {"site_name": "Vesta 2", "missing": "1", "sms_sender": "3001", "other": "2"}
+    )
+
+    assert updated == []
+    assert unknown == ["missing", "other"]
+    assert stored_values(db) == {"site_name": "Vesta", "sms_sender": "3000"}
+
+
+def test_bulk_route_is_not_captured_by_the_key_route(db, stored, client):
+    response = client.put("/settings/bulk-update", json={"site_name": "Vesta 2"})
+
+    assert response.status_code == 200
+    assert response.json() == {"updated": 1, "unknown_keys": []}
+    assert stored_values(db)["site_name"] == "Vesta 2"
+
+    response = client.put("/settings/bulk-update", json={"site_name": "Vesta 3", "missing": "1"})
+    assert response.status_code == 400
+    assert "missing" in response.json()["detail"]
+    assert stored_values(db)["site_name"] == "Vesta 2"
+
+    response = client.put("/settings/site_name", json={"value": "Vesta 4"})
+    assert response.status_code == 200
+    assert response.json()["value"] == "Vesta 4"
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.models.sms_campaign import SMSCampaign, SMSCampaignRecipient, SMSCampaignStatus, SMSRecipientStatus
+from app.models.user import UserRole
+from app.services import sms_campaign_service
+from app.services.sms_campaign_sender import SMSCampaignSender
+from app.services.sms_campaign_service import SMSCampaignService
+from app.services.sms_service import SMSOutbox, SMSProvider
+
+
+class Provider:
+    """Stand-in SMS endpoint recording each request and the peak number in flight"""
+
+    def __init__(self, failing=(), busy_once=()):
+        self.failing = set(failing)
+        self.busy_once = set(busy_once)
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, request):
+        mobile = json.loads(request.content)["to"]
+        if mobile in self.busy_once:
+            self.busy_once.discard(mobile)
+            raise httpx.PoolTimeout("no connection available")
+        self.requests.append(mobile)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        return httpx.Response(500 if mobile in self.failing else 200)
+
+
+def make_outbox(provider, concurrency=2):
+    return SMSOutbox(
+        providers=[SMSProvider("primary", "http://sms.test/send", "key")],
+        client=httpx.AsyncClient(transport=httpx.MockTransport(provider)),
+        concurrency=concurrency,
+    )
+
+
+@pytest.fixture
+def agents(make_user):
+    return [make_user(UserRole.AGENT) for _ in range(5)]
+
+
+@pytest.fixture
+def campaign(db, make_user, agents):
+    admin = make_user()
+    return SMSCampaignService(db).create_campaign({"title": "t", "message": "hello", "role": UserRole.AGENT}, admin.id)
+
+
+def recipients(db, campaign_id):
+    db.expire_all()
+    return {
+        recipient.mobile: recipient
+        for recipient in db.query(SMSCampaignRecipient).filter(SMSCampaignRecipient.campaign_id == campaign_id)
+    }
+
+
+def test_campaign_is_sent_in_batches_within_the_outbox_limit(db, agents, campaign):
+    provider = Provider(failing={agents[0].mobile})
+    sender = SMSCampaignSender(outbox=make_outbox(provider), batch_size=2, concurrency=3)
+
+    asyncio.run(sender.send_campaign(campaign.id))
+
+    assert campaign.total_recipients == 5
+    assert sorted(provider.requests) == sorted(agent.mobile for agent in agents)
+    assert provider.peak <= 2
+    rows = recipients(db, campaign.id)
+    assert rows[agents[0].mobile].status == SMSRecipientStatus.FAILED
+    assert rows[agents[0].mobile].error == "primary: HTTP 500"
+    for agent in agents[1:]:
+        assert rows[agent.mobile].status == SMSRecipientStatus.SENT
+        assert rows[agent.mobile].provider == "primary"
+    assert db.get(SMSCampaign, campaign.id).status == SMSCampaignStatus.COMPLETED
+
+
+def test_pool_timeouts_go_back_to_pending_and_are_sent_once(db, agents, campaign):
+    provider = Provider(busy_once={agents[1].mobile})
+    sender = SMSCampaignSender(outbox=make_outbox(provider), batch_size=5)
+
+    asyncio.run(sender.send_campaign(campaign.id))
+
+    assert provider.requests.count(agents[1].mobile) == 1
+    assert all(row.status == SMSRecipientStatus.SENT for row in recipients(db, campaign.id).values())
+    assert db.get(SMSCampaign, campaign.id).status == SMSCampaignStatus.COMPLETED
+
+
+def test_cancelled_campaign_stops_claiming(db, agents, campaign):
+    provider = Provider()
+    SMSCampaignService(db).cancel_campaign(campaign.id)
+    sender = SMSCampaignSender(outbox=make_outbox(provider), batch_size=2)
+
+    asyncio.run(sender.send_campaign(campaign.id))
+
+    assert provider.requests == []
+    assert all(row.status == SMSRecipientStatus.PENDING for row in recipients(db, campaign.id).values())
+
+
+def test_disabled_outbox_refuses_campaigns(db, make_user, agents, campaign, monkeypatch):
+    SMSCampaignService(db).cancel_campaign(campaign.id)
+    monkeypatch.setattr(sms_campaign_service.sms_campaign_sender, "outbox", SMSOutbox(providers=[]))
+    service = SMSCampaignService(db)
+
+    with pytest.raises(ValueError, match="not configured"):
+        service.create_campaign({"title": "t", "message": "hello"}, make_user().id)
+    with pytest.raises(ValueError, match="not configured"):
+        service.resume_campaign(campaign.id)
+
+    db.expire_all()
+    assert db.query(SMSCampaign).count() == 1
+    assert db.get(SMSCampaign, campaign.id).status == SMSCampaignStatus.CANCELLED
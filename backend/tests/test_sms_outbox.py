@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.services import sms_service
+from app.services.sms_service import SMSOutbox, SMSProvider
+
+
+@pytest.fixture
+def loop():
+    """An event loop running on its own thread, standing in for the app's loop"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def release():
+    return threading.Event()
+
+
+@pytest.fixture
+def outbox(loop, release):
+    async def handler(request):
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    async def start():
+        outbox.start()
+
+    async def stop():
+        await outbox.stop()
+
+    outbox = SMSOutbox(
+        providers=[SMSProvider("primary", "http://sms.test/send", "key")],
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        queue_size=1,
+        concurrency=1,
+        send_retries=0,
+    )
+    asyncio.run_coroutine_threadsafe(start(), loop).result()
+    yield outbox
+    release.set()
+    asyncio.run_coroutine_threadsafe(stop(), loop).result()
+
+
+def test_enqueue_from_another_thread_reports_a_full_queue(outbox, release):
+    assert outbox.enqueue("09120000001", "a")  # taken by the sender, which blocks on the provider
+    time.sleep(0.1)
+    assert outbox.enqueue("09120000002", "b")  # fills the queue
+
+    assert not outbox.enqueue("09120000003", "c")
+    assert outbox.dropped == 1
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while outbox.delivered < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert outbox.delivered == 2
+
+
+def test_enqueue_gives_up_when_the_loop_is_busy(outbox, loop, monkeypatch):
+    monkeypatch.setattr(sms_service, "ENQUEUE_TIMEOUT", 0.1)
+    loop.call_soon_threadsafe(time.sleep, 0.5)
+
+    assert not outbox.enqueue("09120000001", "a")
+    assert outbox.enqueue_timeouts == 1
+    assert outbox.dropped == 0
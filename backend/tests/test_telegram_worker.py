@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import insert
+
+from app.core.security import generate_id
+from app.models.notification import Notification, NotificationType
+from app.services import telegram_worker as worker_module
+from app.services.telegram_worker import TelegramDeliveryWorker
+
+
+class Telegram:
+    """Stand-in Bot API answering with the queued responses, then 200"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.responses:
+            return self.responses.pop(0)
+        return httpx.Response(200, json={"ok": True})
+
+
+@pytest.fixture
+def notification(db, make_user):
+    user = make_user(telegram_id="1001")
+    notification_id = generate_id("NTF")
+    db.execute(insert(Notification), [{
+        "id": notification_id,
+        "user_id": user.id,
+        "type": NotificationType.SYSTEM,
+        "title": "title",
+        "message": "message",
+        "send_to_telegram": True,
+        "is_sent_to_telegram": False,
+        "telegram_attempts": 0,
+    }])
+    db.commit()
+    return notification_id
+
+
+def drain(telegram, **options):
+    worker = TelegramDeliveryWorker(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(telegram)),
+        api_url="http://telegram.test",
+        bot_token="token",
+        global_rate=1000,
+        per_chat_rate=1000,
+        **options
+    )
+    return asyncio.run(worker.drain_once())
+
+
+def reload(db, notification_id):
+    db.expire_all()
+    return db.query(Notification).filter(Notification.id == notification_id).one()
+
+
+def test_sent_message_is_marked(db, notification):
+    telegram = Telegram()
+
+    assert drain(telegram) == 1
+
+    assert telegram.requests[0].url == "http://telegram.test/bottoken/sendMessage"
+    row = reload(db, notification)
+    assert row.is_sent_to_telegram
+    assert row.telegram_attempts == 1
+    assert row.telegram_next_attempt_at is None
+    assert drain(Telegram()) == 0
+
+
+def test_server_error_is_retried_inline(db, notification):
+    telegram = Telegram(httpx.Response(502))
+
+    drain(telegram, send_retries=1)
+
+    assert len(telegram.requests) == 2
+    assert reload(db, notification).is_sent_to_telegram
+
+
+def test_server_error_backs_off_on_the_row(db, notification):
+    telegram = Telegram(httpx.Response(500))
+
+    drain(telegram, send_retries=0)
+
+    row = reload(db, notification)
+    assert not row.is_sent_to_telegram
+    assert row.send_to_telegram
+    wait = row.telegram_next_attempt_at - datetime.now(timezone.utc)
+    assert timedelta(seconds=25) < wait <= timedelta(seconds=worker_module.RETRY_BASE_DELAY)
+
+
+def test_client_error_drops_the_message(db, notification):
+    telegram = Telegram(httpx.Response(403, json={"ok": False, "description": "bot was blocked"}))
+
+    drain(telegram)
+
+    assert len(telegram.requests) == 1
+    row = reload(db, notification)
+    assert not row.send_to_telegram
+    assert not row.is_sent_to_telegram
+
+
+def test_short_retry_after_is_waited_inline(db, notification):
+    telegram = Telegram(httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 1}}))
+
+    drain(telegram)
+
+    assert len(telegram.requests) == 2
+    assert reload(db, notification).is_sent_to_telegram
+
+
+def test_retry_after_past_the_lease_is_rescheduled(db, notification):
+    telegram = Telegram(httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 600}}))
+
+    drain(telegram)
+
+    assert len(telegram.requests) == 1
+    row = reload(db, notification)
+    assert not row.is_sent_to_telegram
+    assert row.telegram_next_attempt_at - datetime.now(timezone.utc) > timedelta(seconds=590)
+
+
+def test_messages_not_attempted_within_the_lease_are_released(db, notification, monkeypatch):
+    monkeypatch.setattr(worker_module, "CLAIM_LEASE", timedelta(0))
+    telegram = Telegram()
+
+    drain(telegram)
+
+    assert telegram.requests == []
+    row = reload(db, notification)
+    assert row.telegram_attempts == 0
+    assert row.telegram_next_attempt_at is None
@@ -0,0 +1,84 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.deps import get_user_from_token
+from app.core.exceptions import VestaException
+from app.services import token_versions as versions_module
+from app.services.auth_service import AuthService
+from app.services.token_versions import TokenVersionStore, revoke_tokens
+
+
+class MemoryBackend:
+    def __init__(self, monkeypatch):
+        monkeypatch.setattr(versions_module, "get_redis", lambda: None)
+        self.client = None
+
+
+class RedisBackend:
+    def __init__(self, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")  # fakeredis runs the Lua script with lupa
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        monkeypatch.setattr(versions_module, "get_redis", lambda: self.client)
+        # The shared store registers its script on the client it first sees
+        monkeypatch.setattr(versions_module.token_versions, "_set_script", None)
+
+
+@pytest.fixture(params=[MemoryBackend, RedisBackend], ids=["memory", "redis"])
+def backend(request, monkeypatch):
+    return request.param(monkeypatch)
+
+
+@pytest.fixture
+def agent_user(db, make_agent):
+    return make_agent().user
+
+
+def rejected(db, token) -> int:
+    with pytest.raises(HTTPException) as error:
+        get_user_from_token(db, token)
+    return error.value.status_code
+
+
+def test_tokens_issued_before_revocation_are_rejected(db, backend, agent_user):
+    auth = AuthService(db)
+    old = auth.issue_tokens(agent_user)
+    assert get_user_from_token(db, old["access_token"]).id == agent_user.id
+
+    revoke_tokens(db, [agent_user.id])
+    db.commit()
+
+    assert rejected(db, old["access_token"]) == 401
+    with pytest.raises(VestaException) as error:
+        auth.refresh_tokens(old["refresh_token"])
+    assert error.value.status_code == 401
+
+    db.refresh(agent_user)
+    new = auth.issue_tokens(agent_user)
+    assert get_user_from_token(db, new["access_token"]).id == agent_user.id
+
+
+def test_refresh_and_access_tokens_are_not_interchangeable(db, backend, agent_user):
+    auth = AuthService(db)
+    tokens = auth.issue_tokens(agent_user)
+
+    assert rejected(db, tokens["refresh_token"]) == 401
+    with pytest.raises(VestaException) as error:
+        auth.refresh_tokens(tokens["access_token"])
+    assert error.value.status_code == 401
+
+    refreshed = auth.refresh_tokens(tokens["refresh_token"])
+    assert get_user_from_token(db, refreshed["access_token"]).id == agent_user.id
+
+
+def test_cached_version_never_moves_backwards(backend):
+    store = TokenVersionStore()
+
+    assert store.store("USR-1", 3) == 3
+    assert store.store("USR-1", 2) == 3
+    store.on_notify("USR-1:1")
+
+    assert store._get_cached("USR-1") == 3
+    if backend.client is not None:
+        assert backend.client.get("token_version:USR-1") == "3"
+    assert store.store("USR-1", 4) == 4
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import insert
+
+from app.core.security import generate_id
+from app.db.session import SessionLocal
+from app.models.notification import Notification, NotificationType
+from app.services import unread_counter as counter_module
+from app.services.notification_service import NotificationService
+from app.services.unread_counter import UnreadCounter, unread_counter
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs the Lua script with lupa
+    client = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    monkeypatch.setattr(counter_module, "get_redis", lambda: client)
+    monkeypatch.setattr(unread_counter, "_incr_script", None)
+    return client
+
+
+def _add_unread(db, user_id):
+    notification_id = generate_id("NTF")
+    db.execute(insert(Notification), [{
+        "id": notification_id,
+        "user_id": user_id,
+        "type": NotificationType.SYSTEM,
+        "title": "title",
+        "message": "message",
+        "is_read": False
+    }])
+    db.commit()
+    return notification_id
+
+
+def test_only_cached_counters_are_adjusted(redis_client):
+    counter = UnreadCounter()
+    counter.set("USR-1", 2)
+
+    counter.incr_many(["USR-1", "USR-2"])
+    assert counter.get("USR-1") == 3
+    assert counter.get("USR-2") is None
+
+    counter.incr("USR-1", -5)
+    assert counter.get("USR-1") == 0
+    assert redis_client.ttl("notifications:unread:USR-1") > 0
+
+
+def test_nothing_is_cached_without_redis(monkeypatch):
+    monkeypatch.setattr(counter_module, "get_redis", lambda: None)
+    counter = UnreadCounter()
+
+    counter.set("USR-1", 2)
+    counter.incr("USR-1")
+
+    assert counter.get("USR-1") is None
+
+
+def test_count_follows_writes(db, make_user, redis_client):
+    user = make_user()
+    first = _add_unread(db, user.id)
+    _add_unread(db, user.id)
+    service = NotificationService(db)
+    assert service.get_unread_count(user.id) == 2
+
+    service.mark_as_read(first)
+    assert unread_counter.get(user.id) == 1
+
+    service.mark_all_as_read(user.id)
+    assert service.get_unread_count(user.id) == 0
+
+
+def test_concurrent_mark_as_read_decrements_once(db, make_user, redis_client):
+    user = make_user()
+    notification_id = _add_unread(db, user.id)
+    _add_unread(db, user.id)
+    assert NotificationService(db).get_unread_count(user.id) == 2
+
+    # The first request has read the notification as unread when the second one commits
+    other = SessionLocal()
+    try:
+        seen = NotificationService(other).get_notification(notification_id)
+        assert not seen.is_read
+        NotificationService(db).mark_as_read(notification_id)
+        assert NotificationService(other).mark_as_read(notification_id).is_read
+    finally:
+        other.close()
+
+    assert unread_counter.get(user.id) == 1